@@ -0,0 +1,169 @@
+import re
+import numpy as np
+from functools import partial
+from api.v1.v1_publication.constants import DroughtCategory
+
+DEFAULT_AGGREGATION = "min_mean"
+
+# Per-zone histograms over [0, HISTOGRAM_MAX], the CDI range; the bin
+# width matches the 3 decimals `get_category` rounds to. The range is
+# doubled (and the bins merged by pairs) as long as values exceed it.
+HISTOGRAM_MAX = 1.0
+HISTOGRAM_BINS = 1000
+
+# Upper bounds (inclusive) of the drought classes used by `get_category`
+CLASS_THRESHOLDS = [0.02, 0.05, 0.1, 0.2, 0.3]
+CLASS_CATEGORIES = [
+    DroughtCategory.d4,
+    DroughtCategory.d3,
+    DroughtCategory.d2,
+    DroughtCategory.d1,
+    DroughtCategory.d0,
+    DroughtCategory.normal,
+]
+
+# Statistics stored next to `value` when a job keeps them
+STORED_STATISTICS = ["min", "mean", "min_mean", "median", "p10", "p90"]
+
+re_percentile = re.compile(r"^p([1-9][0-9]?)$")
+
+
+def histogram_bins(values, high: float = HISTOGRAM_MAX) -> np.ndarray:
+    bins = (values / high * HISTOGRAM_BINS).astype("int64")
+    return np.clip(bins, 0, HISTOGRAM_BINS - 1)
+
+
+def histogram_high(high: float, maximum: float) -> float:
+    """
+    Upper bound of the histogram range, doubled from `high` until it
+    covers `maximum`.
+    """
+    while maximum > high:
+        high *= 2
+    return high
+
+
+def widen_histogram(histogram, high: float, new_high: float) -> np.ndarray:
+    """
+    Per-zone histograms over [0, high] rebinned over [0, new_high], a
+    power of 2 times larger: every new bin is the sum of adjacent bins.
+    """
+    while high < new_high:
+        zones = len(histogram)
+        merged = histogram.reshape(zones, HISTOGRAM_BINS // 2, 2).sum(axis=2)
+        histogram = np.concatenate(
+            [merged, np.zeros_like(merged)], axis=1
+        )
+        high *= 2
+    return histogram
+
+
+def classify(values) -> np.ndarray:
+    """
+    Vectorized `get_category` for non-negative values, as indexes into
+    CLASS_CATEGORIES.
+    """
+    return np.searchsorted(CLASS_THRESHOLDS, np.round(values, 3), side="left")
+
+
+def aggregate_min(stats) -> np.ndarray:
+    return stats["min"]
+
+
+def aggregate_mean(stats) -> np.ndarray:
+    return stats["mean"]
+
+
+def aggregate_min_mean(stats) -> np.ndarray:
+    return (stats["min"] + stats["mean"]) * 0.5
+
+
+def aggregate_percentile(stats, q: int) -> np.ndarray:
+    """
+    Percentile read from the per-zone histograms, interpolated inside the
+    bin and never below the zone minimum.
+    """
+    histogram = stats["histogram"]
+    cumulative = np.cumsum(histogram, axis=1)
+    rank = stats["count"] * q / 100
+    bins = np.minimum(
+        (cumulative < rank[:, None]).sum(axis=1),
+        HISTOGRAM_BINS - 1
+    )
+    zones = np.arange(len(bins))
+    before = cumulative[zones, bins] - histogram[zones, bins]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        within = (rank - before) / histogram[zones, bins]
+    width = stats.get("histogram_max", HISTOGRAM_MAX) / HISTOGRAM_BINS
+    values = (bins + np.clip(within, 0, 1)) * width
+    return np.where(
+        stats["count"] > 0,
+        np.fmax(values, stats["min"]),
+        np.nan
+    )
+
+
+def aggregate_fraction_in_class(stats) -> np.ndarray:
+    """
+    Area-weighted share of every drought class, shape (zones, classes).
+    """
+    area = stats["class_area"]
+    total = area.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, area / total, np.nan)
+
+
+AGGREGATORS = {
+    "min": aggregate_min,
+    "mean": aggregate_mean,
+    "min_mean": aggregate_min_mean,
+    "median": partial(aggregate_percentile, q=50),
+}
+
+
+def get_aggregator(name: str):
+    """
+    Resolve a strategy name: a registered aggregator or `pN` for the
+    N-th percentile.
+    """
+    if name in AGGREGATORS:
+        return AGGREGATORS[name]
+    match = re_percentile.match(name or "")
+    if match:
+        return partial(aggregate_percentile, q=int(match.group(1)))
+    raise ValueError(f"Unknown aggregation: {name}")
+
+
+def is_valid_aggregation(name: str) -> bool:
+    try:
+        get_aggregator(name)
+    except ValueError:
+        return False
+    return True
+
+
+def zone_statistics(stats) -> list:
+    """
+    All stored statistics, one dict per zone.
+    """
+    columns = {
+        name: get_aggregator(name)(stats)
+        for name in STORED_STATISTICS
+    }
+    fractions = aggregate_fraction_in_class(stats)
+    results = []
+    for zone, count in enumerate(stats["count"].tolist()):
+        if not count:
+            results.append(None)
+            continue
+        item = {
+            name: round(float(values[zone]), 6)
+            for name, values in columns.items()
+        }
+        item["count"] = count
+        item["fraction_in_class"] = {
+            str(category): round(float(fraction), 6)
+            for category, fraction in zip(CLASS_CATEGORIES, fractions[zone])
+        }
+        results.append(item)
+    return results
@@ -8,6 +8,8 @@ class JobTypes:
     download_geonode_dataset = 7
     new_user_password_setup = 8
     send_feedback = 9
+    export_artifacts = 10
+    stream_initial_cdi_values = 11
 
     FieldStr = {
         test: "test",
@@ -19,6 +21,8 @@ class JobTypes:
         download_geonode_dataset: "download_geonode_dataset",
         new_user_password_setup: "new_user_password_setup",
         send_feedback: "send_feedback",
+        export_artifacts: "export_artifacts",
+        stream_initial_cdi_values: "stream_initial_cdi_values",
     }
 
 
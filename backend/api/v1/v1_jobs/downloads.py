@@ -0,0 +1,293 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import rasterio
+import requests
+from contextlib import ExitStack, contextmanager
+from rasterio.errors import RasterioIOError
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as TransferError
+from urllib3.util.retry import Retry
+from django.conf import settings
+from api.v1.v1_jobs.workspace import RasterWorkspace
+from api.v1.v1_publication.constants import (
+    GEONODE_REQUEST_TIMEOUT,
+    GEONODE_SSL_VERIFY,
+)
+
+logger = logging.getLogger(__name__)
+
+# Where older versions of the download job left their rasters
+download_dir = "./tmp"
+# Downloaded rasters, those of a GeoNode dataset keyed by its pk and
+# ETag/size, in a size-bounded workspace
+cache_dir = os.path.join(download_dir, "rasters")
+
+DOWNLOAD_TIMEOUT = GEONODE_REQUEST_TIMEOUT
+# Attempts, each resuming from the bytes already on disk
+DOWNLOAD_ATTEMPTS = 5
+# Chunk sizes grow or shrink to keep about CHUNK_SECONDS per read
+CHUNK_SIZE_MIN = 64 * 1024
+CHUNK_SIZE_MAX = 8 * 1024 * 1024
+CHUNK_SECONDS = 0.5
+
+_local = threading.local()
+
+
+class DownloadError(Exception):
+    pass
+
+
+def get_session() -> requests.Session:
+    """
+    One Session per thread, keeping connections to GeoNode alive and
+    retrying transient server errors.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.verify = GEONODE_SSL_VERIFY
+        adapter = HTTPAdapter(
+            max_retries=Retry(
+                total=3,
+                backoff_factor=1,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=["HEAD", "GET"],
+            )
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _local.session = session
+    return session
+
+
+def get_workspace() -> RasterWorkspace:
+    return RasterWorkspace(cache_dir, settings.RASTER_CACHE_MAX_BYTES)
+
+
+def next_chunk_size(chunk_size: int, elapsed: float) -> int:
+    if elapsed < CHUNK_SECONDS / 2:
+        return min(chunk_size * 2, CHUNK_SIZE_MAX)
+    if elapsed > CHUNK_SECONDS * 2:
+        return max(chunk_size // 2, CHUNK_SIZE_MIN)
+    return chunk_size
+
+
+def get_remote_info(download_url: str) -> dict:
+    """
+    ETag and size of the remote file, both None when the server does not
+    tell them.
+    """
+    try:
+        response = get_session().head(
+            download_url,
+            allow_redirects=True,
+            timeout=DOWNLOAD_TIMEOUT,
+        )
+    except requests.RequestException:
+        return {"etag": None, "size": None}
+    if response.status_code != 200:
+        return {"etag": None, "size": None}
+    size = response.headers.get("Content-Length")
+    return {
+        "etag": response.headers.get("ETag"),
+        "size": int(size) if size and size.isdigit() else None,
+    }
+
+
+def get_cache_path(geonode_id: int, etag: str = None, size: int = None):
+    """
+    Path of the cached raster of a GeoNode dataset, None when there is
+    nothing to tell two versions of it apart.
+    """
+    if geonode_id is None or (not etag and size is None):
+        return None
+    version = hashlib.sha256(f"{etag}:{size}".encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"raster_{geonode_id}_{version[:16]}.tif")
+
+
+def _expected_size(response):
+    if response.status_code == 206:
+        # Content-Range: bytes <start>-<end>/<total>
+        total = response.headers.get("Content-Range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def _fetch(
+    download_url: str,
+    part_path: str,
+    etag: str = None,
+    size: int = None,
+):
+    """
+    Write the remaining bytes of the file into `part_path`, asking for a
+    Range when part of it is already there. Returns the expected size,
+    `size` when the server does not tell it.
+    """
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        if etag:
+            # A changed file is sent whole instead of the range
+            headers["If-Range"] = etag
+    with get_session().get(
+        download_url,
+        headers=headers,
+        stream=True,
+        timeout=DOWNLOAD_TIMEOUT,
+    ) as response:
+        if response.status_code == 416 and offset:
+            # Range not satisfiable, Content-Range: bytes */<total>
+            total = response.headers.get("Content-Range", "")
+            total = total.rpartition("/")[2]
+            total = int(total) if total.isdigit() else size
+            if offset == total:
+                # Complete already, only the move to its path was missed
+                return total
+            # The partial file is unusable, download the file again
+            os.remove(part_path)
+            return _fetch(download_url, part_path, etag, size)
+        if response.status_code not in [200, 206]:
+            raise DownloadError(f"Status code: {response.status_code}")
+        if response.status_code == 200:
+            offset = 0
+        expected_size = _expected_size(response)
+        chunk_size = CHUNK_SIZE_MIN
+        with open(part_path, "ab" if offset else "wb") as f:
+            while True:
+                start = time.perf_counter()
+                chunk = response.raw.read(chunk_size, decode_content=True)
+                if not chunk:
+                    break
+                f.write(chunk)
+                chunk_size = next_chunk_size(
+                    chunk_size,
+                    time.perf_counter() - start
+                )
+    return expected_size
+
+
+def download_raster(
+    download_url: str,
+    filename: str,
+    geonode_id: int = None,
+) -> str:
+    """
+    Download a raster and return its local path.
+
+    Rasters of a GeoNode dataset are kept in the cache under its pk and
+    ETag/size, so the same version is only downloaded once. Room is made
+    in the workspace for the new raster by evicting the least recently
+    used ones. Interrupted
+    transfers resume from the `.part` file with a Range request, and the
+    file is only moved to its final path once its size is verified.
+    """
+    remote = get_remote_info(download_url)
+    workspace = get_workspace()
+    output_path = get_cache_path(geonode_id, remote["etag"], remote["size"])
+    if output_path and os.path.exists(output_path) and (
+        remote["size"] is None
+        or os.path.getsize(output_path) == remote["size"]
+    ):
+        logger.info(f"Using cached raster {output_path}")
+        workspace.touch(output_path)
+        return output_path
+    cached = output_path is not None
+    if not cached:
+        output_path = os.path.join(cache_dir, filename)
+    os.makedirs(cache_dir, exist_ok=True)
+    workspace.reserve(remote["size"])
+
+    part_path = f"{output_path}.part"
+    with workspace.pin(part_path):
+        for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+            try:
+                expected_size = _fetch(
+                    download_url,
+                    part_path,
+                    remote["etag"],
+                    remote["size"],
+                )
+            except (
+                requests.ConnectionError,
+                requests.Timeout,
+                TransferError,
+            ) as e:
+                # Dropped connections and read timeouts, also mid-transfer
+                error = str(e)
+            else:
+                expected_size = expected_size or remote["size"]
+                size = os.path.getsize(part_path)
+                if expected_size is None or size == expected_size:
+                    os.replace(part_path, output_path)
+                    return output_path
+                if size > expected_size:
+                    os.remove(part_path)
+                    raise DownloadError(
+                        f"Download larger than expected: {size} of "
+                        f"{expected_size} bytes"
+                    )
+                error = (
+                    f"Incomplete download: {size} of {expected_size} bytes"
+                )
+            logger.warning(
+                f"Download of {download_url} interrupted "
+                f"(attempt {attempt}): {error}"
+            )
+    if not cached and os.path.exists(part_path):
+        # Only cached rasters have a stable path to resume into later
+        os.remove(part_path)
+    raise DownloadError(error)
+
+
+def vsicurl_options() -> dict:
+    """
+    GDAL options to read a remote GeoTIFF with HTTP range requests.
+    """
+    options = {
+        # Never list the "directory" of a download URL looking for sidecars
+        "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+        "GDAL_HTTP_TIMEOUT": DOWNLOAD_TIMEOUT[1],
+        "GDAL_HTTP_CONNECTTIMEOUT": DOWNLOAD_TIMEOUT[0],
+        "GDAL_HTTP_MAX_RETRY": 3,
+        "GDAL_HTTP_RETRY_DELAY": 1,
+        "GDAL_HTTP_MULTIRANGE": "YES",
+        "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+        "VSI_CACHE": "TRUE",
+    }
+    if not GEONODE_SSL_VERIFY:
+        options["GDAL_HTTP_UNSAFESSL"] = "YES"
+    return options
+
+
+@contextmanager
+def open_raster(download_url: str, filename: str, geonode_id: int = None):
+    """
+    Open a remote GeoTIFF in place through GDAL's /vsicurl/ range reader,
+    so only the blocks that are needed are fetched. When the server does
+    not allow it, the raster is downloaded (see `download_raster`) and
+    opened from disk instead.
+
+    Yields the dataset and how it was read, "vsicurl" or "download".
+    """
+    with ExitStack() as stack:
+        stack.enter_context(rasterio.Env(**vsicurl_options()))
+        try:
+            src = stack.enter_context(
+                rasterio.open(f"/vsicurl/{download_url}")
+            )
+            source = "vsicurl"
+        except RasterioIOError as e:
+            logger.warning(
+                f"Cannot read {download_url} in place, downloading it: {e}"
+            )
+            input_file = download_raster(download_url, filename, geonode_id)
+            stack.enter_context(get_workspace().pin(input_file))
+            src = stack.enter_context(rasterio.open(input_file))
+            source = "download"
+        yield src, source
@@ -1,11 +1,10 @@
 import logging
 import os
 import rasterio
-import geopandas as gpd
 import requests
+import time
 import numpy as np
-# from rasterstats import zonal_stats
-from rasterio.mask import mask
+from contextlib import ExitStack
 from time import sleep
 from datetime import datetime
 from django.utils import timezone
@@ -13,7 +12,26 @@ from django.conf import settings
 from django_q.tasks import async_task
 from api.v1.v1_jobs.models import Jobs
 from api.v1.v1_jobs.constants import JobStatus, JobTypes
-from api.v1.v1_publication.constants import GEONODE_SSL_VERIFY
+from api.v1.v1_jobs.downloads import (
+    DownloadError,
+    download_raster,
+    get_workspace,
+    open_raster,
+)
+from api.v1.v1_jobs.aggregators import (
+    DEFAULT_AGGREGATION,
+    get_aggregator,
+    zone_statistics,
+)
+from api.v1.v1_jobs.zonal_stats import (
+    track_processing,
+    track_stage,
+    zonal_statistics,
+)
+from api.v1.v1_publication.constants import (
+    ExportMapTypes,
+    PublicationStatus,
+)
 from api.v1.v1_users.models import SystemUser
 from api.v1.v1_publication.models import Publication
 from api.v1.v1_publication.serializers import (
@@ -21,11 +39,14 @@ from api.v1.v1_publication.serializers import (
     PublicationSerializer,
 )
 from api.v1.v1_publication.utils import get_category
+from api.v1.v1_publication.boundaries import boundary_store
+from api.v1.v1_publication.exports import get_or_create_export_artifact
 from utils.email_helper import send_email, EmailTypes
 
 # Set up logging
 logger = logging.getLogger(__name__)
 tmp_dir = "./tmp"
+label_grids_dir = os.path.join(tmp_dir, "label_grids")
 
 
 def demo_q_func(name: str):
@@ -156,25 +177,14 @@ def email_notification_results(task):
 def download_geonode_dataset(
     download_url: str,
     filename: str,
+    cdi_geonode_id: int = None,
 ):
-    # Create /tmp directory if it doesn't exist
-    if not os.path.exists(tmp_dir):
-        os.makedirs(tmp_dir)
-
-    # Download and store it in /tmp directory
-    input_file = os.path.join(tmp_dir, filename)
-    response = requests.get(download_url, stream=True, verify=GEONODE_SSL_VERIFY)
-    if response.status_code == 200:
-        with open(input_file, "wb") as f:
-            # Write the response in chunks to handle large files
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:  # Filter out keep-alive new chunks
-                    f.write(chunk)
-        return input_file
-    else:
+    # Rasters of a GeoNode dataset are cached, others land in ./tmp
+    try:
+        return download_raster(download_url, filename, cdi_geonode_id)
+    except (DownloadError, requests.RequestException) as e:
         logger.error(
-            f"Failed to download the file from {download_url}."
-            f"Status code: {response.status_code}"
+            f"Failed to download the file from {download_url}. {e}"
         )
         return False
 
@@ -188,20 +198,26 @@ def download_geonode_dataset_results(task):
     subject = job_info["subject"]
     message = job_info["message"]
 
-    input_file = os.path.join(tmp_dir, filename)
+    # Older tasks returned nothing useful, their file is named by the job
+    input_file = task.result if isinstance(task.result, str) \
+        else os.path.join(tmp_dir, filename)
 
     if task.success and os.path.exists(input_file):
         job.status = JobStatus.done
         job.available = timezone.now()
 
         # Create a job
-        job = Jobs.objects.create(
+        aggregation = job_info.get("aggregation") or DEFAULT_AGGREGATION
+        store_statistics = job_info.get("store_statistics", False)
+        cdi_job = Jobs.objects.create(
             type=JobTypes.initial_cdi_values,
             status=JobStatus.on_progress,
             info={
                 "id": publication_id,
                 "subject": subject,
                 "message": message,
+                "aggregation": aggregation,
+                "store_statistics": store_statistics,
             },
         )
         hook = "api.v1.v1_jobs.job.generate_initial_cdi_values_results"
@@ -209,20 +225,81 @@ def download_geonode_dataset_results(task):
             "api.v1.v1_jobs.job.generate_initial_cdi_values",
             publication_id,
             input_file,
+            aggregation,
+            store_statistics,
             hook=hook,
         )
         # Update the job with the task ID
-        job.task_id = task_id
-        job.save()
+        cdi_job.task_id = task_id
+        cdi_job.save()
     else:
         job.status = JobStatus.failed
     job.result = task.result
     job.save()
 
 
+def compute_initial_cdi_values(
+    src,
+    aggregation: str = DEFAULT_AGGREGATION,
+    store_statistics: bool = False,
+):
+    """
+    Initial value and category of every administration for an open CDI
+    raster, with the zonal statistics mode used.
+    """
+    # Administrations are decoded once per worker by the boundary store
+    gdf = boundary_store.get_geodataframe()
+    # Ensure the CRS of the GeoDataFrame and the raster are the same
+    gdf = gdf.to_crs(src.crs)
+    # All administrations are rasterized once (or the label grid of
+    # an earlier raster on the same grid is reused) and the raster
+    # is read windowed to the country, block by block when large
+    stats = zonal_statistics(
+        src,
+        gdf.geometry,
+        boundaries_checksum=boundary_store.checksum,
+        cache_dir=label_grids_dir,
+        max_window_pixels=settings.CDI_STREAMING_PIXELS,
+    )
+
+    # The aggregation strategy turns the zone statistics into the value
+    # used for the category, (min + mean) * 0.5 by default
+    values = get_aggregator(aggregation)(stats)
+    statistics = zone_statistics(stats) if store_statistics else None
+
+    results = []
+    for index, (admin_id, count, final_value) in enumerate(zip(
+        gdf["administration_id"].tolist(),
+        stats["count"],
+        values,
+    )):
+        if not count or np.isnan(final_value):
+            results.append({
+                "administration_id": admin_id,
+                "value": None,
+                "category": None
+            })
+            continue
+
+        category = get_category(final_value)
+
+        item = {
+            "administration_id": admin_id,
+            "value": float(final_value),
+            "category": category
+        }
+        if statistics:
+            item["statistics"] = statistics[index]
+        results.append(item)
+    return results, stats["mode"]
+
+
 def generate_initial_cdi_values(
     publication_id: int,
     input_file: str,
+    aggregation: str = DEFAULT_AGGREGATION,
+    store_statistics: bool = False,
+    trace_memory: bool = True,
 ):
     publication = Publication.objects.filter(
         pk=publication_id
@@ -232,93 +309,105 @@ def generate_initial_cdi_values(
             f"Publication with ID {publication_id} does not exist."
         )
         return False
-    # Read the topojson file to load all Administrations
-    topojson_file = "./source/eswatini.topojson"
-    gdf = gpd.read_file(topojson_file)
-
-    gdf.crs = "epsg:4326"
+    with track_processing(trace_memory) as processing, \
+            get_workspace().pin(input_file), \
+            rasterio.open(input_file) as src:
+        results, processing["mode"] = compute_initial_cdi_values(
+            src,
+            aggregation,
+            store_statistics,
+        )
+    processing["aggregation"] = aggregation
 
-    # Ensure the CRS of the GeoDataFrame and the raster are the same
-    with rasterio.open(input_file) as src:
-        gdf = gdf.to_crs(src.crs)
+    publication.initial_values = results
+    publication.save()
+    data = PublicationSerializer(publication).data
+    data["processing"] = processing
+    return data
 
-    # Custom zonal stats using rasterio and numpy
-    results = []
 
-    with rasterio.open(input_file) as src:
-        # Reproject GeoDataFrame to match raster CRS
-        gdf_reprojected = gdf.to_crs(src.crs)
-
-        for _, row in gdf_reprojected.iterrows():
-            geom = row["geometry"]
-            admin_id = row["administration_id"]
-
-            if geom.is_empty:
-                results.append({
-                    "administration_id": admin_id,
-                    "value": None,
-                    "category": None
-                })
-                continue
-
-            try:
-                # Mask the raster using the geometry
-                masked_arr, _ = mask(
-                    dataset=src,
-                    shapes=[geom],
-                    crop=True,
-                    nodata=src.nodata,
-                    filled=False  # returns a masked array
+def stream_initial_cdi_values(
+    publication_id: int,
+    download_url: str,
+    cdi_geonode_id: int = None,
+    aggregation: str = DEFAULT_AGGREGATION,
+    store_statistics: bool = False,
+):
+    """
+    Download and initial values in a single task: the raster is read in
+    place from GeoNode when it can be, without staging a file in ./tmp.
+    """
+    publication = Publication.objects.filter(
+        pk=publication_id
+    ).first()
+    if not publication:
+        logger.error(
+            f"Publication with ID {publication_id} does not exist."
+        )
+        return False
+    filename = "raster_{0}_{1}.tif".format(
+        cdi_geonode_id,
+        int(time.time())
+    )
+    stages = {}
+    with track_processing() as processing:
+        # Opening includes the download when the raster cannot be read
+        # in place; remote blocks are then fetched while computing
+        with ExitStack() as stack:
+            with track_stage(stages, "open"):
+                src, processing["source"] = stack.enter_context(
+                    open_raster(download_url, filename, cdi_geonode_id)
                 )
-            except ValueError:
-                # Handle invalid geometry or no overlap
-                results.append({
-                    "administration_id": admin_id,
-                    "value": None,
-                    "category": None
-                })
-                continue
-
-            # Flatten and get valid (unmasked) data
-            masked_arr = masked_arr[0]  # first band
-            valid_data = masked_arr.compressed()  # Get only unmasked values
-
-            if valid_data.size == 0:
-                results.append({
-                    "administration_id": admin_id,
-                    "value": None,
-                    "category": None
-                })
-                continue
-
-            # Use numpy.where to filter out missing data (-1 values)
-            positive_values = valid_data[np.where(valid_data >= 0)]
-
-            if positive_values.size == 0:
-                results.append({
-                    "administration_id": admin_id,
-                    "value": None,
-                    "category": None
-                })
-                continue
-
-            min_val = np.min(positive_values)
-            mean_val = np.mean(positive_values)
-
-            # Apply the formula (min + mean) * 0.5
-            final_value = (min_val + mean_val) * 0.5
-
-            category = get_category(final_value)
-
-            results.append({
-                "administration_id": admin_id,
-                "value": float(final_value),
-                "category": category
-            })
-
-    publication.initial_values = results
+            with track_stage(stages, "zonal_stats"):
+                results, processing["mode"] = compute_initial_cdi_values(
+                    src,
+                    aggregation,
+                    store_statistics,
+                )
+    processing["aggregation"] = aggregation
+
+    with track_stage(stages, "save"):
+        publication.initial_values = results
+        publication.save()
+    processing["stages"] = stages
+    data = PublicationSerializer(publication).data
+    data["processing"] = processing
+    return data
+
+
+def publish_seeded_publication(publication):
+    """
+    Publish a seeded publication with its initial values and queue the
+    pre-rendering of its downloadable maps.
+    """
+    publication.validated_values = publication.initial_values
+    publication.narrative = ""
+    publication.published_at = timezone.make_aware(
+        publication.due_date
+    ) if isinstance(publication.due_date, datetime) \
+        else timezone.make_aware(
+            datetime.combine(
+                publication.due_date,
+                datetime.min.time()
+            )
+        )
+    # The back-dated published_at alone leaves the published version as is
+    publication.updated_at = timezone.now()
     publication.save()
-    return PublicationSerializer(publication).data
+
+    export_job = Jobs.objects.create(
+        type=JobTypes.export_artifacts,
+        status=JobStatus.on_progress,
+        info={
+            "publication_id": publication.id,
+        },
+    )
+    export_job.task_id = async_task(
+        "api.v1.v1_jobs.job.generate_export_artifacts",
+        publication.id,
+        hook="api.v1.v1_jobs.job.generate_export_artifacts_results",
+    )
+    export_job.save()
 
 
 def generate_initial_cdi_values_results(task):
@@ -335,6 +424,9 @@ def generate_initial_cdi_values_results(task):
     if task.success and publication and len(publication.initial_values):
         job.status = JobStatus.done
         job.available = timezone.now()
+        if isinstance(task.result, dict) and task.result.get("processing"):
+            # Keep the timings of the task next to its parameters
+            job.info = {**job_info, "processing": task.result["processing"]}
 
         if not subject or not message:
             job.result = task.result
@@ -345,25 +437,14 @@ def generate_initial_cdi_values_results(task):
                 not publication.validated_values
             ):
                 # If this is from the seeder and no validated values, set them
-                publication.validated_values = publication.initial_values
-                publication.narrative = ""
-                publication.published_at = timezone.make_aware(
-                    publication.due_date
-                ) if isinstance(publication.due_date, datetime) \
-                    else timezone.make_aware(
-                        datetime.combine(
-                            publication.due_date,
-                            datetime.min.time()
-                        )
-                    )
-                publication.save()
+                publish_seeded_publication(publication)
 
             # No subject or message provided, so no email to send
             return
         # Send email to all reviewers
         for review in publication.reviews.all():
             # Create a job
-            job = Jobs.objects.create(
+            review_job = Jobs.objects.create(
                 type=JobTypes.review_request,
                 status=JobStatus.on_progress,
                 result=ReviewSerializer(review).data,
@@ -393,9 +474,48 @@ def generate_initial_cdi_values_results(task):
                 hook="api.v1.v1_jobs.job.email_notification_results",
             )
             # Update the job with the task ID
-            job.task_id = task_id
-            job.save()
+            review_job.task_id = task_id
+            review_job.save()
+
+    else:
+        job.status = JobStatus.failed
+    job.result = task.result
+    job.save()
+
+
+def generate_export_artifacts(publication_id: int):
+    publication = Publication.objects.filter(
+        pk=publication_id,
+        status=PublicationStatus.published,
+    ).first()
+    if not publication or not publication.validated_values:
+        logger.error(
+            f"Publication with ID {publication_id} is not published."
+        )
+        return False
+    artifacts = [
+        get_or_create_export_artifact(publication, export_type)
+        for export_type in ExportMapTypes.FieldStr.keys()
+    ]
+    return {
+        "publication_id": publication_id,
+        "artifacts": [
+            {
+                "export_type": artifact.export_type,
+                "filename": artifact.filename,
+                "checksum": artifact.checksum,
+            }
+            for artifact in artifacts
+        ],
+    }
+
 
+def generate_export_artifacts_results(task):
+    job = Jobs.objects.get(task_id=task.id)
+    job.attempt = job.attempt + 1
+    if task.success and task.result:
+        job.status = JobStatus.done
+        job.available = timezone.now()
     else:
         job.status = JobStatus.failed
     job.result = task.result
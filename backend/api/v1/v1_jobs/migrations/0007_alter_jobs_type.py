@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("v1_jobs", "0006_alter_jobs_type"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="jobs",
+            name="type",
+            field=models.IntegerField(
+                choices=[
+                    (1, "test"),
+                    (2, "verification_email"),
+                    (3, "forgot_password"),
+                    (4, "review_completed"),
+                    (5, "review_request"),
+                    (6, "initial_cdi_values"),
+                    (7, "download_geonode_dataset"),
+                    (8, "new_user_password_setup"),
+                    (9, "send_feedback"),
+                    (10, "export_artifacts"),
+                ]
+            ),
+        ),
+    ]
@@ -0,0 +1,136 @@
+import glob
+import logging
+import os
+import re
+import uuid
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PIN_SUFFIX = ".pin"
+# <raster path>.<pid>-<token>.pin
+re_pin = re.compile(r"^\.(\d+)-[0-9a-f]{32}" + re.escape(PIN_SUFFIX) + "$")
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class RasterWorkspace:
+    """
+    Size-bounded directory of downloaded rasters.
+
+    Every use of a raster touches its mtime, and when the directory grows
+    over `max_bytes` the least recently used rasters are evicted first.
+    Rasters pinned by a job, in this or any other worker process, are
+    never evicted; pins of processes that are gone are ignored.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _pins(self, path: str) -> list:
+        pins = []
+        for pin in glob.glob(f"{glob.escape(path)}.*{PIN_SUFFIX}"):
+            match = re_pin.match(pin[len(path):])
+            if match:
+                pins.append((pin, int(match.group(1))))
+        return pins
+
+    def is_pinned(self, path: str) -> bool:
+        for pin, pid in self._pins(path):
+            if _is_running(pid):
+                return True
+            # Left behind by a worker that died while using the raster
+            try:
+                os.remove(pin)
+            except FileNotFoundError:
+                pass
+        return False
+
+    @contextmanager
+    def pin(self, path: str):
+        """
+        Keep `path` from being evicted while the block runs.
+        """
+        pin = f"{path}.{os.getpid()}-{uuid.uuid4().hex}{PIN_SUFFIX}"
+        open(pin, "w").close()
+        try:
+            self.touch(path)
+            yield path
+        finally:
+            os.remove(pin)
+
+    def touch(self, path: str):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def entries(self) -> list:
+        """
+        Rasters and partial downloads as dicts with path, size, last_used
+        (a timestamp) and pinned, least recently used first.
+        """
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.name.endswith(PIN_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append({
+                "path": entry.path,
+                "size": stat.st_size,
+                "last_used": stat.st_mtime,
+                "pinned": self.is_pinned(entry.path),
+            })
+        return sorted(entries, key=lambda e: e["last_used"])
+
+    def usage(self) -> int:
+        return sum(entry["size"] for entry in self.entries())
+
+    def evict(self, max_bytes: int = None, dry_run: bool = False) -> list:
+        """
+        Remove the least recently used unpinned files until the workspace
+        fits in `max_bytes` (the workspace budget by default). Returns the
+        entries removed, or that would be with `dry_run`.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if max_bytes is None:
+            return []
+        entries = self.entries()
+        total = sum(entry["size"] for entry in entries)
+        evicted = []
+        for entry in entries:
+            if total <= max_bytes:
+                break
+            if entry["pinned"]:
+                continue
+            if not dry_run:
+                try:
+                    os.remove(entry["path"])
+                except FileNotFoundError:
+                    continue
+                logger.info(f"Evicted raster {entry['path']}")
+            total -= entry["size"]
+            evicted.append(entry)
+        return evicted
+
+    def reserve(self, size: int = None):
+        """
+        Make room for a new raster of `size` bytes.
+        """
+        if self.max_bytes is None:
+            return []
+        return self.evict(max(self.max_bytes - (size or 0), 0))
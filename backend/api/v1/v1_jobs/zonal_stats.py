@@ -0,0 +1,408 @@
+import hashlib
+import json
+import math
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import shapely
+from contextlib import contextmanager
+from rasterio.features import rasterize
+from rasterio.windows import (
+    Window,
+    WindowError,
+    from_bounds,
+    transform as window_transform,
+)
+from api.v1.v1_jobs.aggregators import (
+    CLASS_CATEGORIES,
+    HISTOGRAM_BINS,
+    HISTOGRAM_MAX,
+    classify,
+    histogram_bins,
+    histogram_high,
+    widen_histogram,
+)
+
+# Rows rasterized at once when a label grid is built straight to disk
+LABEL_STRIP_ROWS = 512
+
+
+@contextmanager
+def track_processing(trace_memory: bool = True):
+    """
+    Measure the duration and the peak memory traced by tracemalloc
+    (Python and numpy allocations) of the enclosed block.
+
+    tracemalloc is process-wide: callers running several blocks at once
+    in threads must pass `trace_memory=False`, only the duration is
+    reported then.
+    """
+    tracing = trace_memory and tracemalloc.is_tracing()
+    if trace_memory:
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    report = {}
+    start = time.perf_counter()
+    try:
+        yield report
+    finally:
+        report["duration"] = round(time.perf_counter() - start, 3)
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            report["peak_memory"] = peak
+            if not tracing:
+                tracemalloc.stop()
+
+
+@contextmanager
+def track_stage(stages: dict, name: str):
+    """
+    Add the duration of the enclosed block to `stages[name]`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = round(
+            stages.get(name, 0) + time.perf_counter() - start,
+            3
+        )
+
+
+def label_dtype(zones: int) -> str:
+    # 16-bit labels let numpy radix-sort them when grouping
+    return "uint16" if zones < np.iinfo("uint16").max else "int32"
+
+
+def rasterize_zones(geometries, out_shape, transform) -> np.ndarray:
+    """
+    Burn every geometry into a single label grid. Pixels take the
+    1-based position of the geometry they fall in, 0 means no zone.
+    """
+    geometries = list(geometries)
+    dtype = label_dtype(len(geometries))
+    shapes = [
+        (geometry, index + 1)
+        for index, geometry in enumerate(geometries)
+        if geometry is not None and not geometry.is_empty
+    ]
+    if not shapes:
+        return np.zeros(out_shape, dtype=dtype)
+    return rasterize(
+        shapes,
+        out_shape=out_shape,
+        transform=transform,
+        fill=0,
+        dtype=dtype,
+    )
+
+
+def zones_window(src, geometries):
+    """
+    Pixel window covering the bounds of all geometries, snapped outwards
+    to whole pixels and clipped to the raster. None when they do not
+    overlap the raster.
+    """
+    geometries = [g for g in geometries if g is not None and not g.is_empty]
+    if not geometries:
+        return None
+    window = from_bounds(
+        *shapely.total_bounds(np.asarray(geometries, dtype=object)),
+        transform=src.transform
+    )
+    col_off = math.floor(window.col_off)
+    row_off = math.floor(window.row_off)
+    window = Window(
+        col_off,
+        row_off,
+        math.ceil(window.col_off + window.width) - col_off,
+        math.ceil(window.row_off + window.height) - row_off,
+    )
+    try:
+        return window.intersection(Window(0, 0, src.width, src.height))
+    except WindowError:
+        return None
+
+
+def label_grid_key(src, window, boundaries_checksum: str) -> str:
+    """
+    Label grids only depend on the raster grid and the boundaries, so
+    every month of the same CDI product shares one grid.
+    """
+    signature = json.dumps([
+        src.crs.to_wkt() if src.crs else None,
+        list(src.transform)[:6],
+        src.width,
+        src.height,
+        [window.col_off, window.row_off, window.width, window.height],
+        boundaries_checksum,
+    ])
+    return hashlib.sha256(signature.encode("utf-8")).hexdigest()
+
+
+def _rasterize_to_file(geometries, out_shape, transform, strip_rows, path):
+    # The grid is burnt strip by strip straight into a memory-mapped file
+    labels = np.lib.format.open_memmap(
+        path,
+        mode="w+",
+        dtype=label_dtype(len(geometries)),
+        shape=tuple(out_shape),
+    )
+    height, width = out_shape
+    for row in range(0, height, strip_rows):
+        rows = min(strip_rows, height - row)
+        labels[row:row + rows] = rasterize_zones(
+            geometries,
+            (rows, width),
+            window_transform(Window(0, row, width, rows), transform),
+        )
+    labels.flush()
+    del labels
+
+
+def load_label_grid(
+    geometries,
+    out_shape,
+    transform,
+    cache_path=None,
+    strip_rows=None,
+):
+    """
+    Rasterize the zones, reusing the grid stored at `cache_path` (a
+    memory-mapped .npy file) when there is one.
+
+    With `strip_rows` the grid is never held in memory: it is rasterized
+    in strips into a file and returned memory-mapped.
+    """
+    if cache_path:
+        try:
+            labels = np.load(cache_path, mmap_mode="r")
+            if labels.shape == tuple(out_shape):
+                return labels
+        except (OSError, ValueError):
+            pass
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+    else:
+        cache_dir = None
+    if not cache_path and not strip_rows:
+        return rasterize_zones(geometries, out_shape, transform)
+
+    # Write to a private file first so readers never see partial grids
+    with tempfile.NamedTemporaryFile(
+        dir=cache_dir,
+        suffix=".npy.tmp",
+        delete=False
+    ) as f:
+        if not strip_rows:
+            np.save(f, rasterize_zones(geometries, out_shape, transform))
+    if strip_rows:
+        _rasterize_to_file(geometries, out_shape, transform, strip_rows, f.name)
+    if not cache_path:
+        labels = np.load(f.name, mmap_mode="r")
+        os.remove(f.name)
+        return labels
+    os.replace(f.name, cache_path)
+    return np.load(cache_path, mmap_mode="r")
+
+
+def grouped_stats(
+    labels,
+    values,
+    zones: int,
+    weights=None,
+    high: float = HISTOGRAM_MAX,
+) -> dict:
+    """
+    Per-zone count, sum, min, value histogram over [0, high] and
+    (weighted) area per drought class of `values`, grouped by `labels`.
+    Arrays are indexed by zone position (0-based) and min is NaN for
+    zones without values.
+    """
+    count = np.bincount(labels, minlength=zones + 1)[1:]
+    total = np.bincount(labels, weights=values, minlength=zones + 1)[1:]
+    minimum = np.full(zones, np.nan)
+    if labels.size:
+        order = np.argsort(labels, kind="stable")
+        sorted_labels = labels[order]
+        starts = np.flatnonzero(
+            np.r_[True, sorted_labels[1:] != sorted_labels[:-1]]
+        )
+        minimum[sorted_labels[starts] - 1] = np.minimum.reduceat(
+            values[order],
+            starts
+        )
+    offsets = labels.astype("int64")
+    bins = len(CLASS_CATEGORIES)
+    class_area = np.bincount(
+        offsets * bins + classify(values),
+        weights=weights,
+        minlength=(zones + 1) * bins,
+    ).reshape(zones + 1, bins)[1:]
+    histogram = np.bincount(
+        offsets * HISTOGRAM_BINS + histogram_bins(values, high),
+        minlength=(zones + 1) * HISTOGRAM_BINS,
+    ).reshape(zones + 1, HISTOGRAM_BINS)[1:]
+    return {
+        "count": count,
+        "sum": total,
+        "min": minimum,
+        "histogram": histogram,
+        "class_area": class_area,
+    }
+
+
+def pixel_areas(src, transform, shape) -> np.ndarray:
+    """
+    Relative area of the pixels of every row, as a column to broadcast.
+    Geographic pixels shrink with the cosine of their latitude.
+    """
+    if src.crs and src.crs.is_geographic:
+        rows = np.arange(shape[0]) + 0.5
+        latitudes = transform.f + transform.e * rows
+        return np.cos(np.radians(latitudes))[:, None]
+    return np.ones((shape[0], 1))
+
+
+def _accumulate(stats, labels, data, areas):
+    """
+    Fold one chunk of the band into the running per-zone statistics.
+    """
+    labels = np.asarray(labels)
+    valid = ~np.ma.getmaskarray(data) & (labels > 0)
+    values = np.ma.getdata(data)[valid]
+    positive = values >= 0
+    values = values[positive].astype("float64")
+    if values.size:
+        # Widen the histograms of the previous chunks to the new values
+        high = histogram_high(stats["histogram_max"], values.max())
+        stats["histogram"] = widen_histogram(
+            stats["histogram"], stats["histogram_max"], high
+        )
+        stats["histogram_max"] = high
+    chunk = grouped_stats(
+        labels[valid][positive],
+        values,
+        len(stats["count"]),
+        weights=np.broadcast_to(areas, valid.shape)[valid][positive],
+        high=stats["histogram_max"],
+    )
+    stats["count"] += chunk["count"]
+    stats["sum"] += chunk["sum"]
+    stats["min"] = np.fmin(stats["min"], chunk["min"])
+    stats["histogram"] += chunk["histogram"]
+    stats["class_area"] += chunk["class_area"]
+
+
+def _block_windows(src, window):
+    """
+    The raster's internal blocks clipped to `window`, relative to it.
+    Striped rasters are read several strips at a time.
+    """
+    block_height, block_width = src.block_shapes[0]
+    if block_width >= src.width:
+        rows = max(block_height, LABEL_STRIP_ROWS)
+        blocks = (
+            Window(0, row, src.width, rows)
+            for row in range(0, src.height, rows)
+        )
+    else:
+        blocks = (block for _, block in src.block_windows(1))
+    for block in blocks:
+        try:
+            block = block.intersection(window)
+        except WindowError:
+            continue
+        yield block, Window(
+            block.col_off - window.col_off,
+            block.row_off - window.row_off,
+            block.width,
+            block.height,
+        )
+
+
+def zonal_statistics(
+    src,
+    geometries,
+    boundaries_checksum: str = None,
+    cache_dir: str = None,
+    max_window_pixels: int = None,
+) -> dict:
+    """
+    Compute count, sum, min, mean, a value histogram and the area per
+    drought class of the first band for every geometry, with a single
+    read of the window covering all of them. See `aggregators` for the
+    strategies built on top of them.
+
+    With a `cache_dir` and the `boundaries_checksum`, the label grid is
+    stored there and reused by rasters sharing the same grid.
+
+    When the window holds more than `max_window_pixels`, the raster is
+    streamed block by block into running accumulators instead, so memory
+    stays bounded whatever the raster size. The mode used is returned as
+    `mode` ("window" or "block").
+
+    Nodata and negative (missing) pixels are ignored, matching what
+    `rasterio.mask.mask` followed by a `>= 0` filter gives per geometry.
+    """
+    geometries = list(geometries)
+    zones = len(geometries)
+    stats = {
+        "count": np.zeros(zones, dtype="int64"),
+        "sum": np.zeros(zones),
+        "min": np.full(zones, np.nan),
+        "histogram": np.zeros((zones, HISTOGRAM_BINS), dtype="int64"),
+        "histogram_max": HISTOGRAM_MAX,
+        "class_area": np.zeros((zones, len(CLASS_CATEGORIES))),
+        "mode": "window",
+    }
+    window = zones_window(src, geometries)
+    if window is not None:
+        out_shape = (int(window.height), int(window.width))
+        streaming = (
+            max_window_pixels is not None
+            and out_shape[0] * out_shape[1] > max_window_pixels
+        )
+        cache_path = None
+        if cache_dir and boundaries_checksum:
+            key = label_grid_key(src, window, boundaries_checksum)
+            cache_path = os.path.join(cache_dir, f"{key}.npy")
+        labels = load_label_grid(
+            geometries,
+            out_shape=out_shape,
+            transform=src.window_transform(window),
+            cache_path=cache_path,
+            strip_rows=(
+                max(src.block_shapes[0][0], LABEL_STRIP_ROWS)
+                if streaming else None
+            ),
+        )
+        areas = pixel_areas(src, src.window_transform(window), out_shape)
+        if streaming:
+            stats["mode"] = "block"
+            for block, relative in _block_windows(src, window):
+                rows, _ = relative.toslices()
+                _accumulate(
+                    stats,
+                    labels[relative.toslices()],
+                    src.read(1, window=block, masked=True),
+                    areas[rows],
+                )
+        else:
+            _accumulate(
+                stats,
+                labels,
+                src.read(1, window=window, masked=True),
+                areas,
+            )
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats["mean"] = np.where(
+            stats["count"] > 0,
+            stats["sum"] / stats["count"],
+            np.nan
+        )
+    return stats
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class V1PublicationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api.v1.v1_publication"
+
+    def ready(self):
+        from api.v1.v1_publication import signals  # noqa: F401
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import threading
+import geopandas as gpd
+import topojson as tp
+from shapely.geometry import mapping
+from api.v1.v1_publication.constants import BoundaryTier, BOUNDARY_TIERS
+from api.v1.v1_publication.topology import simplify_topology
+
+TOPOJSON_FILE = "./source/eswatini.topojson"
+TOPOJSON_OBJECT = "eswatini"
+BOUNDARY_COLUMNS = ["geometry", "administration_id", "name", "region"]
+
+
+class BoundaryStore:
+    """
+    Process-wide cache of the administration boundaries.
+
+    The TopoJSON source is decoded into a GeoDataFrame once per worker.
+    Every access compares the file's mtime; when it changed, the content
+    hash decides whether the boundaries really have to be rebuilt.
+    """
+
+    def __init__(self, path: str = TOPOJSON_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checksum = None
+        self._gdf = None
+        self._topology = None
+        self._tiers = {}
+        self._fragments = None
+        self._index = None
+
+    @property
+    def checksum(self) -> str:
+        self._refresh()
+        return self._checksum
+
+    def get_geodataframe(self) -> gpd.GeoDataFrame:
+        """
+        Return a copy of the base GeoDataFrame (geometry, administration_id,
+        name and region) that callers are free to extend.
+        """
+        self._refresh()
+        return self._gdf.copy()
+
+    def get_geometry_fragments(self) -> dict:
+        """
+        Serialized GeoJSON geometry of every administration, keyed by
+        administration_id, as (geometry, bytes) pairs. The geometry is the
+        shared object found in the GeoDataFrame copies, so callers can
+        check by identity that a row still holds the cached boundary.
+        """
+        self._refresh()
+        with self._lock:
+            if self._fragments is None:
+                self._fragments = {
+                    administration_id: (
+                        geometry,
+                        json.dumps(mapping(geometry)).encode("utf-8")
+                    )
+                    for administration_id, geometry in zip(
+                        self._gdf["administration_id"],
+                        self._gdf.geometry
+                    )
+                }
+            return self._fragments
+
+    def get_administration_index(self) -> list:
+        """
+        Sorted administration_ids, the stable order of the packed values
+        published in config.js.
+        """
+        self._refresh()
+        with self._lock:
+            if self._index is None:
+                self._index = sorted(
+                    int(administration_id)
+                    for administration_id in self._gdf["administration_id"]
+                )
+            return self._index
+
+    def get_topology(self, tier: str = BoundaryTier.full) -> dict:
+        """
+        The source TopoJSON, or its simplified and quantized copy for a
+        lower detail `tier`, built once per worker.
+        """
+        self._refresh()
+        with self._lock:
+            if tier not in self._tiers:
+                if tier == BoundaryTier.full:
+                    self._tiers[tier] = self._topology
+                else:
+                    tolerance, quantization = BOUNDARY_TIERS[tier]
+                    self._tiers[tier] = simplify_topology(
+                        self._topology, tolerance, quantization
+                    )
+            return self._tiers[tier]
+
+    def clear(self):
+        with self._lock:
+            self._mtime = None
+            self._checksum = None
+            self._gdf = None
+            self._topology = None
+            self._tiers = {}
+            self._fragments = None
+            self._index = None
+
+    def _refresh(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if self._gdf is not None and mtime == self._mtime:
+            return
+        with self._lock:
+            if self._gdf is not None and mtime == self._mtime:
+                return
+            with open(self.path, "rb") as f:
+                content = f.read()
+            checksum = hashlib.sha256(content).hexdigest()
+            if self._gdf is None or checksum != self._checksum:
+                self._topology = json.loads(content)
+                self._gdf = self._parse(content)
+                self._tiers = {}
+                self._fragments = None
+                self._index = None
+                self._checksum = checksum
+            self._mtime = mtime
+
+    def _parse(self, content: bytes) -> gpd.GeoDataFrame:
+        topology = tp.Topology(json.loads(content), object_name=TOPOJSON_OBJECT)
+        gdf = gpd.GeoDataFrame.from_features(
+            json.loads(topology.to_geojson())
+        )
+        if gdf.crs is None:
+            gdf.set_crs("EPSG:4326", inplace=True)
+        return gdf[BOUNDARY_COLUMNS]
+
+
+boundary_store = BoundaryStore()
@@ -0,0 +1,141 @@
+import gzip
+import hashlib
+import os
+import threading
+from urllib.parse import urlencode
+from django.core.management import call_command
+from django.http import HttpResponse, HttpResponseRedirect
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from api.v1.v1_publication.constants import (
+    CONFIG_MAX_AGE,
+    CONFIG_REDIRECT_MAX_AGE,
+    BoundaryTier,
+)
+from api.v1.v1_publication.exports import re_accepts_gzip
+
+CONFIG_DIR = "source/config"
+CONFIG_CONTENT_TYPE = "application/x-javascript; charset=utf-8"
+
+
+def get_config_path(tier: str) -> str:
+    return os.path.join(CONFIG_DIR, f"config.{tier}.min.js")
+
+
+def get_gzip_path(path: str) -> str:
+    return f"{path}.gz"
+
+
+def get_bundle_version(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+def write_config_bundle(content: str, path: str) -> str:
+    """
+    Write the minified config and its gzip variant next to it, and return
+    the content hash used to version the config.js URL.
+    """
+    content = content.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(content)
+    # No mtime in the header, the same config compresses to the same bytes
+    with open(get_gzip_path(path), "wb") as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    return get_bundle_version(content)
+
+
+class ConfigBundle:
+    """
+    Process-wide copy of a config.<tier>.min.js, its gzip variant and
+    version.
+
+    The bundle is written by generate_config at startup, each worker only
+    reads it once. It is generated here only when it is missing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._content = None
+        self._gzip_content = None
+        self._version = None
+
+    @property
+    def content(self) -> bytes:
+        self._load()
+        return self._content
+
+    @property
+    def gzip_content(self) -> bytes:
+        self._load()
+        return self._gzip_content
+
+    @property
+    def version(self) -> str:
+        self._load()
+        return self._version
+
+    def clear(self):
+        with self._lock:
+            self._content = None
+            self._gzip_content = None
+            self._version = None
+
+    def _load(self):
+        with self._lock:
+            if self._content is not None:
+                return
+            gzip_path = get_gzip_path(self.path)
+            if not (os.path.exists(self.path) and os.path.exists(gzip_path)):
+                call_command("generate_config")
+            with open(self.path, "rb") as f:
+                self._content = f.read()
+            with open(gzip_path, "rb") as f:
+                self._gzip_content = f.read()
+            self._version = get_bundle_version(self._content)
+
+
+config_bundles = {
+    tier: ConfigBundle(get_config_path(tier))
+    for tier in BoundaryTier.FieldStr
+}
+
+
+def config_response(request, tier: str = None):
+    """
+    Serve the config.js of a boundary `tier`, full detail unless a
+    client asks for a simplified one, under its content hash (`?v=`),
+    immutable and cached for good. Any other URL, as the unversioned
+    /config.js of the pages, is redirected to the current version.
+    """
+    bundle = config_bundles[tier or BoundaryTier.full]
+    if request.GET.get("v") != bundle.version:
+        params = {"tier": tier} if tier else {}
+        params["v"] = bundle.version
+        response = HttpResponseRedirect(f"?{urlencode(params)}")
+        patch_cache_control(
+            response, public=True, max_age=CONFIG_REDIRECT_MAX_AGE
+        )
+        return response
+
+    accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    use_gzip = re_accepts_gzip.search(accept_encoding)
+    # The compressed variant gets a weak ETag, as GZipMiddleware does
+    etag = f'"{bundle.version}"'
+    if use_gzip:
+        etag = f"W/{etag}"
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        content = bundle.gzip_content if use_gzip else bundle.content
+        response = HttpResponse(content, content_type=CONFIG_CONTENT_TYPE)
+        if use_gzip:
+            response["Content-Encoding"] = "gzip"
+        response["ETag"] = etag
+    patch_cache_control(
+        response, public=True, max_age=CONFIG_MAX_AGE, immutable=True
+    )
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
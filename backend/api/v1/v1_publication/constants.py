@@ -2,6 +2,23 @@ GEONODE_SSL_VERIFY = True
 # (connect, read) timeout in seconds for outbound GeoNode requests so a slow
 # or unresponsive upstream can never hang the request thread indefinitely.
 GEONODE_REQUEST_TIMEOUT = (10, 60)
+# Seconds GeoNode API responses are served from the cache, then served
+# stale for GEONODE_CACHE_STALE more while they are revalidated
+GEONODE_CACHE_TTL = 60
+GEONODE_CACHE_STALE = 300
+# Seconds the tallied review votes of a publication are cached, they are
+# keyed by the state of its reviews so they never go stale
+REVIEW_VOTES_CACHE_TTL = 60 * 60 * 24
+# Seconds the public published maps responses are cached server side, and
+# may be reused by browsers and CDNs before revalidating their ETag
+PUBLISHED_CACHE_TTL = 60 * 60 * 24
+PUBLISHED_CACHE_MAX_AGE = 60
+# Seconds config.js is cached by browsers: for good under its content hash
+# URL, briefly for the redirect of the unversioned URL to it
+CONFIG_MAX_AGE = 60 * 60 * 24 * 365
+CONFIG_REDIRECT_MAX_AGE = 60 * 5
+# Page size of the GeoNode resources API, also used for the local mirror
+GEONODE_PAGE_SIZE = 10
 
 
 class PublicationStatus:
@@ -80,3 +97,55 @@ class ExportMapTypes:
         png: "PNG",
         svg: "SVG",
     }
+
+
+class BulkExportTypes:
+    geojson = "geojson"
+    csv = "csv"
+    shapefile = "shapefile"
+
+    FieldStr = {
+        geojson: "GeoJSON",
+        csv: "CSV",
+        shapefile: "Shapefile",
+    }
+
+
+class PublishedMapView:
+    full = "full"
+    summary = "summary"
+
+    FieldStr = {
+        full: "Full",
+        summary: "Summary",
+    }
+
+
+class ValuesEncoding:
+    objects = "objects"
+    packed = "packed"
+
+    FieldStr = {
+        objects: "Objects",
+        packed: "Packed",
+    }
+
+
+class BoundaryTier:
+    overview = "overview"
+    default = "default"
+    full = "full"
+
+    FieldStr = {
+        overview: "Overview",
+        default: "Default",
+        full: "Full",
+    }
+
+
+# (simplification tolerance in degrees, quantization) of the simplified
+# boundary tiers, the full tier is the source topology as it is
+BOUNDARY_TIERS = {
+    BoundaryTier.overview: (0.002, 2000),
+    BoundaryTier.default: (0.0005, 10000),
+}
@@ -0,0 +1,57 @@
+import base64
+import hashlib
+import numpy as np
+from api.v1.v1_publication.boundaries import boundary_store
+from api.v1.v1_publication.constants import DroughtCategory
+
+# No Data, and administrations missing from the values
+PACKED_NO_DATA = -1
+
+
+def get_index_version(index: list) -> str:
+    return hashlib.sha256(
+        ",".join([str(i) for i in index]).encode("utf-8")
+    ).hexdigest()[:8]
+
+
+def pack_categories(values: list, index: list = None) -> str:
+    """
+    Categories of `values` as a base64 int8 vector, one byte per
+    administration in the order of `index` (the administration index
+    published in config.js by default).
+    """
+    if index is None:
+        index = boundary_store.get_administration_index()
+    positions = {
+        administration_id: position
+        for position, administration_id in enumerate(index)
+    }
+    packed = np.full(len(index), PACKED_NO_DATA, dtype=np.int8)
+    for value in values or []:
+        position = positions.get(value.get("administration_id"))
+        category = value.get("category")
+        if (
+            position is None
+            or category is None
+            or category == DroughtCategory.none
+        ):
+            continue
+        packed[position] = category
+    return base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+def unpack_categories(packed: str, index: list = None) -> list:
+    if index is None:
+        index = boundary_store.get_administration_index()
+    categories = np.frombuffer(base64.b64decode(packed), dtype=np.int8)
+    return [
+        {
+            "administration_id": administration_id,
+            "category": (
+                DroughtCategory.none
+                if category == PACKED_NO_DATA
+                else int(category)
+            ),
+        }
+        for administration_id, category in zip(index, categories)
+    ]
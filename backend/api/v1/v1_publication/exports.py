@@ -0,0 +1,500 @@
+import gzip
+import hashlib
+import json
+import logging
+import re
+import os
+import time
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from collections import namedtuple
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from zipfile import ZipFile, ZIP_DEFLATED
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PatchCollection
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch, PathPatch
+from matplotlib.path import Path as MplPath
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.utils.text import compress_sequence, compress_string
+from shapely.geometry import mapping
+from api.v1.v1_publication.boundaries import boundary_store
+from api.v1.v1_publication.constants import (
+    BulkExportTypes,
+    DroughtCategory,
+    DroughtCategoryColor,
+    ExportMapTypes,
+)
+from api.v1.v1_publication.models import ExportArtifact
+
+logger = logging.getLogger(__name__)
+
+ExportFile = namedtuple(
+    "ExportFile",
+    ["content", "content_type", "filename", "render_time"],
+    defaults=[None],
+)
+
+# Text exports that are worth compressing on the way out
+COMPRESSIBLE_CONTENT_TYPES = ["application/json", "image/svg+xml"]
+
+re_accepts_gzip = re.compile(r"\bgzip\b")
+
+SHAPEFILE_EXTENSIONS = ["shp", "shx", "dbf", "prj"]
+
+BULK_EXPORT_COLUMNS = [
+    "geometry",
+    "administration_id",
+    "name",
+    "region",
+    "year_month",
+    "category",
+    "cat_name",
+]
+
+
+def load_geodataframe(validated_values):
+    validated_dict = {
+        item["administration_id"]: item["category"]
+        for item in validated_values
+    }
+    # Boundaries are decoded once per worker by the boundary store
+    gdf = boundary_store.get_geodataframe()
+
+    # Map the categories to the GeoDataFrame
+    gdf["category"] = gdf["administration_id"].map(validated_dict)
+
+    # Add the "cat_name" column
+    gdf["cat_name"] = gdf["category"].map(
+        DroughtCategory.FieldStr.get
+    )
+
+    # Handle missing values
+    gdf["category"] = gdf["category"].fillna(DroughtCategory.none)
+    gdf["cat_name"] = gdf["cat_name"].fillna(
+        DroughtCategory.FieldStr[DroughtCategory.none]
+    )
+    return gdf
+
+
+def iter_geojson(gdf):
+    """
+    Stream the GeoDataFrame as a GeoJSON FeatureCollection.
+
+    Boundaries coming from the boundary store reuse their serialized
+    geometry, so only the per-publication properties are encoded here.
+    The output is identical to `gdf.to_json()`.
+    """
+    fragments = boundary_store.get_geometry_fragments()
+    geometry_name = gdf.geometry.name
+    properties = gdf.drop(columns=geometry_name)
+    properties = properties.astype(object).where(properties.notna(), None)
+
+    yield b'{"type": "FeatureCollection", "features": ['
+    rows = zip(gdf.index, properties.to_dict("records"), gdf.geometry)
+    for i, (index, props, geometry) in enumerate(rows):
+        cached = fragments.get(props.get("administration_id"))
+        if cached and cached[0] is geometry:
+            geometry_fragment = cached[1]
+        elif geometry is None:
+            geometry_fragment = b"null"
+        else:
+            geometry_fragment = json.dumps(mapping(geometry)).encode("utf-8")
+        feature = json.dumps({
+            "id": str(index),
+            "type": "Feature",
+            "properties": props,
+        }).encode("utf-8")
+        yield b"".join([
+            b", " if i else b"",
+            feature[:-1],
+            b', "geometry": ',
+            geometry_fragment,
+            b"}",
+        ])
+    yield b"]}"
+
+
+def export_geojson(gdf, year_month):
+    """
+    Export the GeoDataFrame as GeoJSON.
+    """
+    return ExportFile(
+        content=b"".join(iter_geojson(gdf)),
+        content_type="application/json",
+        filename=f"cdi_map_{year_month}.geojson",
+    )
+
+
+def _write_shapefile(gdf, directory, name):
+    # Rename `administration_id` column to `adm_id` in gdf
+    gdf = gdf.rename(columns={"administration_id": "adm_id"})
+    gdf.to_file(
+        os.path.join(directory, f"{name}.shp"),
+        driver="ESRI Shapefile"
+    )
+    # Manually create the .prj file if it doesn't exist
+    prj_path = os.path.join(directory, f"{name}.prj")
+    if not os.path.exists(prj_path):
+        with open(prj_path, "w") as prj_file:
+            prj_file.write(gdf.crs.to_wkt())
+
+
+def export_shapefile(gdf, year_month):
+    """
+    Export the GeoDataFrame as a Shapefile (zipped).
+    """
+    name = f"cdi_map_{year_month}"
+
+    # Each export writes its components into a private scratch directory,
+    # so concurrent downloads of the same month never share files
+    zip_buffer = BytesIO()
+    with TemporaryDirectory(prefix="cdi_shapefile_") as temp_dir, \
+            ZipFile(zip_buffer, "w") as zip_file:
+        _write_shapefile(gdf, temp_dir, name)
+        for ext in SHAPEFILE_EXTENSIONS:
+            zip_file.write(
+                os.path.join(temp_dir, f"{name}.{ext}"),
+                arcname=f"{name}.{ext}"
+            )
+
+    return ExportFile(
+        content=zip_buffer.getvalue(),
+        content_type="application/zip",
+        filename=f"{name}.zip",
+    )
+
+
+def _geometry_path(geometry):
+    """
+    Convert a (Multi)Polygon into a single compound matplotlib Path.
+    """
+    vertices = []
+    codes = []
+    for polygon in getattr(geometry, "geoms", [geometry]):
+        for ring in [polygon.exterior, *polygon.interiors]:
+            coords = np.asarray(ring.coords)[:, :2]
+            ring_codes = np.full(
+                len(coords),
+                MplPath.LINETO,
+                dtype=MplPath.code_type
+            )
+            ring_codes[0] = MplPath.MOVETO
+            ring_codes[-1] = MplPath.CLOSEPOLY
+            vertices.append(coords)
+            codes.append(ring_codes)
+    return MplPath(np.concatenate(vertices), np.concatenate(codes))
+
+
+def export_image(gdf, year_month, format):
+    """
+    Export the GeoDataFrame as an image (SVG or PNG).
+
+    All administrations are drawn in a single collection and the figure is
+    rendered through its own Agg canvas, so no pyplot global state is used
+    and concurrent renders are safe.
+    """
+    start = time.perf_counter()
+
+    # Ensure valid geometries
+    gdf = gdf[gdf.is_valid & ~gdf.geometry.is_empty]
+
+    # Precompute the fill colour of every administration; categories
+    # without a colour (No Data) are not drawn
+    colors = gdf["category"].map(DroughtCategoryColor.FieldStr)
+    drawn = colors.notna()
+
+    fig = Figure(figsize=(10, 10))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    ax.add_collection(PatchCollection(
+        [PathPatch(_geometry_path(g)) for g in gdf.geometry[drawn]],
+        facecolor=colors[drawn].tolist(),
+        edgecolor="black",
+    ))
+
+    # Fix aspect ratio and limits
+    bounds = gdf.total_bounds
+    ax.set_xlim(bounds[0], bounds[2])
+    ax.set_ylim(bounds[1], bounds[3])
+    if gdf.crs and gdf.crs.is_geographic:
+        y_coord = np.mean([bounds[1], bounds[3]])
+        ax.set_aspect(1 / np.cos(y_coord * np.pi / 180))
+    else:
+        ax.set_aspect("equal")
+
+    # Add legend to the plot
+    valid_categories = set(gdf["category"][drawn].unique())
+    legend_patches = [
+        Patch(
+            facecolor=color,
+            edgecolor="black",
+            label=DroughtCategory.FieldStr.get(category)
+        )
+        for category, color in DroughtCategoryColor.FieldStr.items()
+        if category in valid_categories
+    ]
+    if legend_patches:
+        ax.legend(
+            handles=legend_patches,
+            loc="upper right",
+            title="Drought Categories"
+        )
+
+    # Save as image
+    img_buffer = BytesIO()
+    fig.savefig(img_buffer, format=format, bbox_inches="tight")
+
+    render_time = time.perf_counter() - start
+    logger.info(
+        f"Rendered cdi_map_{year_month}.{format} in {render_time:.3f}s"
+    )
+    content_type = "image/svg+xml" if format == "svg" else "image/png"
+    return ExportFile(
+        content=img_buffer.getvalue(),
+        content_type=content_type,
+        filename=f"cdi_map_{year_month}.{format}",
+        render_time=render_time,
+    )
+
+
+def render_export(gdf, year_month, export_type):
+    if export_type == ExportMapTypes.geojson:
+        return export_geojson(gdf, year_month)
+    if export_type == ExportMapTypes.shapefile:
+        return export_shapefile(gdf, year_month)
+    if export_type in [ExportMapTypes.png, ExportMapTypes.svg]:
+        return export_image(gdf, year_month, export_type)
+    raise ValueError(f"Unsupported export type: {export_type}")
+
+
+def load_monthly_geodataframe(publications):
+    """
+    Long-format GeoDataFrame with one row per administration and month.
+
+    Boundaries are loaded once and the validated values of every month
+    are joined onto them in a single merge.
+    """
+    months = pd.DataFrame({
+        "year_month": [p.year_month.strftime("%Y-%m") for p in publications]
+    })
+    values = pd.DataFrame(
+        [
+            {
+                "year_month": p.year_month.strftime("%Y-%m"),
+                "administration_id": item["administration_id"],
+                "category": item["category"],
+            }
+            for p in publications
+            for item in p.validated_values or []
+        ],
+        columns=["year_month", "administration_id", "category"],
+    ).drop_duplicates(["year_month", "administration_id"], keep="last")
+
+    boundaries = boundary_store.get_geodataframe()
+    df = months.merge(
+        pd.DataFrame(boundaries),
+        how="cross"
+    ).merge(
+        values,
+        on=["year_month", "administration_id"],
+        how="left"
+    )
+    df["category"] = df["category"].fillna(DroughtCategory.none).astype(int)
+    df["cat_name"] = df["category"].map(DroughtCategory.FieldStr).fillna(
+        DroughtCategory.FieldStr[DroughtCategory.none]
+    )
+    return gpd.GeoDataFrame(
+        df[BULK_EXPORT_COLUMNS],
+        geometry="geometry",
+        crs=boundaries.crs,
+    )
+
+
+class _ZipStream:
+    """
+    Write-only sink for ZipFile; what has been written so far is drained
+    after every month so the archive can be streamed.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_bulk_shapefile(gdf):
+    """
+    Stream a zip archive holding one shapefile folder per month.
+    """
+    stream = _ZipStream()
+    with ZipFile(stream, "w", compression=ZIP_DEFLATED) as zip_file:
+        for year_month, month_gdf in gdf.groupby("year_month", sort=False):
+            name = f"cdi_map_{year_month}"
+            with TemporaryDirectory(prefix="cdi_shapefile_") as temp_dir:
+                _write_shapefile(
+                    month_gdf.drop(columns=["year_month"]),
+                    temp_dir,
+                    name
+                )
+                for ext in SHAPEFILE_EXTENSIONS:
+                    zip_file.write(
+                        os.path.join(temp_dir, f"{name}.{ext}"),
+                        arcname=f"{name}/{name}.{ext}"
+                    )
+            yield stream.drain()
+    yield stream.drain()
+
+
+def iter_bulk_csv(gdf):
+    """
+    Stream the long-format values as CSV, one month at a time.
+    """
+    columns = [c for c in BULK_EXPORT_COLUMNS if c != "geometry"]
+    yield (",".join(columns) + "\n").encode("utf-8")
+    for _, month_gdf in gdf.groupby("year_month", sort=False):
+        yield month_gdf[columns].to_csv(index=False, header=False).encode(
+            "utf-8"
+        )
+
+
+def bulk_export_response(request, gdf, export_type, filename):
+    """
+    Stream a multi-month export; text formats are gzipped on the fly when
+    the client accepts it.
+    """
+    if export_type == BulkExportTypes.shapefile:
+        response = StreamingHttpResponse(
+            iter_bulk_shapefile(gdf),
+            content_type="application/zip"
+        )
+        filename = f"{filename}.zip"
+    else:
+        if export_type == BulkExportTypes.csv:
+            content, content_type = iter_bulk_csv(gdf), "text/csv"
+        else:
+            content, content_type = iter_geojson(gdf), "application/json"
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        use_gzip = re_accepts_gzip.search(accept_encoding)
+        if use_gzip:
+            content = compress_sequence(content)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        if use_gzip:
+            response["Content-Encoding"] = "gzip"
+        patch_vary_headers(response, ("Accept-Encoding",))
+        filename = f"{filename}.{export_type}"
+    cd = f'attachment; filename="{filename}"'
+    response["Content-Disposition"] = cd
+    return response
+
+
+def get_artifact_version(publication):
+    """
+    Artifacts are keyed by what they render, the validated values and
+    month of the publication, and the boundaries they were rendered with.
+    Edits of any other field, as the narrative, keep them.
+    """
+    exported = json.dumps(
+        [publication.validated_values, str(publication.year_month)],
+        sort_keys=True,
+    )
+    return hashlib.sha256(
+        f"{exported}:{boundary_store.checksum}".encode("utf-8")
+    ).hexdigest()[:32]
+
+
+def find_export_artifact(publication, export_type):
+    return ExportArtifact.objects.filter(
+        publication=publication,
+        export_type=export_type,
+        version=get_artifact_version(publication),
+    ).defer("content", "gzip_content").first()
+
+
+def save_export_artifact(publication, export_type, export_file):
+    version = get_artifact_version(publication)
+    gzip_content = None
+    if export_file.content_type in COMPRESSIBLE_CONTENT_TYPES:
+        gzip_content = gzip.compress(export_file.content, mtime=0)
+    artifact, _ = ExportArtifact.objects.get_or_create(
+        publication=publication,
+        export_type=export_type,
+        version=version,
+        defaults={
+            "checksum": hashlib.sha256(export_file.content).hexdigest(),
+            "content_type": export_file.content_type,
+            "filename": export_file.filename,
+            "content": export_file.content,
+            "gzip_content": gzip_content,
+        },
+    )
+    # Drop artifacts rendered for a previous version of the publication
+    ExportArtifact.objects.filter(
+        publication=publication,
+        export_type=export_type,
+    ).exclude(version=version).delete()
+    return artifact
+
+
+def get_or_create_export_artifact(publication, export_type):
+    artifact = find_export_artifact(publication, export_type)
+    if artifact:
+        return artifact
+    gdf = load_geodataframe(publication.validated_values)
+    export_file = render_export(
+        gdf,
+        publication.year_month.strftime("%Y-%m"),
+        export_type
+    )
+    return save_export_artifact(publication, export_type, export_file)
+
+
+def export_artifact_response(request, artifact):
+    content_type = artifact.content_type
+    compressible = content_type in COMPRESSIBLE_CONTENT_TYPES
+    accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    use_gzip = compressible and re_accepts_gzip.search(accept_encoding)
+
+    # The compressed variant gets a weak ETag, as GZipMiddleware does
+    etag = f'"{artifact.checksum}"'
+    if use_gzip:
+        etag = f"W/{etag}"
+    last_modified = int(artifact.created_at.timestamp())
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified,
+    )
+    if response is None:
+        if use_gzip and artifact.gzip_content is not None:
+            content = bytes(artifact.gzip_content)
+        elif use_gzip:
+            # Stored before the gzip variant was kept
+            content = compress_string(bytes(artifact.content))
+        else:
+            content = bytes(artifact.content)
+        response = HttpResponse(content, content_type=content_type)
+        if use_gzip:
+            response["Content-Encoding"] = "gzip"
+        cd = f'attachment; filename="{artifact.filename}"'
+        response["Content-Disposition"] = cd
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+    if compressible:
+        patch_vary_headers(response, ("Accept-Encoding",))
+    return response
@@ -0,0 +1,341 @@
+import hashlib
+import logging
+import threading
+import time
+import requests
+from collections import namedtuple
+from datetime import timezone as dt_timezone
+from urllib.parse import quote
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import DateField, F, OuterRef, Subquery
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from requests.adapters import HTTPAdapter
+from api.v1.v1_publication.constants import (
+    GEONODE_CACHE_STALE,
+    GEONODE_CACHE_TTL,
+    GEONODE_REQUEST_TIMEOUT,
+    GEONODE_SSL_VERIFY,
+)
+from api.v1.v1_publication.models import GeonodeResource, Publication
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "geonode"
+VALIDATORS = {
+    "ETag": "If-None-Match",
+    "Last-Modified": "If-Modified-Since",
+}
+
+GeonodeResponse = namedtuple("GeonodeResponse", ["status_code", "data"])
+
+SYNC_PAGE_SIZE = 100
+RESOURCE_URL_FIELDS = [
+    "detail_url",
+    "embed_url",
+    "thumbnail_url",
+    "download_url",
+]
+RESOURCE_DATE_FIELDS = ["created", "date", "last_updated"]
+MIRROR_SORT_FIELDS = {
+    "year_month": "sort_year_month",
+    "created": "created",
+    "title": "title",
+    "status": "status",
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Session shared by every request thread, so connections to GeoNode
+    (and their TLS handshakes) are pooled and reused.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.verify = GEONODE_SSL_VERIFY
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def get_auth():
+    return (
+        settings.GEONODE_ADMIN_USERNAME,
+        settings.GEONODE_ADMIN_PASSWORD,
+    )
+
+
+def get_cache_key(url: str, auth=None) -> str:
+    # The URL holds the category, page and filters of the request
+    user = auth[0] if auth else ""
+    digest = hashlib.sha256(f"{user}:{url}".encode("utf-8")).hexdigest()
+    return f"{CACHE_PREFIX}:{digest}"
+
+
+def _fetch(url: str, auth=None, entry: dict = None):
+    """
+    Request `url`, conditionally when there is a cached `entry`. Returns
+    the response and the entry to cache, None when it is not cacheable.
+    """
+    headers = {}
+    for header, condition in VALIDATORS.items():
+        if entry and entry["validators"].get(header):
+            headers[condition] = entry["validators"][header]
+    response = get_session().get(
+        url,
+        auth=auth,
+        headers=headers,
+        timeout=GEONODE_REQUEST_TIMEOUT,
+    )
+    if response.status_code == 304 and entry:
+        return response, {**entry, "fetched_at": time.time()}
+    if response.status_code != 200:
+        return response, None
+    validators = {}
+    for header in VALIDATORS:
+        value = response.headers.get(header)
+        if isinstance(value, str):
+            validators[header] = value
+    return response, {
+        "data": response.json(),
+        "validators": validators,
+        "fetched_at": time.time(),
+    }
+
+
+def _store(key: str, entry: dict):
+    cache.set(key, entry, timeout=GEONODE_CACHE_TTL + GEONODE_CACHE_STALE)
+
+
+def revalidate(key: str, url: str, auth=None, entry: dict = None):
+    try:
+        _, new_entry = _fetch(url, auth, entry)
+        if new_entry:
+            _store(key, new_entry)
+    except requests.RequestException as e:
+        # The stale response keeps being served until it expires
+        logger.warning(f"Failed to revalidate {url}: {e}")
+    finally:
+        cache.delete(f"{key}:revalidating")
+
+
+def revalidate_in_background(key: str, url: str, auth=None, entry=None):
+    # Only one revalidation of the same response at a time
+    if cache.add(f"{key}:revalidating", True, GEONODE_REQUEST_TIMEOUT[1]):
+        threading.Thread(
+            target=revalidate,
+            args=(key, url, auth, entry),
+            daemon=True,
+        ).start()
+
+
+def get_resources(url: str, auth=None) -> GeonodeResponse:
+    """
+    GET a GeoNode API `url` through a short-lived cache.
+
+    Responses are fresh for GEONODE_CACHE_TTL seconds. For the next
+    GEONODE_CACHE_STALE seconds they are still served right away while a
+    conditional request (ETag / Last-Modified) refreshes them in the
+    background, so a slow GeoNode never blocks the caller. Errors are not
+    cached, and a stale response is preferred over an unreachable GeoNode.
+    """
+    key = get_cache_key(url, auth)
+    entry = cache.get(key)
+    if entry:
+        age = time.time() - entry["fetched_at"]
+        if age >= GEONODE_CACHE_TTL:
+            revalidate_in_background(key, url, auth, entry)
+        return GeonodeResponse(200, entry["data"])
+    try:
+        response, entry = _fetch(url, auth)
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch {url}: {e}")
+        return GeonodeResponse(503, None)
+    if not entry:
+        return GeonodeResponse(response.status_code, None)
+    _store(key, entry)
+    return GeonodeResponse(200, entry["data"])
+
+
+def get_resources_by_ids(ids: list) -> GeonodeResponse:
+    """
+    GET the GeoNode resources of `ids` in a single (cached) request. The
+    data is a dict of the resources by their integer pk.
+    """
+    url = "{0}/api/v2/resources?{1}&page_size={2}".format(
+        settings.GEONODE_BASE_URL,
+        "&".join([f"filter{{pk.in}}={pk}" for pk in sorted(ids)]),
+        len(ids),
+    )
+    response = get_resources(url, auth=get_auth())
+    if response.status_code != 200:
+        return response
+    return GeonodeResponse(
+        200,
+        {
+            int(resource["pk"]): resource
+            for resource in response.data.get("resources", [])
+            if int(resource["pk"]) in ids
+        },
+    )
+
+
+def _parse_date(value):
+    value = parse_datetime(value) if isinstance(value, str) else None
+    if value and not settings.USE_TZ:
+        value = timezone.make_naive(value, dt_timezone.utc)
+    return value
+
+
+def get_sync_url(category: str, page: int, since=None) -> str:
+    url = (
+        "{0}/api/v2/resources"
+        "?filter{{category.identifier}}={1}"
+        "&filter{{subtype}}=raster&page={2}&page_size={3}"
+        "&sort[]=last_updated"
+        .format(
+            settings.GEONODE_BASE_URL,
+            category,
+            page,
+            SYNC_PAGE_SIZE,
+        )
+    )
+    if since:
+        url = "{0}&filter{{last_updated.gte}}={1}".format(
+            url,
+            quote(since.isoformat())
+        )
+    return url
+
+
+def sync_resources(category: str, full: bool = False) -> dict:
+    """
+    Mirror the raster datasets of a GeoNode category into GeonodeResource.
+
+    Only the resources updated since the latest `last_updated` already
+    mirrored are requested. A `full` sync fetches them all and also
+    removes the resources that are gone from GeoNode.
+    """
+    mirrored = GeonodeResource.objects.filter(category=category)
+    since = None
+    if not full:
+        latest = mirrored.exclude(last_updated=None).order_by(
+            "-last_updated"
+        ).first()
+        since = latest.last_updated if latest else None
+    seen = []
+    page = 1
+    while True:
+        response = get_session().get(
+            get_sync_url(category, page, since),
+            auth=get_auth(),
+            timeout=GEONODE_REQUEST_TIMEOUT,
+        )
+        if response.status_code != 200:
+            raise requests.HTTPError(
+                f"Failed to fetch page {page}: {response.status_code}"
+            )
+        data = response.json()
+        resources = data.get("resources", [])
+        GeonodeResource.objects.bulk_create(
+            [
+                GeonodeResource(
+                    geonode_id=int(resource["pk"]),
+                    category=category,
+                    title=resource.get("title") or "",
+                    **{
+                        field: resource.get(field)
+                        for field in RESOURCE_URL_FIELDS
+                    },
+                    **{
+                        field: _parse_date(resource.get(field))
+                        for field in RESOURCE_DATE_FIELDS
+                    },
+                )
+                for resource in resources
+            ],
+            update_conflicts=True,
+            unique_fields=["geonode_id"],
+            update_fields=[
+                "category",
+                "title",
+                *RESOURCE_URL_FIELDS,
+                *RESOURCE_DATE_FIELDS,
+                "synced_at",
+            ],
+        )
+        seen += [int(resource["pk"]) for resource in resources]
+        page_size = data.get("page_size", len(resources)) or 1
+        if not resources or page * page_size >= data.get("total", 0):
+            break
+        page += 1
+    deleted = 0
+    if full:
+        deleted, _ = mirrored.exclude(geonode_id__in=seen).delete()
+    return {"category": category, "synced": len(seen), "deleted": deleted}
+
+
+def is_mirrored(category: str) -> bool:
+    return GeonodeResource.objects.filter(category=category).exists()
+
+
+def mirrored_resources(
+    category: str = None,
+    publication_status: int = None,
+    sort: str = None,
+    sort_order: str = "desc",
+):
+    """
+    Mirrored resources joined with their publication (publication_id,
+    status and year_month), filtered and sorted in the database.
+    """
+    publications = Publication.objects.filter(
+        cdi_geonode_id=OuterRef("geonode_id")
+    )
+    queryset = GeonodeResource.objects.annotate(
+        publication_id=Subquery(publications.values("pk")[:1]),
+        status=Subquery(publications.values("status")[:1]),
+        publication_year_month=Subquery(
+            publications.values("year_month")[:1]
+        ),
+        sort_year_month=Coalesce(
+            F("publication_year_month"),
+            Cast("date", DateField()),
+        ),
+    )
+    if category:
+        queryset = queryset.filter(category=category)
+    if publication_status:
+        queryset = queryset.filter(status=publication_status)
+    field = F(MIRROR_SORT_FIELDS.get(sort, "date"))
+    ordering = field.asc(nulls_first=True) if sort_order == "asc" \
+        else field.desc(nulls_last=True)
+    return queryset.order_by(ordering, "-geonode_id")
+
+
+def mirrored_resource_data(resource) -> dict:
+    """
+    A row of `mirrored_resources` in the shape of a GeoNode resource
+    merged with its publication, for CDIGeonodeListSerializer.
+    """
+    return {
+        "pk": resource.geonode_id,
+        "title": resource.title,
+        **{field: getattr(resource, field) for field in RESOURCE_URL_FIELDS},
+        "created": resource.created,
+        "year_month": (
+            resource.publication_year_month
+            or (resource.date.isoformat() if resource.date else None)
+        ),
+        "publication_id": resource.publication_id,
+        "status": resource.status,
+    }
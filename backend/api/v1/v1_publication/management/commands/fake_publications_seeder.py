@@ -279,6 +279,7 @@ class Command(BaseCommand):
 
                 review.suggestion_values = suggestion_values
                 review.save()
+            publication.update_review_counters()
 
         if not settings.TEST_ENV:
             self.stdout.write(self.style.SUCCESS(  # pragma: no cover
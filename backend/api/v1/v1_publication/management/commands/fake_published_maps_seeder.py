@@ -227,6 +227,7 @@ class Command(BaseCommand):
 
                         review.suggestion_values = suggestion_values
                         review.save()
+                    publication.update_review_counters()
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f"Error: {e}"))
                 continue
@@ -1,22 +1,42 @@
+import json
 from django.core.management import BaseCommand
 from django.conf import settings
 from jsmin import jsmin
+from api.v1.v1_publication.boundaries import boundary_store
+from api.v1.v1_publication.config_bundle import (
+    get_config_path,
+    write_config_bundle,
+)
+from api.v1.v1_publication.constants import BoundaryTier
+from api.v1.v1_publication.encoding import get_index_version
 
 
 class Command(BaseCommand):
     def handle(self, *args, **options):
-        topojson = open("source/eswatini.topojson").read()
+        # Order of the packed values of the public map APIs
+        index = boundary_store.get_administration_index()
 
-        min_config = jsmin(
-            "".join(
-                [
-                    "var topojson=",
-                    topojson,
-                    ";",
-                ]
+        # One bundle per boundary tier, from overview to full detail
+        for tier in BoundaryTier.FieldStr:
+            topojson = json.dumps(
+                boundary_store.get_topology(tier), separators=(",", ":")
             )
-        )
-        open("source/config/config.min.js", "w").write(min_config)
+            min_config = jsmin(
+                "".join(
+                    [
+                        "var topojson=",
+                        topojson,
+                        ";",
+                        "var administration_index=",
+                        json.dumps(index),
+                        ";",
+                        "var administration_index_version=",
+                        json.dumps(get_index_version(index)),
+                        ";",
+                    ]
+                )
+            )
+            write_config_bundle(min_config, get_config_path(tier))
         if not settings.TEST_ENV:
             self.stdout.write(self.style.SUCCESS(
                 "config.js successfully generated!"
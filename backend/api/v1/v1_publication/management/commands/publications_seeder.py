@@ -1,10 +1,20 @@
+import json
+import os
 import requests
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta, datetime
 from django.core.management.base import BaseCommand
 from django.conf import settings
+from django.db import connection
 from django.utils import timezone
 from django_q.tasks import async_task
+from api.v1.v1_jobs.job import (
+    download_geonode_dataset,
+    generate_initial_cdi_values,
+    publish_seeded_publication,
+)
 from api.v1.v1_jobs.models import Jobs, JobStatus, JobTypes
 from api.v1.v1_publication.models import Publication
 from api.v1.v1_publication.constants import (
@@ -13,6 +23,41 @@ from api.v1.v1_publication.constants import (
     PublicationStatus,
 )
 
+BACKFILL_CHECKPOINT = "./tmp/publications_backfill.json"
+
+
+def get_resources_url(category: str, page: int) -> str:
+    return (
+        "{0}/api/v2/resources"
+        "?filter{{category.identifier}}={1}"
+        "&filter{{subtype}}=raster&page={2}&sort[]=-date"
+        .format(
+            settings.GEONODE_BASE_URL,
+            category,
+            page,
+        )
+    )
+
+
+def fetch_resources_page(category: str, page: int):
+    return requests.get(
+        get_resources_url(category, page),
+        auth=(
+            settings.GEONODE_ADMIN_USERNAME,
+            settings.GEONODE_ADMIN_PASSWORD,
+        ),
+        verify=GEONODE_SSL_VERIFY,
+    )
+
+
+def get_due_date(resource):
+    date_str = resource.get('date', '')[:10]
+    try:
+        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+        return date_obj + timedelta(days=30)
+    except ValueError:
+        return datetime.today()
+
 
 class Command(BaseCommand):
     help = "Generates publication data"
@@ -27,10 +72,34 @@ class Command(BaseCommand):
             default=CDIGeonodeCategory.cdi,
             type=str,
         )
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            help=(
+                "Fetch all pages concurrently and download and process "
+                "the rasters in this process instead of queueing tasks"
+            ),
+        )
+        parser.add_argument(
+            "-w",
+            "--workers",
+            default=4,
+            type=int,
+            help="Concurrent page fetches and raster jobs for --backfill",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=BACKFILL_CHECKPOINT,
+            type=str,
+            help="Checkpoint file used to resume an interrupted --backfill",
+        )
 
     def handle(self, *args, **kwargs):
         self.stdout.write("Starting publication data generation...")
-        self.create_publications(**kwargs)
+        if kwargs.get("backfill"):
+            self.backfill_publications(**kwargs)
+        else:
+            self.create_publications(**kwargs)
         self.stdout.write(
             self.style.SUCCESS("Publication data generation completed.")
         )
@@ -39,25 +108,9 @@ class Command(BaseCommand):
         # Recursively fetch all pages from Geonode API
         category = kwargs.get("category", CDIGeonodeCategory.cdi)
 
-        username = settings.GEONODE_ADMIN_USERNAME
-        password = settings.GEONODE_ADMIN_PASSWORD
         page = 1
         while True:
-            url = (
-                "{0}/api/v2/resources"
-                "?filter{{category.identifier}}={1}"
-                "&filter{{subtype}}=raster&page={2}&sort[]=-date"
-                .format(
-                    settings.GEONODE_BASE_URL,
-                    category,
-                    page,
-                )
-            )
-            response = requests.get(
-                url,
-                auth=(username, password),
-                verify=GEONODE_SSL_VERIFY,
-            )
+            response = fetch_resources_page(category, page)
             if response.status_code != 200:
                 self.stdout.write(
                     self.style.ERROR(
@@ -73,21 +126,9 @@ class Command(BaseCommand):
                     cdi_geonode_id=resource['pk']
                 ).first()
                 if publication:
-                    if not publication.validated_values:
-                        publication.validated_values = (
-                            publication.initial_values
-                        )
-                        publication.narrative = ""
-                        publication.published_at = timezone.make_aware(
-                            publication.due_date
-                        ) if isinstance(publication.due_date, datetime) \
-                            else timezone.make_aware(
-                                datetime.combine(
-                                    publication.due_date,
-                                    datetime.min.time()
-                                )
-                            )
-                        publication.save()
+                    if publication.initial_values and \
+                            not publication.validated_values:
+                        publish_seeded_publication(publication)
                     self.stdout.write(
                         self.style.WARNING(
                             f"Publication with cdi_geonode_id "
@@ -97,18 +138,11 @@ class Command(BaseCommand):
                     continue
 
                 # Create new publication if it doesn't exist
-                date_str = resource.get('date', '')[:10]
-                try:
-                    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                    due_date = date_obj + timedelta(days=30)
-                except ValueError:
-                    due_date = datetime.today()
-
                 publication = Publication(
                     cdi_geonode_id=int(resource['pk']),
                     year_month=resource.get('date', '')[:7] + '-01',
                     initial_values={},
-                    due_date=due_date,
+                    due_date=get_due_date(resource),
                     status=PublicationStatus.published
                 )
                 publication.save()
@@ -134,6 +168,7 @@ class Command(BaseCommand):
                     "api.v1.v1_jobs.job.download_geonode_dataset",
                     resource['download_url'],
                     filename,
+                    publication.cdi_geonode_id,
                     hook=f"api.v1.v1_jobs.job.{hook}",
                 )
                 # Update the job with the task ID
@@ -145,3 +180,210 @@ class Command(BaseCommand):
             if page * page_size >= total_count or not resources:
                 break
             page += 1
+
+    def fetch_all_resources(self, category: str, workers: int) -> list:
+        """
+        Fetch the first page to learn the page count, then the remaining
+        pages concurrently.
+        """
+        response = fetch_resources_page(category, 1)
+        if response.status_code != 200:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"Failed to fetch page 1: {response.status_code}"
+                )
+            )
+            return []
+        data = response.json()
+        resources = data.get("resources", [])
+        page_size = data.get("page_size", len(resources)) or 1
+        pages = -(-data.get("total", 0) // page_size)
+        if pages <= 1 or not resources:
+            return resources
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(fetch_resources_page, category, page): page
+                for page in range(2, pages + 1)
+            }
+            for future in as_completed(futures):
+                response = future.result()
+                if response.status_code != 200:
+                    self.stdout.write(
+                        self.style.ERROR(
+                            f"Failed to fetch page {futures[future]}: "
+                            f"{response.status_code}"
+                        )
+                    )
+                    continue
+                resources += response.json().get("resources", [])
+        return resources
+
+    def backfill_publications(self, **kwargs):
+        category = kwargs.get("category", CDIGeonodeCategory.cdi)
+        workers = max(kwargs.get("workers") or 1, 1)
+        self.checkpoint_path = kwargs.get("checkpoint") or BACKFILL_CHECKPOINT
+        self.checkpoint = self.load_checkpoint()
+        self.checkpoint_lock = threading.Lock()
+
+        resources = {
+            int(resource["pk"]): resource
+            for resource in self.fetch_all_resources(category, workers)
+        }
+        self.stdout.write(f"Fetched {len(resources)} resources")
+
+        # Resolve every existing publication with a single query
+        existing = Publication.objects.in_bulk(
+            list(resources),
+            field_name="cdi_geonode_id"
+        )
+        for publication in existing.values():
+            if publication.initial_values and \
+                    not publication.validated_values:
+                publish_seeded_publication(publication)
+
+        Publication.objects.bulk_create([
+            Publication(
+                cdi_geonode_id=pk,
+                year_month=resource.get('date', '')[:7] + '-01',
+                initial_values={},
+                due_date=get_due_date(resource),
+                status=PublicationStatus.published
+            )
+            for pk, resource in resources.items()
+            if pk not in existing
+        ])
+
+        # New publications, and those an interrupted run did not finish
+        done = set(self.checkpoint["done"])
+        pending = [
+            publication
+            for publication in Publication.objects.filter(
+                cdi_geonode_id__in=list(resources)
+            ).order_by("-year_month")
+            if not publication.initial_values
+            and publication.cdi_geonode_id not in done
+        ]
+        jobs = Jobs.objects.bulk_create([
+            Jobs(
+                type=JobTypes.initial_cdi_values,
+                status=JobStatus.on_progress,
+                info={
+                    "id": publication.id,
+                    "subject": None,
+                    "message": None,
+                    "is_seeder": True,
+                    "backfill": True,
+                },
+            )
+            for publication in pending
+        ])
+
+        self.completed = 0
+        self.total = len(pending)
+        self.write_progress()
+        tasks = [
+            (
+                publication,
+                job,
+                resources[publication.cdi_geonode_id]["download_url"]
+            )
+            for publication, job in zip(pending, jobs)
+        ]
+        if workers == 1:
+            for task in tasks:
+                self.process_publication(*task)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for future in [
+                    executor.submit(self.process_in_thread, *task)
+                    for task in tasks
+                ]:
+                    future.result()
+        self.stdout.write("")
+        failed = self.checkpoint["failed"]
+        if failed:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{len(failed)} rasters failed, re-run to retry: "
+                    f"{', '.join(failed)}"
+                )
+            )
+
+    def process_in_thread(self, *args):
+        try:
+            self.process_publication(*args)
+        finally:
+            # Worker threads open their own connection, release it
+            connection.close()
+
+    def process_publication(self, publication, job, download_url):
+        pk = publication.cdi_geonode_id
+        try:
+            input_file = download_geonode_dataset(
+                download_url,
+                "raster_{0}_{1}.tif".format(pk, int(time.time())),
+                pk,
+            )
+            if not input_file:
+                raise ValueError(f"Failed to download {download_url}")
+            # tracemalloc is process-wide, the threads would reset and
+            # stop each other's tracing
+            result = generate_initial_cdi_values(
+                publication.id,
+                input_file,
+                trace_memory=False,
+            )
+            publication.refresh_from_db()
+            if not publication.initial_values:
+                raise ValueError("No initial values generated")
+            if not publication.validated_values:
+                publish_seeded_publication(publication)
+            job.status = JobStatus.done
+            job.available = timezone.now()
+            job.result = result
+            error = None
+        except Exception as e:
+            job.status = JobStatus.failed
+            job.result = {"error": str(e)}
+            error = str(e)
+        job.attempt = job.attempt + 1
+        job.save()
+        self.save_checkpoint(pk, error)
+
+    def load_checkpoint(self) -> dict:
+        checkpoint = {"done": [], "failed": {}}
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                checkpoint.update(json.load(f))
+            # Failed rasters are retried on every run
+            checkpoint["failed"] = {}
+        return checkpoint
+
+    def save_checkpoint(self, pk: int, error: str = None):
+        with self.checkpoint_lock:
+            if error:
+                self.checkpoint["failed"][str(pk)] = error
+            else:
+                self.checkpoint["done"].append(pk)
+            directory = os.path.dirname(self.checkpoint_path) or "."
+            os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.checkpoint_path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(self.checkpoint, f)
+            os.replace(temp_path, self.checkpoint_path)
+            self.completed += 1
+            self.write_progress()
+
+    def write_progress(self):
+        width = 30
+        filled = width * self.completed // self.total if self.total else width
+        self.stdout.write(
+            "\r[{0}{1}] {2}/{3}".format(
+                "#" * filled,
+                "." * (width - filled),
+                self.completed,
+                self.total,
+            ),
+            ending="",
+        )
+        self.stdout.flush()
@@ -0,0 +1,95 @@
+import glob
+import os
+from datetime import datetime
+from django.core.management.base import BaseCommand
+from api.v1.v1_jobs import downloads
+
+
+def format_size(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    for unit in ["KB", "MB", "GB"]:
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+
+
+class Command(BaseCommand):
+    help = "Report and prune the downloaded rasters kept by the workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Evict the least recently used rasters over the budget",
+        )
+        parser.add_argument(
+            "--max-bytes",
+            type=int,
+            help="Budget to prune to instead of RASTER_CACHE_MAX_BYTES",
+        )
+        parser.add_argument(
+            "--legacy",
+            action="store_true",
+            help=(
+                "Also delete the timestamped rasters older downloads left "
+                "in the tmp directory"
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list what would be deleted",
+        )
+
+    def handle(self, *args, **kwargs):
+        workspace = downloads.get_workspace()
+        dry_run = kwargs.get("dry_run")
+        entries = workspace.entries()
+        self.stdout.write(
+            "{0}: {1} files, {2} of {3}, {4} pinned".format(
+                workspace.directory,
+                len(entries),
+                format_size(sum(e["size"] for e in entries)),
+                format_size(workspace.max_bytes),
+                len([e for e in entries if e["pinned"]]),
+            )
+        )
+        if kwargs.get("verbosity", 1) > 1:
+            for entry in entries:
+                self.stdout.write(
+                    "  {0}  {1:>10}  {2}{3}".format(
+                        datetime.fromtimestamp(entry["last_used"])
+                        .strftime("%Y-%m-%d %H:%M"),
+                        format_size(entry["size"]),
+                        os.path.basename(entry["path"]),
+                        " (pinned)" if entry["pinned"] else "",
+                    )
+                )
+
+        removed = []
+        if kwargs.get("prune"):
+            removed += workspace.evict(
+                max_bytes=kwargs.get("max_bytes"),
+                dry_run=dry_run,
+            )
+        if kwargs.get("legacy"):
+            for path in glob.glob(
+                os.path.join(downloads.download_dir, "raster_*.tif")
+            ):
+                if workspace.is_pinned(path):
+                    continue
+                entry = {"path": path, "size": os.path.getsize(path)}
+                if not dry_run:
+                    os.remove(path)
+                removed.append(entry)
+        if kwargs.get("prune") or kwargs.get("legacy"):
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "{0} {1} files, {2}".format(
+                        "Would delete" if dry_run else "Deleted",
+                        len(removed),
+                        format_size(sum(e["size"] for e in removed)),
+                    )
+                )
+            )
@@ -0,0 +1,44 @@
+import requests
+from django.core.management.base import BaseCommand
+from api.v1.v1_publication.constants import CDIGeonodeCategory
+from api.v1.v1_publication.geonode import sync_resources
+
+
+class Command(BaseCommand):
+    help = "Sync the local mirror of the GeoNode raster datasets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-c",
+            "--category",
+            action="append",
+            choices=list(CDIGeonodeCategory.FieldStr.keys()),
+            help="Category to sync, all of them by default",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Fetch every resource and remove those gone from GeoNode",
+        )
+
+    def handle(self, *args, **kwargs):
+        categories = kwargs.get("category") or list(
+            CDIGeonodeCategory.FieldStr.keys()
+        )
+        for category in categories:
+            try:
+                result = sync_resources(category, full=kwargs.get("full"))
+            except requests.RequestException as e:
+                self.stdout.write(
+                    self.style.ERROR(f"Failed to sync {category}: {e}")
+                )
+                continue
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "{0}: {1} synced, {2} deleted".format(
+                        category,
+                        result["synced"],
+                        result["deleted"],
+                    )
+                )
+            )
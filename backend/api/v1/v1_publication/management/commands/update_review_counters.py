@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+from api.v1.v1_publication.models import (
+    Publication,
+    Review,
+    count_reviewed,
+)
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized review counters of the publications"
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            reviews = []
+            for review in Review.objects.only(
+                "pk", "suggestion_values"
+            ).iterator(chunk_size=BATCH_SIZE):
+                review.reviewed_count = count_reviewed(
+                    review.suggestion_values
+                )
+                reviews.append(review)
+            Review.objects.bulk_update(
+                reviews,
+                ["reviewed_count"],
+                batch_size=BATCH_SIZE,
+            )
+
+            publications = []
+            for publication in Publication.objects_with_deleted.annotate(
+                total=Count("reviews"),
+                completed=Count(
+                    "reviews",
+                    filter=Q(reviews__is_completed=True)
+                ),
+            ).only("pk"):
+                publication.reviews_total = publication.total
+                publication.reviews_completed = publication.completed
+                publications.append(publication)
+            Publication.objects_with_deleted.bulk_update(
+                publications,
+                ["reviews_total", "reviews_completed"],
+                batch_size=BATCH_SIZE,
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Updated the counters of {0} publications and {1} reviews"
+                .format(len(publications), len(reviews))
+            )
+        )
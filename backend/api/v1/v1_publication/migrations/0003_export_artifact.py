@@ -0,0 +1,58 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("v1_publication", "0002_review_is_overdue_notified"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportArtifact",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "export_type",
+                    models.CharField(
+                        choices=[
+                            ("geojson", "GeoJSON"),
+                            ("shapefile", "Shapefile"),
+                            ("png", "PNG"),
+                            ("svg", "SVG"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("version", models.CharField(max_length=64)),
+                ("checksum", models.CharField(max_length=64)),
+                ("content_type", models.CharField(max_length=100)),
+                ("filename", models.CharField(max_length=255)),
+                ("content", models.BinaryField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "publication",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="export_artifacts",
+                        to="v1_publication.publication",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "export_artifacts",
+                "unique_together": {("publication", "export_type", "version")},
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("v1_publication", "0003_export_artifact"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GeonodeResource",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("geonode_id", models.IntegerField(unique=True)),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[
+                            ("cdi-raster-map", "CDI Raster Map"),
+                            ("spi-raster-map", "SPI Raster Map"),
+                            ("ndvi-raster-map", "NDVI Raster Map"),
+                            ("lst-raster-map", "LST Raster Map"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("title", models.CharField(max_length=255)),
+                (
+                    "detail_url",
+                    models.URLField(blank=True, max_length=500, null=True),
+                ),
+                (
+                    "embed_url",
+                    models.URLField(blank=True, max_length=500, null=True),
+                ),
+                (
+                    "thumbnail_url",
+                    models.URLField(blank=True, max_length=500, null=True),
+                ),
+                (
+                    "download_url",
+                    models.URLField(blank=True, max_length=500, null=True),
+                ),
+                ("created", models.DateTimeField(blank=True, null=True)),
+                ("date", models.DateTimeField(blank=True, null=True)),
+                ("last_updated", models.DateTimeField(blank=True, null=True)),
+                ("synced_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "geonode_resources",
+                "indexes": [
+                    models.Index(
+                        fields=["category", "-date"],
+                        name="geonode_res_categor_71df05_idx",
+                    ),
+                    models.Index(
+                        fields=["category", "last_updated"],
+                        name="geonode_res_categor_e0b654_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
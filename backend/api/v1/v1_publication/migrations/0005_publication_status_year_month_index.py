@@ -0,0 +1,20 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("v1_publication", "0004_geonode_resource"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="publication",
+            index=models.Index(
+                fields=["status", "year_month"],
+                name="publication_status_7dbe4a_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("v1_publication", "0005_publication_status_year_month_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="reviews_completed",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="publication",
+            name="reviews_total",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="review",
+            name="reviewed_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("v1_publication", "0006_review_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exportartifact",
+            name="gzip_content",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
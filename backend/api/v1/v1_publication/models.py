@@ -1,8 +1,13 @@
 from django.db import models
+from django.db.models import Count, Q
 from django.core.exceptions import ValidationError
 from utils.soft_deletes_model import SoftDeletes
 from api.v1.v1_users.models import SystemUser
-from api.v1.v1_publication.constants import PublicationStatus
+from api.v1.v1_publication.constants import (
+    PublicationStatus,
+    ExportMapTypes,
+    CDIGeonodeCategory,
+)
 
 
 class Administration(models.Model):
@@ -38,6 +43,12 @@ def validate_json_values(json_values: list = []):
         #     )
 
 
+def count_reviewed(suggestion_values: list = None) -> int:
+    return sum(
+        1 for item in suggestion_values or [] if item.get("reviewed") is True
+    )
+
+
 class Publication(SoftDeletes):
     year_month = models.DateField(null=False)
     cdi_geonode_id = models.IntegerField(null=False, unique=True)
@@ -59,6 +70,9 @@ class Publication(SoftDeletes):
     narrative = models.TextField(null=True, blank=True)
     bulletin_url = models.URLField(max_length=255, null=True, blank=True)
     published_at = models.DateTimeField(null=True, blank=True)
+    # Denormalized from the reviews, see update_review_counters
+    reviews_total = models.PositiveIntegerField(default=0)
+    reviews_completed = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(null=True, blank=True)
 
@@ -75,8 +89,24 @@ class Publication(SoftDeletes):
             completed_at__isnull=False,
         )
 
+    def update_review_counters(self):
+        """
+        Recount reviews_total and reviews_completed from the reviews, to be
+        called in the transaction that adds or completes a review.
+        """
+        counters = self.reviews.aggregate(
+            reviews_total=Count("pk"),
+            reviews_completed=Count("pk", filter=Q(is_completed=True)),
+        )
+        Publication.objects_with_deleted.filter(pk=self.pk).update(**counters)
+        for field, value in counters.items():
+            setattr(self, field, value)
+
     class Meta:
         db_table = "publications"
+        indexes = [
+            models.Index(fields=["status", "year_month"]),
+        ]
 
 
 class Review(models.Model):
@@ -99,9 +129,76 @@ class Review(models.Model):
     updated_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     is_overdue_notified = models.BooleanField(default=False)
+    # Number of suggestion_values marked as reviewed
+    reviewed_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"Review: {self.publication.year_month} by {self.user.email}"
 
+    def save(self, *args, **kwargs):
+        self.reviewed_count = count_reviewed(self.suggestion_values)
+        update_fields = kwargs.get("update_fields")
+        if update_fields and "suggestion_values" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "reviewed_count"}
+        super().save(*args, **kwargs)
+
     class Meta:
         db_table = "reviews"
+
+
+class ExportArtifact(models.Model):
+    publication = models.ForeignKey(
+        Publication,
+        on_delete=models.CASCADE,
+        related_name="export_artifacts"
+    )
+    export_type = models.CharField(
+        max_length=20,
+        choices=ExportMapTypes.FieldStr.items()
+    )
+    version = models.CharField(max_length=64)
+    checksum = models.CharField(max_length=64)
+    content_type = models.CharField(max_length=100)
+    filename = models.CharField(max_length=255)
+    content = models.BinaryField()
+    # Served to clients accepting gzip, for the compressible content types
+    gzip_content = models.BinaryField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"ExportArtifact: {self.filename}"
+
+    class Meta:
+        db_table = "export_artifacts"
+        unique_together = ("publication", "export_type", "version")
+
+
+class GeonodeResource(models.Model):
+    """
+    Local mirror of the GeoNode raster datasets, kept up to date by the
+    sync_geonode_resources command.
+    """
+    geonode_id = models.IntegerField(unique=True)
+    category = models.CharField(
+        max_length=50,
+        choices=CDIGeonodeCategory.FieldStr.items()
+    )
+    title = models.CharField(max_length=255)
+    detail_url = models.URLField(max_length=500, null=True, blank=True)
+    embed_url = models.URLField(max_length=500, null=True, blank=True)
+    thumbnail_url = models.URLField(max_length=500, null=True, blank=True)
+    download_url = models.URLField(max_length=500, null=True, blank=True)
+    created = models.DateTimeField(null=True, blank=True)
+    date = models.DateTimeField(null=True, blank=True)
+    last_updated = models.DateTimeField(null=True, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"GeonodeResource: {self.geonode_id} - {self.title}"
+
+    class Meta:
+        db_table = "geonode_resources"
+        indexes = [
+            models.Index(fields=["category", "-date"]),
+            models.Index(fields=["category", "last_updated"]),
+        ]
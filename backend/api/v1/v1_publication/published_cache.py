@@ -0,0 +1,85 @@
+import hashlib
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from rest_framework.response import Response
+from api.v1.v1_publication.constants import (
+    PUBLISHED_CACHE_MAX_AGE,
+    PUBLISHED_CACHE_TTL,
+)
+from api.v1.v1_publication.models import Publication
+
+CACHE_PREFIX = "published"
+
+
+def get_published_version() -> str:
+    """
+    Version of the published content, it changes whenever a publication
+    is created, updated (published or not), soft or hard deleted.
+    """
+    stamps = Publication.objects_with_deleted.aggregate(
+        total=Count("pk"),
+        updated_at=Max("updated_at"),
+        published_at=Max("published_at"),
+        deleted_at=Max("deleted_at"),
+    )
+    return hashlib.sha256(
+        ":".join(
+            [str(stamps[key]) for key in sorted(stamps)]
+        ).encode("utf-8")
+    ).hexdigest()[:32]
+
+
+def get_cache_key(request, version: str) -> str:
+    params = "&".join(
+        [
+            f"{key}={value}"
+            for key, values in sorted(request.GET.lists())
+            for value in values
+        ]
+    )
+    renderer = getattr(request, "accepted_renderer", None)
+    # Paginated bodies hold absolute next / previous links
+    digest = hashlib.sha256(
+        "{0}:{1}://{2}{3}?{4}:{5}".format(
+            version,
+            request.scheme,
+            request.get_host(),
+            request.path,
+            params,
+            renderer.format if renderer else "",
+        ).encode("utf-8")
+    ).hexdigest()
+    return f"{CACHE_PREFIX}:{digest}"
+
+
+def published_response(request, build) -> Response:
+    """
+    Serve the response of a public endpoint from the cache.
+
+    The key (and strong ETag) is made of the published content version,
+    the URL (scheme and host included) and the query params, so any
+    change to the publications selects a new entry. If-None-Match is
+    answered with a 304 before anything else is queried. Only 200
+    responses of `build()` are cached.
+    """
+    key = get_cache_key(request, get_published_version())
+    etag = '"{0}"'.format(key.split(":")[-1][:32])
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        data = cache.get(key)
+        if data is None:
+            response = build()
+            if response.status_code != 200:
+                return response
+            data = response.data
+            cache.set(key, data, timeout=PUBLISHED_CACHE_TTL)
+        response = Response(data)
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=PUBLISHED_CACHE_MAX_AGE)
+    patch_vary_headers(response, ("Accept",))
+    return response
@@ -2,7 +2,6 @@ from django.utils import timezone
 from rest_framework import serializers
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
-from collections import defaultdict
 from .models import (
     Administration,
     Publication,
@@ -18,15 +17,23 @@ from utils.custom_serializer_fields import (
     CustomChoiceField,
     CustomJSONField,
     CustomDateField,
+    CustomBooleanField,
 )
 from api.v1.v1_users.serializers import UserReviewerSerializer
+from api.v1.v1_jobs.aggregators import AGGREGATORS, is_valid_aggregation
 from api.v1.v1_users.models import SystemUser, UserRoleTypes
 from api.v1.v1_publication.constants import (
-    DroughtCategory,
     ExportMapTypes,
+    BulkExportTypes,
     CDIGeonodeCategory,
     PublicationStatus,
+    PublishedMapView,
+    ValuesEncoding,
+    BoundaryTier,
 )
+from api.v1.v1_publication.boundaries import boundary_store
+from api.v1.v1_publication.encoding import get_index_version, pack_categories
+from api.v1.v1_publication.votes import get_review_votes
 
 
 class AdministrationSerializer(serializers.ModelSerializer):
@@ -49,9 +56,7 @@ class PublicationSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(OpenApiTypes.STR)
     def get_progress_reviews(self, obj):
-        total_reviews = obj.reviews.count()
-        total_completed = obj.reviews.filter(is_completed=True).count()
-        return f"{total_completed}/{total_reviews}"
+        return f"{obj.reviews_completed}/{obj.reviews_total}"
 
     @extend_schema_field(OpenApiTypes.ANY)
     def get_reviewers(self, obj):
@@ -118,12 +123,8 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(OpenApiTypes.STR)
     def get_progress_review(self, obj):
-        suggestion_values = obj.suggestion_values or []
-        reviewed_count = sum(
-            1 for item in suggestion_values if item.get("reviewed") is True
-        )
         total = len(obj.publication.initial_values)
-        return f"{reviewed_count}/{total}"
+        return f"{obj.reviewed_count}/{total}"
 
     # Add suggestion_values validation on create and update
     # to ensure category is not None when reviewed is True
@@ -175,17 +176,12 @@ class ReviewListSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(OpenApiTypes.STR)
     def get_progress_review(self, obj):
-        # Filter for suggestion values where reviewed is True
-        suggestion_values = obj.suggestion_values or []
-        reviewed_count = sum(
-            1 for item in suggestion_values if item.get('reviewed') is True
-        )
         # total = len(list(filter(
         #     lambda x: x["category"] != DroughtCategory.none,
         #     obj.publication.initial_values
         # )))
         total = len(obj.publication.initial_values)
-        return f"{reviewed_count}/{total}"
+        return f"{obj.reviewed_count}/{total}"
 
     class Meta:
         model = Review
@@ -265,69 +261,26 @@ class PublicationReviewsSerializer(serializers.ModelSerializer):
     reviews = serializers.SerializerMethodField()
     users = serializers.SerializerMethodField()
 
+    def get_completed_reviews(self, obj):
+        # Prefetched along with their users by PublicationReviewsAPI
+        if hasattr(obj, "completed_review_list"):
+            return obj.completed_review_list
+        return obj.completed_reviews.select_related("user")
+
     @extend_schema_field(OpenApiTypes.ANY)
     def get_reviews(self, obj):
-        non_disputed = self.context.get("non_disputed", False)
-        non_validated = self.context.get("non_validated", False)
-        validated_values = obj.validated_values or []
-        no_data_ids = [
-            v["administration_id"]
-            # for v in list(filter(
-            #     lambda x: x["category"] == DroughtCategory.none,
-            #     obj.initial_values
-            # ))
-            for v in obj.initial_values
-        ]
-        non_validated_ids = [
-            v["administration_id"]
-            for v in list(filter(
-                lambda x: (
-                    x.get("category") is None
-                    or x["administration_id"] not in no_data_ids
-                ),
-                validated_values
-            ))
-        ]
-
-        reviews = [
-            {
-                **s,
-                "user_id": review.user.id,
-            }
-            for review in obj.completed_reviews
-            for s in review.suggestion_values
-        ]
-
-        if non_disputed:
-            filtered_reviews = []
-            grouped_reviews = defaultdict(list)
-            reviews = reviews + obj.initial_values
-            for review in reviews:
-                if review["category"] != DroughtCategory.none:
-                    grouped_reviews[review["administration_id"]].append(review)
-            for _, admin_reviews in grouped_reviews.items():
-                categories = {r["category"] for r in admin_reviews}
-                if len(categories) == 1:
-                    filtered_reviews.extend(admin_reviews)
-            reviews = filtered_reviews
-
-        if non_validated and (
-            len(non_validated_ids) or
-            len(non_validated_ids) == 0 and len(obj.validated_values)
-        ):
-            reviews = [
-                r for r in reviews
-                if r["administration_id"] in non_validated_ids
-            ]
-
-        return reviews
+        votes = get_review_votes(obj, self.get_completed_reviews(obj))
+        return votes.get_reviews(
+            non_disputed=self.context.get("non_disputed", False),
+            non_validated=self.context.get("non_validated", False),
+        )
 
     @extend_schema_field(OpenApiTypes.ANY)
     def get_users(self, obj):
         return UserReviewerSerializer(
             instance=[
                 r.user
-                for r in obj.completed_reviews
+                for r in self.get_completed_reviews(obj)
             ],
             many=True
         ).data
@@ -355,6 +308,8 @@ class CreatePublicationSerializer(serializers.ModelSerializer):
     subject = CustomCharField()
     message = CustomCharField()
     download_url = CustomCharField()
+    aggregation = CustomCharField(required=False)
+    store_statistics = CustomBooleanField(required=False, default=False)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -378,6 +333,14 @@ class CreatePublicationSerializer(serializers.ModelSerializer):
             )
         return value
 
+    def validate_aggregation(self, value):
+        if value and not is_valid_aggregation(value):
+            raise serializers.ValidationError(
+                "Unknown aggregation, use one of "
+                f"{', '.join(AGGREGATORS.keys())} or pN (e.g. p25)."
+            )
+        return value
+
     def to_representation(self, instance):
         return PublicationSerializer(instance).data
 
@@ -392,6 +355,8 @@ class CreatePublicationSerializer(serializers.ModelSerializer):
             "subject",
             "message",
             "download_url",
+            "aggregation",
+            "store_statistics",
         ]
         read_only_fields = ["created_at", "updated_at"]
 
@@ -426,8 +391,55 @@ class ExportMapSerializer(serializers.Serializer):
         ]
 
 
+class BulkExportMapSerializer(serializers.Serializer):
+    export_type = CustomChoiceField(
+        choices=list(BulkExportTypes.FieldStr.keys()),
+        required=False,
+        allow_null=True,
+    )
+    start_date = CustomDateField(required=False)
+    end_date = CustomDateField(required=False)
+
+    def validate(self, attrs):
+        start_date = attrs.get("start_date")
+        end_date = attrs.get("end_date")
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError(
+                "start_date must be before end_date."
+            )
+        return attrs
+
+    class Meta:
+        fields = [
+            "export_type",
+            "start_date",
+            "end_date",
+        ]
+
+
 class PublishedMapSerializer(serializers.ModelSerializer):
 
+    def __init__(self, *args, **kwargs):
+        # Only serialize the given fields, when any
+        fields = kwargs.pop("fields", None)
+        super(PublishedMapSerializer, self).__init__(*args, **kwargs)
+        if fields:
+            for field in set(self.fields) - set(fields):
+                self.fields.pop(field)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        encoding = self.context.get("encoding")
+        if encoding == ValuesEncoding.packed and "validated_values" in data:
+            # One int8 category per administration of config.js index
+            index = boundary_store.get_administration_index()
+            data["packed_values"] = pack_categories(
+                data.pop("validated_values"),
+                index
+            )
+            data["index_version"] = get_index_version(index)
+        return data
+
     class Meta:
         model = Publication
         fields = [
@@ -441,14 +453,74 @@ class PublishedMapSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        # Without the heavy validated_values and narrative
+        summary_fields = [
+            "id",
+            "cdi_geonode_id",
+            "year_month",
+            "published_at",
+            "bulletin_url",
+            "created_at",
+            "updated_at",
+        ]
 
 
-class CompareMapSerializer(serializers.Serializer):
+class MapEncodingSerializer(serializers.Serializer):
+    encoding = CustomChoiceField(
+        choices=list(ValuesEncoding.FieldStr.keys()),
+        required=False,
+    )
+
+    class Meta:
+        fields = ["encoding"]
+
+
+class ConfigTierSerializer(serializers.Serializer):
+    tier = CustomChoiceField(
+        choices=list(BoundaryTier.FieldStr.keys()),
+        required=False,
+    )
+
+    class Meta:
+        fields = ["tier"]
+
+
+class CompareMapSerializer(MapEncodingSerializer):
     left_date = CustomDateField(required=False)
     right_date = CustomDateField(required=False)
+    view = CustomChoiceField(
+        choices=list(PublishedMapView.FieldStr.keys()),
+        required=False,
+    )
+    fields = CustomCharField(required=False)
+
+    def validate_fields(self, value):
+        fields = [f.strip() for f in value.split(",") if f.strip()]
+        unknown = set(fields) - set(PublishedMapSerializer.Meta.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown fields: {', '.join(sorted(unknown))}."
+            )
+        return fields
+
+    def get_map_fields(self):
+        """
+        The PublishedMapSerializer fields to list, `fields` taking
+        precedence over `view`, always with the id.
+        """
+        fields = self.validated_data.get("fields")
+        if not fields:
+            view = self.validated_data.get("view", PublishedMapView.full)
+            fields = PublishedMapSerializer.Meta.summary_fields \
+                if view == PublishedMapView.summary \
+                else PublishedMapSerializer.Meta.fields
+        return ["id", *[f for f in fields if f != "id"]]
 
     class Meta:
         fields = [
             "left_date",
-            "right_date"
+            "right_date",
+            "view",
+            "fields",
+            "encoding",
         ]
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from api.v1.v1_publication.models import Publication, Review
+
+
+@receiver(post_delete, sender=Review)
+def update_review_counters_on_delete(sender, instance, **kwargs):
+    """
+    Recount the reviews of the publication whenever a review is deleted,
+    also when it is cascaded from the deletion of its user.
+    """
+    with transaction.atomic():
+        publication = Publication.objects_with_deleted.select_for_update(
+        ).filter(pk=instance.publication_id).first()
+        if publication:
+            publication.update_review_counters()
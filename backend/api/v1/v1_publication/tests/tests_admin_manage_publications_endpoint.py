@@ -11,6 +11,7 @@ from api.v1.v1_publication.models import (
     PublicationStatus,
 )
 from api.v1.v1_users.constants import UserRoleTypes
+from api.v1.v1_jobs.models import Jobs, JobTypes
 
 
 @override_settings(USE_TZ=False, TEST_ENV=True)
@@ -97,6 +98,48 @@ class PublicationViewSetTestCase(APITestCase):
             2
         )
 
+    @patch("django.utils.timezone.now")
+    def test_create_publication_with_aggregation(self, mock_timezone_now):
+        mock_timezone_now.return_value = timezone.datetime(2025, 1, 31)
+        url = reverse("publication-list", kwargs={"version": "v1"})
+        data = {
+            "cdi_geonode_id": 1,
+            "year_month": "2025-01-01",
+            "initial_values": [],
+            "due_date": "2025-02-28",
+            "reviewers": [r.id for r in self.reviewers],
+            "subject": "CDI Map review requested for month 2025-01",
+            "message": "Dear {{reviewer_name}}",
+            "download_url": (
+                "https://geonode.com/datasets/"
+                "geonode:cdi_202501/dataset_download"
+            ),
+            "aggregation": "p25",
+            "store_statistics": True,
+        }
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        job = Jobs.objects.get(type=JobTypes.stream_initial_cdi_values)
+        self.assertEqual(job.info["id"], response.json()["id"])
+        self.assertEqual(job.info["download_url"], data["download_url"])
+        self.assertEqual(job.info["aggregation"], "p25")
+        self.assertTrue(job.info["store_statistics"])
+
+        # The two-stage pipeline downloads the raster first
+        data["cdi_geonode_id"] = 3
+        with override_settings(CDI_STREAM_PIPELINE=False):
+            response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        job = Jobs.objects.get(type=JobTypes.download_geonode_dataset)
+        self.assertEqual(job.info["aggregation"], "p25")
+        self.assertTrue(job.info["store_statistics"])
+
+        data["cdi_geonode_id"] = 2
+        data["aggregation"] = "mode"
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("aggregation", response.json())
+
     def test_publication_list(self):
         call_command("fake_publications_seeder", "--test", True)
         url = reverse("publication-list", kwargs={"version": "v1"})
@@ -173,6 +216,34 @@ class PublicationViewSetTestCase(APITestCase):
                 {"value": 14, "administration_id": 1253053, "category": 4},
             ],
         )
+        # Export artifacts are generated for the published version
+        job = Jobs.objects.filter(type=JobTypes.export_artifacts).first()
+        self.assertIsNotNone(job)
+        self.assertEqual(job.info, {"publication_id": publication.id})
+        self.assertIsNotNone(job.task_id)
+
+        # Editing the narrative doesn't render the exports again
+        response = self.client.patch(
+            url, {"narrative": "<p>Updated</p>"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            Jobs.objects.filter(type=JobTypes.export_artifacts).count(), 1
+        )
+
+        # New validated values do
+        response = self.client.patch(
+            url,
+            {"validated_values": [
+                {"value": 1, "administration_id": 1253002, "category": 3},
+                {"value": 14, "administration_id": 1253053, "category": 4},
+            ]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            Jobs.objects.filter(type=JobTypes.export_artifacts).count(), 2
+        )
 
     def test_delete_publication(self):
         publication = Publication.objects.create(
@@ -1,5 +1,6 @@
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.core.cache import cache
 from django.urls import reverse
 from django.core.management import call_command
 from django.test.utils import override_settings
@@ -15,6 +16,7 @@ from api.v1.v1_users.constants import UserRoleTypes
 @override_settings(USE_TZ=False, TEST_ENV=True)
 class PublicationReviewsTestCase(APITestCase):
     def setUp(self):
+        cache.clear()
         call_command("generate_administrations_seeder", "--test", True)
         call_command("generate_admin_seeder", "--test", True)
         call_command("fake_users_seeder", "--test", True, "--repeat", 3)
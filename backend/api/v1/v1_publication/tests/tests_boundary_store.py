@@ -0,0 +1,137 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from shapely import STRtree, make_valid
+from unittest.mock import patch
+from django.test import TestCase
+from api.v1.v1_publication.boundaries import (
+    BoundaryStore,
+    TOPOJSON_FILE,
+    TOPOJSON_OBJECT,
+)
+from api.v1.v1_publication.constants import BoundaryTier
+from api.v1.v1_publication.topology import decode_arcs, decode_geometries
+
+
+class BoundaryStoreTest(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "eswatini.topojson")
+        shutil.copyfile(TOPOJSON_FILE, self.path)
+        self.store = BoundaryStore(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_load_base_geodataframe(self):
+        gdf = self.store.get_geodataframe()
+        self.assertEqual(len(gdf), 59)
+        self.assertEqual(
+            list(gdf.columns),
+            ["geometry", "administration_id", "name", "region"]
+        )
+        self.assertEqual(gdf.crs.to_epsg(), 4326)
+
+    def test_topojson_is_parsed_once(self):
+        with patch.object(
+            BoundaryStore, "_parse", wraps=self.store._parse
+        ) as mock_parse:
+            self.store.get_geodataframe()
+            self.store.get_geodataframe()
+            self.assertEqual(mock_parse.call_count, 1)
+
+    def test_returns_independent_copies(self):
+        gdf = self.store.get_geodataframe()
+        gdf["category"] = 1
+        self.assertNotIn("category", self.store.get_geodataframe().columns)
+
+    def test_touched_file_with_same_content_is_not_parsed(self):
+        checksum = self.store.checksum
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        with patch.object(
+            BoundaryStore, "_parse", wraps=self.store._parse
+        ) as mock_parse:
+            self.store.get_geodataframe()
+            self.assertEqual(mock_parse.call_count, 0)
+        self.assertEqual(self.store.checksum, checksum)
+
+    def test_changed_file_is_parsed_again(self):
+        checksum = self.store.checksum
+        with open(self.path, "a") as f:
+            f.write("\n")
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        with patch.object(
+            BoundaryStore, "_parse", wraps=self.store._parse
+        ) as mock_parse:
+            gdf = self.store.get_geodataframe()
+            self.assertEqual(mock_parse.call_count, 1)
+        self.assertEqual(len(gdf), 59)
+        self.assertNotEqual(self.store.checksum, checksum)
+
+    def test_geometry_fragments_are_cached(self):
+        fragments = self.store.get_geometry_fragments()
+        self.assertEqual(len(fragments), 59)
+        self.assertIs(self.store.get_geometry_fragments(), fragments)
+        gdf = self.store.get_geodataframe()
+        geometry, fragment = fragments[gdf["administration_id"].iloc[0]]
+        self.assertIs(geometry, gdf.geometry.iloc[0])
+        self.assertTrue(fragment.startswith(b'{"type": '))
+
+    def test_topology_tiers(self):
+        full = self.store.get_topology(BoundaryTier.full)
+        self.assertEqual(len(full["arcs"]), 185)
+        points = {
+            tier: sum(
+                len(arc) for arc in self.store.get_topology(tier)["arcs"]
+            )
+            for tier in BoundaryTier.FieldStr
+        }
+        self.assertLess(points[BoundaryTier.overview], points["default"])
+        self.assertLess(points[BoundaryTier.default], points["full"])
+        overview = self.store.get_topology(BoundaryTier.overview)
+        self.assertIs(self.store.get_topology(BoundaryTier.overview), overview)
+        self.assertEqual(overview["objects"], full["objects"])
+        # Arcs still meet where they did, within the quantization grid
+        self.assertEqual(len(overview["arcs"]), 185)
+        tolerance = max(overview["transform"]["scale"])
+        for simplified, source in zip(
+            decode_arcs(overview), decode_arcs(full)
+        ):
+            for i in [0, -1]:
+                self.assertTrue(
+                    np.allclose(simplified[i], source[i], atol=tolerance)
+                )
+
+    def test_topology_tiers_keep_the_boundaries_valid(self):
+        def check(tier):
+            geometries = decode_geometries(
+                self.store.get_topology(tier), TOPOJSON_OBJECT
+            )
+            invalid = {
+                index
+                for index, geometry in enumerate(geometries)
+                if not geometry.is_valid
+            }
+            shapes = [make_valid(geometry) for geometry in geometries]
+            left, right = STRtree(shapes).query(
+                shapes, predicate="intersects"
+            )
+            overlaps = {
+                (i, j)
+                for i, j in zip(left.tolist(), right.tolist())
+                if i < j and shapes[i].intersection(shapes[j]).area > 0
+            }
+            return len(geometries), invalid, overlaps
+
+        count, invalid, overlaps = check(BoundaryTier.full)
+        self.assertEqual(count, 59)
+        self.assertEqual(overlaps, set())
+        for tier in [BoundaryTier.default, BoundaryTier.overview]:
+            tier_count, tier_invalid, tier_overlaps = check(tier)
+            self.assertEqual(tier_count, count)
+            # No geometry becomes invalid, no neighbours overlap
+            self.assertLessEqual(tier_invalid, invalid)
+            self.assertEqual(tier_overlaps, set())
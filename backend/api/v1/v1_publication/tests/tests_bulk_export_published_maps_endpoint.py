@@ -0,0 +1,138 @@
+import csv
+import gzip
+import json
+from io import BytesIO, StringIO
+from zipfile import ZipFile
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.urls import reverse
+from django.utils import timezone
+from django.test.utils import override_settings
+from api.v1.v1_publication.models import Publication
+from api.v1.v1_publication.constants import DroughtCategory, PublicationStatus
+
+HHUKWINI = 4588078
+
+
+@override_settings(USE_TZ=False, TEST_ENV=True)
+class BulkExportMapsAPITest(APITestCase):
+    def setUp(self):
+        for cdi_geonode_id, year_month, category in [
+            (41, "2025-01-01", DroughtCategory.d1),
+            (42, "2025-02-01", DroughtCategory.d3),
+            (43, "2025-03-01", DroughtCategory.d4),
+        ]:
+            Publication.objects.create(
+                year_month=year_month,
+                cdi_geonode_id=cdi_geonode_id,
+                due_date="2025-03-29",
+                initial_values=[],
+                validated_values=[
+                    {"administration_id": HHUKWINI, "category": category},
+                ],
+                status=PublicationStatus.published,
+                published_at=timezone.now(),
+            )
+        Publication.objects.create(
+            year_month="2025-04-01",
+            cdi_geonode_id=45,
+            due_date="2025-05-29",
+            initial_values=[],
+            validated_values=[],
+            status=PublicationStatus.in_review,
+        )
+        self.url = reverse("maps-export", kwargs={"version": "v1"})
+
+    def test_bulk_export_geojson(self):
+        response = self.client.get(
+            f"{self.url}?start_date=2025-02-01&end_date=2025-04-01"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn(
+            "cdi_maps_2025-02_2025-03.geojson",
+            response["Content-Disposition"]
+        )
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(data["type"], "FeatureCollection")
+        self.assertEqual(len(data["features"]), 59 * 2)
+        categories = {
+            f["properties"]["year_month"]: f["properties"]["category"]
+            for f in data["features"]
+            if f["properties"]["administration_id"] == HHUKWINI
+        }
+        self.assertEqual(
+            categories,
+            {"2025-02": DroughtCategory.d3, "2025-03": DroughtCategory.d4}
+        )
+        no_data = {
+            f["properties"]["cat_name"]
+            for f in data["features"]
+            if f["properties"]["administration_id"] != HHUKWINI
+        }
+        self.assertEqual(
+            no_data,
+            {DroughtCategory.FieldStr[DroughtCategory.none]}
+        )
+
+    def test_bulk_export_csv_gzip(self):
+        response = self.client.get(
+            f"{self.url}?export_type=csv",
+            HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = gzip.decompress(b"".join(response.streaming_content))
+        rows = list(csv.DictReader(StringIO(content.decode("utf-8"))))
+        self.assertEqual(len(rows), 59 * 3)
+        self.assertEqual(
+            list(rows[0]),
+            [
+                "administration_id",
+                "name",
+                "region",
+                "year_month",
+                "category",
+                "cat_name",
+            ]
+        )
+        hhukwini = [
+            (row["year_month"], row["category"])
+            for row in rows
+            if row["administration_id"] == str(HHUKWINI)
+        ]
+        self.assertEqual(
+            hhukwini,
+            [
+                ("2025-01", str(DroughtCategory.d1)),
+                ("2025-02", str(DroughtCategory.d3)),
+                ("2025-03", str(DroughtCategory.d4)),
+            ]
+        )
+
+    def test_bulk_export_shapefile(self):
+        response = self.client.get(
+            f"{self.url}?export_type=shapefile&end_date=2025-02-01"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        zip_file = ZipFile(BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(
+            sorted(zip_file.namelist()),
+            sorted(
+                f"cdi_map_{ym}/cdi_map_{ym}.{ext}"
+                for ym in ["2025-01", "2025-02"]
+                for ext in ["shp", "shx", "dbf", "prj"]
+            )
+        )
+        self.assertIsNone(zip_file.testzip())
+
+    def test_bulk_export_invalid_range(self):
+        response = self.client.get(
+            f"{self.url}?start_date=2025-03-01&end_date=2025-01-01"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_export_no_published_maps(self):
+        response = self.client.get(f"{self.url}?start_date=2025-04-01")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,14 +1,21 @@
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.core.cache import cache
 from django.core.management import call_command
-from unittest.mock import patch
+import requests
+from unittest.mock import MagicMock, patch
 from api.v1.v1_users.models import SystemUser, UserRoleTypes
 from api.v1.v1_publication.models import Publication, PublicationStatus
-from api.v1.v1_publication.constants import DroughtCategory, CDIGeonodeCategory
+from api.v1.v1_publication.constants import (
+    GEONODE_CACHE_TTL,
+    DroughtCategory,
+    CDIGeonodeCategory,
+)
 
 
 class CDIGeonodeAPITestCase(APITestCase):
     def setUp(self):
+        cache.clear()
         self.url = "/api/v1/admin/cdi-geonode"
         call_command(
             "generate_admin_seeder", "--test", True
@@ -59,7 +66,7 @@ class CDIGeonodeAPITestCase(APITestCase):
             "resources": resources
         }
 
-    @patch("requests.get")  # Mock the requests.get call
+    @patch("requests.Session.get")  # Mock the requests.get call
     def test_get_cdi_geonode_success(self, mock_get):
         # Configure the mock to return a response with JSON data
         mock_get.return_value.status_code = 200
@@ -85,7 +92,7 @@ class CDIGeonodeAPITestCase(APITestCase):
             "2025-01-15T12:00:00Z"
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_cdi_geonode_error(self, mock_get):
         # Configure the mock to return an error response
         mock_get.return_value.status_code = 500
@@ -100,7 +107,7 @@ class CDIGeonodeAPITestCase(APITestCase):
             {"message": "Server Error: Unable to fetch data."}
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_by_unauthenticated_user(self, _):
         self.client.logout()
         response = self.client.get(self.url)
@@ -109,7 +116,7 @@ class CDIGeonodeAPITestCase(APITestCase):
             status.HTTP_401_UNAUTHORIZED
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_publication_exists(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = self.mock_response_data
@@ -145,7 +152,7 @@ class CDIGeonodeAPITestCase(APITestCase):
             PublicationStatus.in_review
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_empty_results_publication_filtering_by_status(self, mock_get):
         resources = Publication.objects.filter(
             status=PublicationStatus.in_validation
@@ -199,7 +206,7 @@ class CDIGeonodeAPITestCase(APITestCase):
             0
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_cdi_geonode_bad_request(self, mock_get):
         mock_get.return_value.status_code = 400
         mock_get.return_value.json.return_value = self.mock_response_data
@@ -211,7 +218,7 @@ class CDIGeonodeAPITestCase(APITestCase):
             {"message": "Bad Request: Invalid parameters."}
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_cdi_geonode_with_invalid_category(self, _):
         response = self.client.get(
             f"{self.url}?category=invalid"
@@ -222,7 +229,7 @@ class CDIGeonodeAPITestCase(APITestCase):
             {"message": "Invalid category parameter."}
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_cdi_geonode_details(self, mock_get):
         mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {
@@ -266,7 +273,7 @@ class CDIGeonodeAPITestCase(APITestCase):
             ]
         )
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_get_cdi_geonode_details_with_invalid_id(self, mock_get):
         mock_get.return_value.status_code = 500
         response = self.client.get(
@@ -274,7 +281,7 @@ class CDIGeonodeAPITestCase(APITestCase):
         )
         self.assertEqual(response.status_code, 500)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_sort_by_year_month_descending(self, mock_get):
         """Test sorting by year_month in descending order"""
         mock_get.return_value.status_code = 200
@@ -287,7 +294,7 @@ class CDIGeonodeAPITestCase(APITestCase):
         self.assertEqual(response.data["data"][0]["pk"], 1)
         self.assertEqual(response.data["data"][1]["pk"], 2)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_sort_by_year_month_ascending(self, mock_get):
         """Test sorting by year_month in ascending order"""
         mock_get.return_value.status_code = 200
@@ -300,7 +307,7 @@ class CDIGeonodeAPITestCase(APITestCase):
         self.assertEqual(response.data["data"][0]["pk"], 2)
         self.assertEqual(response.data["data"][1]["pk"], 1)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_sort_by_created_descending(self, mock_get):
         """Test sorting by created timestamp in descending order"""
         mock_get.return_value.status_code = 200
@@ -313,7 +320,7 @@ class CDIGeonodeAPITestCase(APITestCase):
         self.assertEqual(response.data["data"][0]["pk"], 2)
         self.assertEqual(response.data["data"][1]["pk"], 1)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_sort_by_created_ascending(self, mock_get):
         """Test sorting by created timestamp in ascending order"""
         mock_get.return_value.status_code = 200
@@ -326,7 +333,7 @@ class CDIGeonodeAPITestCase(APITestCase):
         self.assertEqual(response.data["data"][0]["pk"], 1)
         self.assertEqual(response.data["data"][1]["pk"], 2)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_sort_by_title_ascending(self, mock_get):
         """Test sorting by title in ascending alphabetical order"""
         mock_get.return_value.status_code = 200
@@ -339,7 +346,7 @@ class CDIGeonodeAPITestCase(APITestCase):
         self.assertEqual(response.data["data"][0]["title"], "Another Resource")
         self.assertEqual(response.data["data"][1]["title"], "Test GeoNode Resource")
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_sort_by_title_descending(self, mock_get):
         """Test sorting by title in descending alphabetical order"""
         mock_get.return_value.status_code = 200
@@ -352,7 +359,7 @@ class CDIGeonodeAPITestCase(APITestCase):
         self.assertEqual(response.data["data"][0]["title"], "Test GeoNode Resource")
         self.assertEqual(response.data["data"][1]["title"], "Another Resource")
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_sort_with_publication_year_month(self, mock_get):
         """Test sorting when publications exist with different year_month values"""
         mock_get.return_value.status_code = 200
@@ -388,7 +395,7 @@ class CDIGeonodeAPITestCase(APITestCase):
         self.assertEqual(response.data["data"][0]["pk"], 1)
         self.assertEqual(response.data["data"][1]["pk"], 2)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_sort_defaults_to_descending(self, mock_get):
         """Test that sort_order defaults to 'desc' when not provided"""
         mock_get.return_value.status_code = 200
@@ -401,7 +408,7 @@ class CDIGeonodeAPITestCase(APITestCase):
         self.assertEqual(response.data["data"][0]["pk"], 1)
         self.assertEqual(response.data["data"][1]["pk"], 2)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_sort_with_mixed_date_types(self, mock_get):
         """Test sorting when some items have date objects and others have strings"""
         # Add a third resource with a different date
@@ -442,7 +449,7 @@ class CDIGeonodeAPITestCase(APITestCase):
         # Verify ordering works correctly despite mixed types
         self.assertEqual(len(response.data["data"]), 3)
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_sort_with_status_filter(self, mock_get):
         """Test sorting combined with status filter"""
         mock_get.return_value.status_code = 200
@@ -481,3 +488,108 @@ class CDIGeonodeAPITestCase(APITestCase):
         # Descending order: December (pk 2) then June (pk 1)
         self.assertEqual(response.data["data"][0]["pk"], 2)
         self.assertEqual(response.data["data"][1]["pk"], 1)
+
+    @patch("requests.Session.get")
+    def test_geonode_responses_are_cached(self, mock_get):
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = self.mock_response_data
+
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(mock_get.call_count, 1)
+
+        # Every page has its own cached response
+        self.client.get(f"{self.url}?page=2")
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertIn("page=2", mock_get.call_args[0][0])
+
+    @patch("api.v1.v1_publication.geonode.threading.Thread")
+    @patch("api.v1.v1_publication.geonode.time.time")
+    @patch("requests.Session.get")
+    def test_stale_geonode_response_is_revalidated(
+        self, mock_get, mock_time, mock_thread
+    ):
+        # Run the background revalidation right away
+        mock_thread.side_effect = lambda target, args, daemon: MagicMock(
+            start=lambda: target(*args)
+        )
+        mock_time.return_value = 1000
+        mock_get.return_value = MagicMock(
+            status_code=200,
+            headers={"ETag": '"v1"'},
+            json=MagicMock(return_value=self.mock_response_data),
+        )
+        self.client.get(self.url)
+
+        # A stale response is served while it is revalidated
+        mock_time.return_value = 1000 + GEONODE_CACHE_TTL + 1
+        mock_get.return_value = MagicMock(status_code=304, headers={})
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["data"]), 2)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(
+            mock_get.call_args[1]["headers"],
+            {"If-None-Match": '"v1"'}
+        )
+
+        # Not modified: the cached response is fresh again
+        self.client.get(self.url)
+        self.assertEqual(mock_get.call_count, 2)
+
+        # A failed revalidation keeps serving the stale response
+        mock_time.return_value = 1000 + GEONODE_CACHE_TTL * 2 + 2
+        mock_get.side_effect = requests.ConnectionError()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch("requests.Session.get")
+    def test_geonode_unreachable(self, mock_get):
+        mock_get.side_effect = requests.Timeout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(
+            response.data,
+            {"message": "Server Error: Unable to fetch data."}
+        )
+
+    @patch("requests.Session.get")
+    def test_status_filter_pages_over_publications(self, mock_get):
+        for pk in range(1, 13):
+            Publication.objects.create(
+                cdi_geonode_id=pk,
+                year_month=f"2024-{pk:02d}-01",
+                due_date="2025-01-31",
+                status=PublicationStatus.in_review,
+                initial_values=[{
+                    "administration_id": 1,
+                    "value": 6,
+                    "category": DroughtCategory.d3
+                }]
+            )
+        resource = self.mock_response_data["resources"][0]
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = {
+            "total": 2,
+            "page": 1,
+            "page_size": 2,
+            "resources": [{**resource, "pk": 2}, {**resource, "pk": 1}],
+        }
+
+        response = self.client.get(
+            f"{self.url}?status={PublicationStatus.in_review}&page=2"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total"], 12)
+        self.assertEqual(response.data["total_page"], 2)
+        self.assertEqual(
+            [item["pk"] for item in response.data["data"]],
+            [2, 1]
+        )
+        # Only the resources of the page are requested, at once
+        mock_get.assert_called_once()
+        url = mock_get.call_args[0][0]
+        self.assertIn("filter{pk.in}=1&filter{pk.in}=2&page_size=2", url)
+        self.assertNotIn("filter{pk.in}=3", url)
@@ -0,0 +1,227 @@
+import os
+import shutil
+import tempfile
+import requests
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+from django.test import TestCase
+from django.test.utils import override_settings
+from api.v1.v1_jobs import downloads
+from api.v1.v1_jobs.constants import JobStatus, JobTypes
+from api.v1.v1_jobs.job import (
+    download_geonode_dataset,
+    download_geonode_dataset_results,
+)
+from api.v1.v1_jobs.models import Jobs
+from api.v1.v1_publication.models import Publication
+
+DOWNLOAD_URL = "http://geonode:8000/download/44"
+CONTENT = bytes(range(256)) * 1024
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, content=b"", fail_at=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.raw = BytesIO(content)
+        self.fail_at = fail_at
+        read = self.raw.read
+
+        def read_chunk(size, decode_content=True):
+            if self.fail_at is not None and self.raw.tell() >= self.fail_at:
+                raise requests.ConnectionError("Connection reset")
+            return read(size)
+
+        self.raw.read = read_chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class FakeServer:
+    """
+    Serves CONTENT with an ETag, honouring Range requests.
+    """
+
+    def __init__(self, etag='"v1"', fail_at=None):
+        self.etag = etag
+        self.fail_at = fail_at
+        self.requests = []
+
+    def head(self, url, **kwargs):
+        headers = {"Content-Length": str(len(CONTENT))}
+        if self.etag:
+            headers["ETag"] = self.etag
+        return FakeResponse(200, headers)
+
+    def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.requests.append(headers)
+        fail_at, self.fail_at = self.fail_at, None
+        if "Range" in headers:
+            start = int(headers["Range"][len("bytes="):-1])
+            if start >= len(CONTENT):
+                return FakeResponse(416, {
+                    "Content-Range": f"bytes */{len(CONTENT)}",
+                })
+            return FakeResponse(206, {
+                "Content-Length": str(len(CONTENT) - start),
+                "Content-Range": (
+                    f"bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}"
+                ),
+            }, CONTENT[start:])
+        return FakeResponse(
+            200,
+            {"Content-Length": str(len(CONTENT))},
+            CONTENT,
+            fail_at=fail_at,
+        )
+
+
+@override_settings(USE_TZ=False, TEST_ENV=True)
+class DownloadGeonodeDatasetJobTest(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "rasters")
+        for name, value in [
+            ("download_dir", self.temp_dir),
+            ("cache_dir", self.cache_dir),
+        ]:
+            patcher = patch.object(downloads, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def download(self, server, cdi_geonode_id=44):
+        with patch.object(downloads, "get_session", return_value=server):
+            return download_geonode_dataset(
+                DOWNLOAD_URL,
+                "raster_44_1.tif",
+                cdi_geonode_id,
+            )
+
+    def test_download_is_cached(self):
+        server = FakeServer()
+        input_file = self.download(server)
+        self.assertEqual(os.path.dirname(input_file), self.cache_dir)
+        with open(input_file, "rb") as f:
+            self.assertEqual(f.read(), CONTENT)
+        self.assertEqual(len(server.requests), 1)
+
+        # The same version is never downloaded twice
+        self.assertEqual(self.download(server), input_file)
+        self.assertEqual(len(server.requests), 1)
+
+        # A new version of the dataset gets a new file
+        server.etag = '"v2"'
+        self.assertNotEqual(self.download(server), input_file)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+        # Older rasters are evicted to fit the workspace budget
+        server.etag = '"v3"'
+        with override_settings(RASTER_CACHE_MAX_BYTES=len(CONTENT)):
+            input_file = self.download(server)
+        self.assertEqual(os.listdir(self.cache_dir), [
+            os.path.basename(input_file)
+        ])
+
+    def test_interrupted_download_resumes(self):
+        server = FakeServer(fail_at=len(CONTENT) // 2)
+        input_file = self.download(server)
+
+        with open(input_file, "rb") as f:
+            self.assertEqual(f.read(), CONTENT)
+        self.assertEqual(len(server.requests), 2)
+        self.assertNotIn("Range", server.requests[0])
+        self.assertTrue(server.requests[1]["Range"].startswith("bytes="))
+        self.assertEqual(server.requests[1]["If-Range"], '"v1"')
+        self.assertEqual(os.listdir(self.cache_dir), [
+            os.path.basename(input_file)
+        ])
+
+    def write_part(self, content):
+        output_path = downloads.get_cache_path(44, '"v1"', len(CONTENT))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(f"{output_path}.part", "wb") as f:
+            f.write(content)
+        return output_path
+
+    def test_complete_part_is_kept(self):
+        # The worker died between the last chunk and the move
+        output_path = self.write_part(CONTENT)
+        server = FakeServer()
+        self.assertEqual(self.download(server), output_path)
+
+        with open(output_path, "rb") as f:
+            self.assertEqual(f.read(), CONTENT)
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(
+            server.requests[0]["Range"], f"bytes={len(CONTENT)}-"
+        )
+        self.assertEqual(os.listdir(self.cache_dir), [
+            os.path.basename(output_path)
+        ])
+
+    def test_unsatisfiable_part_restarts(self):
+        output_path = self.write_part(CONTENT + b"stale")
+        server = FakeServer()
+        self.assertEqual(self.download(server), output_path)
+
+        with open(output_path, "rb") as f:
+            self.assertEqual(f.read(), CONTENT)
+        self.assertEqual(len(server.requests), 2)
+        self.assertNotIn("Range", server.requests[1])
+
+    def test_incomplete_download_fails(self):
+        server = FakeServer(etag=None)
+        server.get = MagicMock(return_value=FakeResponse(
+            200,
+            {"Content-Length": str(len(CONTENT))},
+            CONTENT[:1000],
+        ))
+        with patch.object(downloads, "DOWNLOAD_ATTEMPTS", 2):
+            self.assertFalse(self.download(server, cdi_geonode_id=None))
+        self.assertEqual(server.get.call_count, 2)
+        # No partial raster is left behind
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_results_hook_uses_downloaded_file(self):
+        publication = Publication.objects.create(
+            year_month="2025-02-01",
+            cdi_geonode_id=44,
+            due_date="2025-03-29",
+            initial_values=[],
+        )
+        input_file = self.download(FakeServer())
+        job = Jobs.objects.create(
+            type=JobTypes.download_geonode_dataset,
+            status=JobStatus.on_progress,
+            task_id="download-task",
+            info={
+                "publication_id": publication.id,
+                "filename": "raster_44_1.tif",
+                "subject": None,
+                "message": None,
+            },
+        )
+        task = MagicMock(id="download-task", success=True, result=input_file)
+        with patch(
+            "api.v1.v1_jobs.job.async_task",
+            return_value="cdi-task"
+        ) as mock_async_task:
+            download_geonode_dataset_results(task)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.done)
+        self.assertEqual(mock_async_task.call_args[0][2], input_file)
+        self.assertTrue(
+            Jobs.objects.filter(
+                type=JobTypes.initial_cdi_values,
+                task_id="cdi-task",
+            ).exists()
+        )
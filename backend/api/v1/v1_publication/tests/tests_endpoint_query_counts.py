@@ -0,0 +1,148 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from api.v1.v1_users.models import SystemUser
+from api.v1.v1_users.constants import UserRoleTypes
+from api.v1.v1_publication.constants import DroughtCategory
+from api.v1.v1_publication.models import Publication, Review
+
+
+@override_settings(USE_TZ=False, TEST_ENV=True)
+class EndpointQueryCountTestCase(APITestCase):
+    """
+    The number of queries of the list endpoints must not grow with the
+    number of rows or reviewers.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.admin = SystemUser.objects.create(
+            email="admin@example.com",
+            name="Admin",
+            role=UserRoleTypes.admin,
+        )
+        self.reviewers = [
+            SystemUser.objects.create(
+                email=f"reviewer{i}@example.com",
+                name=f"Reviewer {i}",
+                role=UserRoleTypes.reviewer,
+            )
+            for i in range(4)
+        ]
+
+    def create_publication(self, index, reviewers):
+        initial_values = [
+            {
+                "administration_id": 1,
+                "value": 6,
+                "category": DroughtCategory.d3,
+            }
+        ]
+        publication = Publication.objects.create(
+            cdi_geonode_id=index,
+            year_month=f"2024-{index:02d}-01",
+            due_date="2025-01-31",
+            initial_values=initial_values,
+        )
+        for reviewer in reviewers:
+            Review.objects.create(
+                publication=publication,
+                user=reviewer,
+                is_completed=True,
+                completed_at=timezone.now(),
+                suggestion_values=[{**initial_values[0], "reviewed": True}],
+            )
+        publication.update_review_counters()
+        return publication
+
+    def count_queries(self, url, user):
+        self.client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, get_url, user, grow):
+        """
+        Count the queries of `get_url()`, then again after `grow()` added
+        more rows, and check they are the same.
+        """
+        before = self.count_queries(get_url(), user)
+        grow()
+        after = self.count_queries(get_url(), user)
+        self.assertEqual(before, after)
+
+    def test_publication_list(self):
+        self.create_publication(1, self.reviewers[:1])
+        self.assertConstantQueries(
+            lambda: reverse("publication-list", kwargs={"version": "v1"}),
+            self.admin,
+            lambda: [
+                self.create_publication(i, self.reviewers)
+                for i in range(2, 8)
+            ],
+        )
+
+    def test_publication_details(self):
+        publication = self.create_publication(1, self.reviewers[:1])
+        url = reverse(
+            "publication-details",
+            kwargs={"version": "v1", "pk": publication.pk}
+        )
+        self.assertConstantQueries(
+            lambda: url,
+            self.admin,
+            lambda: [
+                Review.objects.create(publication=publication, user=reviewer)
+                for reviewer in self.reviewers[1:]
+            ],
+        )
+
+    def test_publication_reviews(self):
+        publication = self.create_publication(1, self.reviewers[:1])
+        url = reverse(
+            "publication-reviews",
+            kwargs={"version": "v1", "pk": publication.pk}
+        )
+        self.assertConstantQueries(
+            lambda: url,
+            self.admin,
+            lambda: [
+                Review.objects.create(
+                    publication=publication,
+                    user=reviewer,
+                    is_completed=True,
+                    completed_at=timezone.now(),
+                    suggestion_values=[],
+                )
+                for reviewer in self.reviewers[1:]
+            ],
+        )
+
+    def test_reviewer_review_list(self):
+        reviewer = self.reviewers[0]
+        self.create_publication(1, [reviewer])
+        self.assertConstantQueries(
+            lambda: reverse("review-list", kwargs={"version": "v1"}),
+            reviewer,
+            lambda: [
+                self.create_publication(i, [reviewer])
+                for i in range(2, 8)
+            ],
+        )
+
+    def test_review_details(self):
+        publication = self.create_publication(1, self.reviewers[:1])
+        review = publication.reviews.first()
+        url = reverse(
+            "publication-review",
+            kwargs={"version": "v1", "pk": review.pk}
+        )
+        self.client.force_authenticate(user=self.admin)
+        # The review, with its publication and user in the same query
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
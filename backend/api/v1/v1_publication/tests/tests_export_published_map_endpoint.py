@@ -1,16 +1,25 @@
+import gzip
+import os
 import geopandas as gpd
+from concurrent.futures import ThreadPoolExecutor
 from rest_framework.test import APITestCase
 from rest_framework import status
 from PIL import Image
 from zipfile import ZipFile
 from io import BytesIO
 from unittest.mock import patch
-# from shapely.geometry import Point
+from shapely.geometry import MultiPolygon, Polygon
 from django.urls import reverse
 from django.utils import timezone
 from django.test.utils import override_settings
-from api.v1.v1_publication.models import Publication
+from api.v1.v1_publication.models import Publication, ExportArtifact
 from api.v1.v1_publication.constants import DroughtCategory, PublicationStatus
+from api.v1.v1_publication.exports import (
+    export_geojson,
+    export_image,
+    export_shapefile,
+    load_geodataframe,
+)
 
 
 @override_settings(USE_TZ=False, TEST_ENV=True)
@@ -127,6 +136,46 @@ class ExportMapAPITest(APITestCase):
         geojson_data = response.content.decode("utf-8")
         self.assertIn('"type": "FeatureCollection"', geojson_data)
 
+    def test_export_geojson_matches_to_json(self):
+        """
+        Test the streamed GeoJSON is identical to GeoDataFrame.to_json.
+        """
+        gdf = load_geodataframe(self.published.validated_values)
+        self.assertEqual(
+            export_geojson(gdf, "2025-02").content,
+            gdf.to_json().encode("utf-8")
+        )
+        gdf = self.mock_gdf()
+        self.assertEqual(
+            export_geojson(gdf, "2025-02").content,
+            gdf.to_json().encode("utf-8")
+        )
+
+    @patch("api.v1.v1_publication.views.ExportMapAPI._load_geodataframe")
+    def test_export_geojson_gzip(self, mock_load_gdf):
+        """
+        Test GeoJSON is gzipped when the client accepts it.
+        """
+        mock_load_gdf.return_value = self.mock_gdf()
+
+        response = self.client.get(
+            f"{self.url}?export_type=geojson",
+            HTTP_ACCEPT_ENCODING="gzip, deflate"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertTrue(response["ETag"].startswith("W/"))
+        geojson_data = gzip.decompress(response.content).decode("utf-8")
+        self.assertIn('"type": "FeatureCollection"', geojson_data)
+        # The gzip variant stored with the artifact is served as it is
+        artifact = ExportArtifact.objects.get(publication=self.published)
+        self.assertEqual(bytes(artifact.gzip_content), response.content)
+
+        response = self.client.get(f"{self.url}?export_type=geojson")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response.content.decode("utf-8"), geojson_data)
+
     @patch("api.v1.v1_publication.views.ExportMapAPI._load_geodataframe")
     def test_export_shapefile(self, mock_load_gdf):
         """
@@ -210,3 +259,139 @@ class ExportMapAPITest(APITestCase):
         # Check the content (ensure it's a valid PNG image)
         img = Image.open(BytesIO(response.content))
         self.assertEqual(img.format, "PNG")
+        self.assertIn("render;dur=", response["Server-Timing"])
+
+    def test_export_image_multipolygon_with_holes(self):
+        """
+        Test rendering multipolygons with interior rings and no-data rows.
+        """
+        gdf = self.mock_gdf()
+        gdf.loc[0, "geometry"] = MultiPolygon([
+            Polygon(
+                [(0, 0), (1, 0), (1, 1), (0, 1)],
+                [[(0.2, 0.2), (0.8, 0.2), (0.8, 0.8), (0.2, 0.8)]],
+            ),
+            Polygon([(4, 4), (5, 4), (5, 5), (4, 5)]),
+        ])
+        gdf.loc[1, "category"] = DroughtCategory.none
+        result = export_image(gdf, "2025-02", "png")
+        self.assertEqual(result.filename, "cdi_map_2025-02.png")
+        self.assertIsNotNone(result.render_time)
+        img = Image.open(BytesIO(result.content))
+        self.assertEqual(img.format, "PNG")
+
+    @patch("api.v1.v1_publication.views.ExportMapAPI._load_geodataframe")
+    def test_export_is_served_from_artifact(self, mock_load_gdf):
+        """
+        Test the second download is served from the stored artifact.
+        """
+        mock_load_gdf.return_value = self.mock_gdf()
+
+        response = self.client.get(f"{self.url}?export_type=geojson")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+        self.assertEqual(
+            ExportArtifact.objects.filter(
+                publication=self.published,
+                export_type="geojson"
+            ).count(),
+            1
+        )
+
+        second_response = self.client.get(f"{self.url}?export_type=geojson")
+        self.assertEqual(second_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(second_response.content, response.content)
+        self.assertEqual(second_response["ETag"], response["ETag"])
+        mock_load_gdf.assert_called_once()
+
+    @patch("api.v1.v1_publication.views.ExportMapAPI._load_geodataframe")
+    def test_export_not_modified(self, mock_load_gdf):
+        """
+        Test a matching If-None-Match header returns 304 Not Modified.
+        """
+        mock_load_gdf.return_value = self.mock_gdf()
+
+        response = self.client.get(f"{self.url}?export_type=svg")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(
+            f"{self.url}?export_type=svg",
+            HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    @patch("api.v1.v1_publication.views.ExportMapAPI._load_geodataframe")
+    def test_export_artifact_is_replaced_on_update(self, mock_load_gdf):
+        """
+        Test updating the validated values renders a new artifact version.
+        """
+        mock_load_gdf.return_value = self.mock_gdf()
+
+        self.client.get(f"{self.url}?export_type=geojson")
+        artifact = ExportArtifact.objects.get(publication=self.published)
+
+        self.published.validated_values = [
+            {"administration_id": 11, "category": DroughtCategory.d3},
+            {"administration_id": 12, "category": DroughtCategory.d1},
+        ]
+        self.published.updated_at = timezone.now()
+        self.published.save()
+
+        response = self.client.get(f"{self.url}?export_type=geojson")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(mock_load_gdf.call_count, 2)
+        artifacts = ExportArtifact.objects.filter(
+            publication=self.published
+        )
+        self.assertEqual(artifacts.count(), 1)
+        self.assertNotEqual(artifacts.first().version, artifact.version)
+
+    @patch("api.v1.v1_publication.views.ExportMapAPI._load_geodataframe")
+    def test_export_artifact_is_kept_on_narrative_update(self, mock_load_gdf):
+        """
+        Test a narrative only edit keeps serving the rendered artifact.
+        """
+        mock_load_gdf.return_value = self.mock_gdf()
+
+        self.client.get(f"{self.url}?export_type=geojson")
+        artifact = ExportArtifact.objects.get(publication=self.published)
+
+        self.published.narrative = "Updated narrative"
+        self.published.updated_at = timezone.now() + timezone.timedelta(
+            minutes=5
+        )
+        self.published.save()
+
+        response = self.client.get(f"{self.url}?export_type=geojson")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_load_gdf.assert_called_once()
+        self.assertEqual(
+            ExportArtifact.objects.get(publication=self.published).pk,
+            artifact.pk,
+        )
+
+    def test_concurrent_shapefile_exports(self):
+        """
+        Test concurrent shapefile exports of the same month are isolated.
+        """
+        gdf = self.mock_gdf()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(
+                lambda _: export_shapefile(gdf, "2025-02"),
+                range(8)
+            ))
+        for result in results:
+            zip_file = ZipFile(BytesIO(result.content))
+            self.assertEqual(
+                sorted(zip_file.namelist()),
+                [
+                    "cdi_map_2025-02.dbf",
+                    "cdi_map_2025-02.prj",
+                    "cdi_map_2025-02.shp",
+                    "cdi_map_2025-02.shx",
+                ]
+            )
+            self.assertIsNone(zip_file.testzip())
+        self.assertFalse(os.path.exists("./tmp/cdi_map_2025-02.shp"))
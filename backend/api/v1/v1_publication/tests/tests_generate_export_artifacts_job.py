@@ -0,0 +1,57 @@
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+from api.v1.v1_jobs.job import generate_export_artifacts
+from api.v1.v1_publication.models import Publication, ExportArtifact
+from api.v1.v1_publication.constants import (
+    DroughtCategory,
+    ExportMapTypes,
+    PublicationStatus,
+)
+
+
+@override_settings(USE_TZ=False, TEST_ENV=True)
+class GenerateExportArtifactsJobTest(TestCase):
+    def setUp(self):
+        self.publication = Publication.objects.create(
+            year_month="2025-02-01",
+            cdi_geonode_id=44,
+            due_date="2025-03-29",
+            initial_values=[
+                {"administration_id": 4588078, "category": DroughtCategory.d2},
+            ],
+            validated_values=[
+                {"administration_id": 4588078, "category": DroughtCategory.d1},
+            ],
+            status=PublicationStatus.published,
+            narrative="Lorem ipsum dolor amet...",
+            published_at=timezone.now(),
+        )
+
+    def test_generate_all_export_artifacts(self):
+        result = generate_export_artifacts(self.publication.id)
+        self.assertEqual(result["publication_id"], self.publication.id)
+        self.assertEqual(
+            sorted([a["export_type"] for a in result["artifacts"]]),
+            sorted(ExportMapTypes.FieldStr.keys())
+        )
+        self.assertEqual(
+            ExportArtifact.objects.filter(
+                publication=self.publication
+            ).count(),
+            len(ExportMapTypes.FieldStr.keys())
+        )
+        # Running the job again reuses the stored artifacts
+        generate_export_artifacts(self.publication.id)
+        self.assertEqual(
+            ExportArtifact.objects.filter(
+                publication=self.publication
+            ).count(),
+            len(ExportMapTypes.FieldStr.keys())
+        )
+
+    def test_skip_unpublished_publication(self):
+        self.publication.status = PublicationStatus.in_validation
+        self.publication.save()
+        self.assertFalse(generate_export_artifacts(self.publication.id))
+        self.assertFalse(ExportArtifact.objects.exists())
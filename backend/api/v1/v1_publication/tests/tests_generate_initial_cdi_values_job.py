@@ -0,0 +1,373 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+import rasterio
+from rasterio.mask import mask
+from rasterio.transform import from_origin
+from rasterio.errors import RasterioIOError
+from unittest.mock import MagicMock, patch
+from django.test import TestCase
+from django.test.utils import override_settings
+from api.v1.v1_jobs import downloads, zonal_stats
+from api.v1.v1_jobs.aggregators import (
+    CLASS_CATEGORIES,
+    get_aggregator,
+    is_valid_aggregation,
+)
+from api.v1.v1_jobs.constants import JobStatus, JobTypes
+from api.v1.v1_jobs.job import (
+    generate_initial_cdi_values,
+    generate_initial_cdi_values_results,
+    stream_initial_cdi_values,
+)
+from api.v1.v1_jobs.models import Jobs
+from api.v1.v1_publication.boundaries import boundary_store
+from api.v1.v1_publication.models import Publication
+from api.v1.v1_publication.utils import get_category
+
+
+def write_cdi_raster(
+    path,
+    west=30.7,
+    north=-25.6,
+    size=(180, 160),
+    high=0.5,
+    **profile
+):
+    """
+    Synthetic CDI GeoTIFF with nodata and negative (missing) pixels.
+    """
+    rng = np.random.default_rng(42)
+    data = rng.uniform(0, high, size).astype("float32")
+    data[rng.uniform(size=size) < 0.05] = -1
+    data[rng.uniform(size=size) < 0.05] = -9999
+    with rasterio.open(
+        path,
+        "w",
+        driver="GTiff",
+        height=size[0],
+        width=size[1],
+        count=1,
+        dtype="float32",
+        crs="EPSG:4326",
+        transform=from_origin(west, north, 0.01, 0.01),
+        nodata=-9999,
+        **profile
+    ) as dst:
+        dst.write(data, 1)
+
+
+def masked_cdi_values(path):
+    """
+    Reference implementation: one `mask` call per administration.
+    """
+    values = {}
+    gdf = boundary_store.get_geodataframe()
+    with rasterio.open(path) as src:
+        for admin_id, geom in zip(gdf["administration_id"], gdf.geometry):
+            try:
+                masked_arr, _ = mask(
+                    dataset=src,
+                    shapes=[geom],
+                    crop=True,
+                    nodata=src.nodata,
+                    filled=False
+                )
+            except ValueError:
+                values[admin_id] = None
+                continue
+            valid_data = masked_arr[0].compressed()
+            positive_values = valid_data[valid_data >= 0]
+            values[admin_id] = (
+                float((positive_values.min() + positive_values.mean()) * 0.5)
+                if positive_values.size else None
+            )
+    return values
+
+
+@override_settings(USE_TZ=False, TEST_ENV=True)
+class GenerateInitialCDIValuesJobTest(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.label_grids_dir = os.path.join(self.temp_dir, "label_grids")
+        label_grids_patcher = patch(
+            "api.v1.v1_jobs.job.label_grids_dir",
+            self.label_grids_dir
+        )
+        label_grids_patcher.start()
+        self.addCleanup(label_grids_patcher.stop)
+        self.publication = Publication.objects.create(
+            year_month="2025-02-01",
+            cdi_geonode_id=44,
+            due_date="2025-03-29",
+            initial_values=[],
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_values_match_per_administration_mask(self):
+        input_file = os.path.join(self.temp_dir, "cdi.tif")
+        write_cdi_raster(input_file)
+        expected = masked_cdi_values(input_file)
+
+        result = generate_initial_cdi_values(self.publication.id, input_file)
+
+        self.assertEqual(result["id"], self.publication.id)
+        self.assertEqual(result["processing"]["mode"], "window")
+        self.assertGreater(result["processing"]["peak_memory"], 0)
+        self.publication.refresh_from_db()
+        initial_values = self.publication.initial_values
+        self.assertEqual(len(initial_values), 59)
+        for item in initial_values:
+            value = expected[item["administration_id"]]
+            self.assertIsNotNone(value)
+            self.assertAlmostEqual(item["value"], value, places=5)
+            self.assertEqual(item["category"], get_category(item["value"]))
+
+    def test_label_grid_is_reused(self):
+        first_file = os.path.join(self.temp_dir, "cdi_1.tif")
+        second_file = os.path.join(self.temp_dir, "cdi_2.tif")
+        write_cdi_raster(first_file)
+        write_cdi_raster(second_file)
+
+        generate_initial_cdi_values(self.publication.id, first_file)
+        self.assertEqual(len(os.listdir(self.label_grids_dir)), 1)
+        self.publication.refresh_from_db()
+        first_values = self.publication.initial_values
+
+        with patch.object(
+            zonal_stats,
+            "rasterize_zones",
+            wraps=zonal_stats.rasterize_zones
+        ) as mock_rasterize:
+            generate_initial_cdi_values(self.publication.id, second_file)
+            mock_rasterize.assert_not_called()
+        self.publication.refresh_from_db()
+        self.assertEqual(self.publication.initial_values, first_values)
+
+        # A raster on a different grid gets its own label grid
+        third_file = os.path.join(self.temp_dir, "cdi_3.tif")
+        write_cdi_raster(third_file, west=30.6, size=(200, 180))
+        generate_initial_cdi_values(self.publication.id, third_file)
+        self.assertEqual(len(os.listdir(self.label_grids_dir)), 2)
+
+    @override_settings(CDI_STREAMING_PIXELS=1000)
+    def test_block_streaming_matches_window_read(self):
+        input_file = os.path.join(self.temp_dir, "cdi.tif")
+        write_cdi_raster(input_file, tiled=True, blockxsize=32, blockysize=32)
+        with rasterio.open(input_file) as src:
+            gdf = boundary_store.get_geodataframe()
+            expected = zonal_stats.zonal_statistics(src, gdf.geometry)
+
+        result = generate_initial_cdi_values(self.publication.id, input_file)
+
+        self.assertEqual(result["processing"]["mode"], "block")
+        self.assertIn("peak_memory", result["processing"])
+        result = generate_initial_cdi_values(
+            self.publication.id, input_file, trace_memory=False
+        )
+        self.assertNotIn("peak_memory", result["processing"])
+        self.assertIn("duration", result["processing"])
+        self.publication.refresh_from_db()
+        for item, count, min_val, mean_val in zip(
+            self.publication.initial_values,
+            expected["count"],
+            expected["min"],
+            expected["mean"],
+        ):
+            self.assertGreater(count, 0)
+            self.assertAlmostEqual(
+                item["value"],
+                (min_val + mean_val) * 0.5,
+                places=9
+            )
+
+        # Streaming without a label grid cache gives the same statistics
+        with rasterio.open(input_file) as src:
+            stats = zonal_stats.zonal_statistics(
+                src,
+                gdf.geometry,
+                max_window_pixels=0
+            )
+        self.assertEqual(stats["mode"], "block")
+        np.testing.assert_array_equal(stats["count"], expected["count"])
+        np.testing.assert_allclose(stats["mean"], expected["mean"])
+        np.testing.assert_array_equal(stats["min"], expected["min"])
+
+    def test_percentiles_above_histogram_range(self):
+        input_file = os.path.join(self.temp_dir, "cdi.tif")
+        write_cdi_raster(
+            input_file, high=3, tiled=True, blockxsize=32, blockysize=32
+        )
+        gdf = boundary_store.get_geodataframe()
+        with rasterio.open(input_file) as src:
+            stats = zonal_stats.zonal_statistics(src, gdf.geometry)
+            streamed = zonal_stats.zonal_statistics(
+                src, gdf.geometry, max_window_pixels=0
+            )
+            data = src.read(1, masked=True)
+            labels = zonal_stats.rasterize_zones(
+                gdf.geometry, data.shape, src.transform
+            )
+        # The range grew to [0, 4], the same whether streamed or not
+        self.assertEqual(stats["histogram_max"], 4)
+        self.assertEqual(streamed["histogram_max"], 4)
+        np.testing.assert_array_equal(
+            streamed["histogram"], stats["histogram"]
+        )
+        zone = 0
+        values = data.data[(labels == zone + 1) & ~data.mask]
+        values = values[values >= 0]
+        self.assertGreater(np.percentile(values, 90), 1)
+        for name, q in [("median", 50), ("p90", 90)]:
+            self.assertAlmostEqual(
+                get_aggregator(name)(stats)[zone],
+                np.percentile(values, q, method="inverted_cdf"),
+                delta=0.004
+            )
+
+    def test_aggregation_strategies(self):
+        input_file = os.path.join(self.temp_dir, "cdi.tif")
+        write_cdi_raster(input_file)
+        gdf = boundary_store.get_geodataframe()
+        with rasterio.open(input_file) as src:
+            stats = zonal_stats.zonal_statistics(src, gdf.geometry)
+            data = src.read(1, masked=True)
+
+        # Percentiles from the histograms stay within one bin (0.001)
+        # of the exact percentile of the zone's pixels
+        zone = 0
+        labels = zonal_stats.rasterize_zones(
+            gdf.geometry,
+            data.shape,
+            rasterio.open(input_file).transform
+        )
+        values = data.data[(labels == zone + 1) & ~data.mask]
+        values = values[values >= 0]
+        for name, q in [("median", 50), ("p10", 10), ("p90", 90)]:
+            self.assertAlmostEqual(
+                get_aggregator(name)(stats)[zone],
+                np.percentile(values, q, method="inverted_cdf"),
+                delta=0.001
+            )
+        np.testing.assert_allclose(
+            get_aggregator("min_mean")(stats),
+            (stats["min"] + stats["mean"]) * 0.5
+        )
+        self.assertTrue(is_valid_aggregation("p25"))
+        self.assertFalse(is_valid_aggregation("p100"))
+        self.assertFalse(is_valid_aggregation("mode"))
+
+        result = generate_initial_cdi_values(
+            self.publication.id,
+            input_file,
+            "median",
+            True
+        )
+        self.assertEqual(result["processing"]["aggregation"], "median")
+        item = result["initial_values"][zone]
+        self.assertEqual(item["value"], get_aggregator("median")(stats)[zone])
+        statistics = item["statistics"]
+        self.assertEqual(statistics["count"], stats["count"][zone])
+        self.assertEqual(
+            list(statistics["fraction_in_class"]),
+            [str(c) for c in CLASS_CATEGORIES]
+        )
+        self.assertAlmostEqual(
+            sum(statistics["fraction_in_class"].values()),
+            1,
+            places=4
+        )
+
+    def test_raster_outside_country(self):
+        input_file = os.path.join(self.temp_dir, "cdi.tif")
+        write_cdi_raster(input_file, west=0, north=0, size=(20, 20))
+
+        generate_initial_cdi_values(self.publication.id, input_file)
+
+        self.publication.refresh_from_db()
+        self.assertEqual(len(self.publication.initial_values), 59)
+        for item in self.publication.initial_values:
+            self.assertIsNone(item["value"])
+            self.assertIsNone(item["category"])
+
+    def test_publication_does_not_exist(self):
+        self.assertFalse(generate_initial_cdi_values(0, "missing.tif"))
+        self.assertFalse(stream_initial_cdi_values(0, "http://geonode/1"))
+
+    def test_stream_reads_raster_in_place(self):
+        download_url = "http://geonode:8000/download/44"
+        input_file = os.path.join(self.temp_dir, "cdi.tif")
+        write_cdi_raster(input_file)
+        expected = generate_initial_cdi_values(self.publication.id, input_file)
+        rasterio_open = rasterio.open
+
+        def open_remote(path, *args, **kwargs):
+            self.assertEqual(path, f"/vsicurl/{download_url}")
+            return rasterio_open(input_file, *args, **kwargs)
+
+        with patch.object(downloads.rasterio, "open", open_remote), \
+                patch.object(downloads, "download_raster") as mock_download:
+            result = stream_initial_cdi_values(
+                self.publication.id,
+                download_url,
+                44,
+            )
+            mock_download.assert_not_called()
+
+        self.assertEqual(result["initial_values"], expected["initial_values"])
+        processing = result["processing"]
+        self.assertEqual(processing["source"], "vsicurl")
+        self.assertEqual(
+            list(processing["stages"]),
+            ["open", "zonal_stats", "save"]
+        )
+
+        # The results hook keeps the stage timings in the job info
+        job = Jobs.objects.create(
+            type=JobTypes.stream_initial_cdi_values,
+            status=JobStatus.on_progress,
+            task_id="stream-task",
+            info={"id": self.publication.id, "subject": None, "message": None},
+        )
+        generate_initial_cdi_values_results(
+            MagicMock(id="stream-task", success=True, result=result)
+        )
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.done)
+        self.assertEqual(job.info["processing"]["stages"], processing["stages"])
+
+    def test_stream_falls_back_to_download(self):
+        input_file = os.path.join(self.temp_dir, "cdi.tif")
+        write_cdi_raster(input_file)
+        expected = generate_initial_cdi_values(self.publication.id, input_file)
+        rasterio_open = rasterio.open
+
+        def open_local(path, *args, **kwargs):
+            if path.startswith("/vsicurl/"):
+                raise RasterioIOError("HTTP response code: 403")
+            return rasterio_open(path, *args, **kwargs)
+
+        def download(download_url, filename, geonode_id):
+            downloaded = os.path.join(self.temp_dir, filename)
+            shutil.copy(input_file, downloaded)
+            return downloaded
+
+        with patch.object(downloads.rasterio, "open", open_local), \
+                patch.object(downloads, "download_raster", download):
+            with patch("time.time", return_value=1):
+                result = stream_initial_cdi_values(
+                    self.publication.id,
+                    "http://geonode:8000/download/44",
+                    44,
+                )
+
+        self.assertEqual(result["processing"]["source"], "download")
+        self.assertEqual(result["initial_values"], expected["initial_values"])
+        # The raster is only pinned while it is read
+        self.assertEqual(
+            sorted(os.listdir(self.temp_dir)),
+            ["cdi.tif", "label_grids", "raster_44_1.tif"]
+        )
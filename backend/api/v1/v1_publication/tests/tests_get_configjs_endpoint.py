@@ -1,17 +1,95 @@
+import gzip
 import os
 from pathlib import Path
 from django.test import TestCase
 from django.test.utils import override_settings
+from api.v1.v1_publication.config_bundle import (
+    config_bundles,
+    get_config_path,
+)
+from api.v1.v1_publication.constants import BoundaryTier
 
-config_path = "source/config/config.min.js"
+config_path = get_config_path(BoundaryTier.full)
+config_gzip_path = f"{config_path}.gz"
 
 
 @override_settings(USE_TZ=False, TEST_ENV=True)
 class ConfigJS(TestCase):
+    def setUp(self):
+        for bundle in config_bundles.values():
+            bundle.clear()
+        self.config_bundle = config_bundles[BoundaryTier.full]
+
+    def tearDown(self):
+        for bundle in config_bundles.values():
+            bundle.clear()
+
     def test_config_generation(self):
-        if Path(config_path).exists():
-            os.remove(config_path)
+        for path in [config_path, config_gzip_path]:
+            if Path(path).exists():
+                os.remove(path)
         self.assertFalse(Path(config_path).exists())
-        self.client.get("/api/v1/config.js", follow=True)
+        response = self.client.get("/api/v1/config.js", follow=True)
         self.assertTrue(Path(config_path).exists())
+        self.assertTrue(Path(config_gzip_path).exists())
+        self.assertIn(b"var administration_index=[", response.content)
+        self.assertIn(b"var administration_index_version=", response.content)
         os.remove(config_path)
+        os.remove(config_gzip_path)
+
+    def test_versioned_config(self):
+        response = self.client.get("/api/v1/config.js")
+        self.assertEqual(response.status_code, 302)
+        version = self.config_bundle.version
+        self.assertEqual(response["Location"], f"?v={version}")
+        self.assertNotIn("immutable", response["Cache-Control"])
+
+        url = f"/api/v1/config.js?v={version}"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+        self.assertIn(b"var topojson=", response.content)
+        etag = response["ETag"]
+        self.assertEqual(etag, f'"{version}"')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # A stale version is sent to the current one
+        response = self.client.get("/api/v1/config.js?v=stale")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], f"?v={version}")
+
+    def test_precompressed_config(self):
+        version = self.config_bundle.version
+        response = self.client.get(
+            f"/api/v1/config.js?v={version}",
+            HTTP_ACCEPT_ENCODING="gzip, deflate",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["ETag"], f'W/"{version}"')
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(
+            gzip.decompress(response.content), self.config_bundle.content
+        )
+
+    def test_config_tiers(self):
+        response = self.client.get("/api/v1/config.js?tier=overview")
+        self.assertEqual(response.status_code, 302)
+        overview = config_bundles[BoundaryTier.overview]
+        self.assertEqual(
+            response["Location"], f"?tier=overview&v={overview.version}"
+        )
+        response = self.client.get(
+            "/api/v1/config.js?tier=overview", follow=True
+        )
+        self.assertEqual(response.status_code, 200)
+        default = config_bundles[BoundaryTier.default]
+        self.assertLess(len(response.content), len(default.content))
+        # Without a tier the full boundaries are served
+        self.assertLess(len(default.content), len(self.config_bundle.content))
+
+        response = self.client.get("/api/v1/config.js?tier=huge")
+        self.assertEqual(response.status_code, 400)
@@ -1,3 +1,7 @@
+import json
+import os
+import shutil
+import tempfile
 from unittest.mock import patch, MagicMock
 from django.test import TestCase
 from django.core.management import call_command
@@ -10,6 +14,9 @@ from api.v1.v1_publication.constants import (
     CDIGeonodeCategory,
 )
 from api.v1.v1_jobs.models import Jobs, JobStatus, JobTypes
+from api.v1.v1_publication.tests.tests_generate_initial_cdi_values_job import (
+    write_cdi_raster,
+)
 
 
 @override_settings(
@@ -175,6 +182,11 @@ class PublicationsSeederCommandTestCase(TestCase):
         )
         self.assertEqual(existing_publication.narrative, "")
         self.assertIsNotNone(existing_publication.published_at)
+        # Its downloadable maps are pre-rendered, as for the backfill
+        job = Jobs.objects.get(type=JobTypes.export_artifacts)
+        self.assertEqual(
+            job.info, {"publication_id": existing_publication.id}
+        )
 
         # Only 5 new publications should be created (excluding existing)
         total_publications = Publication.objects.count()
@@ -357,3 +369,105 @@ class PublicationsSeederCommandTestCase(TestCase):
         # No publications should be created
         total_publications = Publication.objects.count()
         self.assertEqual(total_publications, 0)
+
+    @patch("api.v1.v1_publication.management.commands.publications_seeder"
+           ".download_geonode_dataset")
+    @patch("requests.get")
+    def test_backfill_publications(self, mock_get, mock_download):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        checkpoint = os.path.join(temp_dir, "backfill.json")
+        label_grids_patcher = patch(
+            "api.v1.v1_jobs.job.label_grids_dir",
+            os.path.join(temp_dir, "label_grids")
+        )
+        label_grids_patcher.start()
+        self.addCleanup(label_grids_patcher.stop)
+
+        resources = self.mock_response_data["resources"]
+        pages = {
+            f"page={page}": {
+                "total": 6,
+                "page_size": 4,
+                "resources": resources[(page - 1) * 4:page * 4],
+            }
+            for page in [1, 2]
+        }
+
+        def get_page(url, **kwargs):
+            page = next(k for k in pages if k in url)
+            return MagicMock(status_code=200, json=lambda: pages[page])
+
+        def download(download_url, filename, cdi_geonode_id):
+            if download_url.endswith("/3"):
+                return False
+            input_file = os.path.join(temp_dir, filename)
+            write_cdi_raster(input_file)
+            return input_file
+
+        mock_get.side_effect = get_page
+        mock_download.side_effect = download
+        Publication.objects.create(
+            cdi_geonode_id=6,
+            year_month="2024-07-01",
+            initial_values=[{"administration_id": 1, "category": 1}],
+            due_date="2024-08-29",
+            status=PublicationStatus.published,
+        )
+
+        out = StringIO()
+        call_command(
+            "publications_seeder",
+            "--backfill",
+            "--workers=1",
+            f"--checkpoint={checkpoint}",
+            stdout=out,
+        )
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(Publication.objects.count(), 6)
+        self.assertEqual(mock_download.call_count, 5)
+        published = Publication.objects.exclude(cdi_geonode_id=3)
+        for publication in published:
+            self.assertTrue(publication.validated_values)
+            self.assertIsNotNone(publication.published_at)
+        self.assertEqual(
+            Jobs.objects.filter(
+                type=JobTypes.initial_cdi_values,
+                status=JobStatus.done,
+            ).count(),
+            4
+        )
+        # Memory is not traced while rasters may be processed in threads
+        for job in Jobs.objects.filter(
+            type=JobTypes.initial_cdi_values,
+            status=JobStatus.done,
+        ):
+            self.assertNotIn("peak_memory", job.result)
+        with open(checkpoint) as f:
+            self.assertEqual(
+                json.load(f),
+                {"done": [1, 2, 4, 5], "failed": {"3": (
+                    "Failed to download http://geonode:8000/download/3"
+                )}}
+            )
+        self.assertIn("5/5", out.getvalue())
+        self.assertIn("1 rasters failed", out.getvalue())
+
+        # Resuming only retries the raster that failed
+        mock_download.reset_mock()
+        mock_download.side_effect = lambda url, *args: download(
+            "http://geonode:8000/download/ok",
+            *args
+        )
+        call_command(
+            "publications_seeder",
+            "--backfill",
+            "--workers=1",
+            f"--checkpoint={checkpoint}",
+            stdout=StringIO(),
+        )
+        mock_download.assert_called_once()
+        self.assertTrue(
+            Publication.objects.get(cdi_geonode_id=3).validated_values
+        )
@@ -1,5 +1,9 @@
+from unittest.mock import patch
 from rest_framework.test import APITestCase
 from rest_framework import status
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from django.test.utils import override_settings
@@ -7,12 +11,19 @@ from api.v1.v1_publication.models import (
     Publication,
     PublicationStatus,
 )
+from api.v1.v1_jobs.job import publish_seeded_publication
 from api.v1.v1_publication.constants import DroughtCategory
+from api.v1.v1_publication.boundaries import boundary_store
+from api.v1.v1_publication.encoding import (
+    get_index_version,
+    unpack_categories,
+)
 
 
 @override_settings(USE_TZ=False, TEST_ENV=True)
 class PublishedMapViewSetTestCase(APITestCase):
     def setUp(self):
+        cache.clear()
         self.published = Publication.objects.create(
             year_month="2025-02-01",
             cdi_geonode_id=44,
@@ -125,3 +136,177 @@ class PublishedMapViewSetTestCase(APITestCase):
             response.status_code,
             status.HTTP_404_NOT_FOUND
         )
+
+    def test_published_map_http_cache(self):
+        url = reverse(
+            "map-details",
+            kwargs={"version": "v1", "pk": self.published.id}
+        )
+        response = self.client.get(url, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("max-age=60", response["Cache-Control"])
+
+        # Only the published content version is queried
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                url,
+                format="json",
+                HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format="json")
+        self.assertEqual(
+            response.data["narrative"],
+            "Lorem ipsum dolor amet..."
+        )
+
+        # Updating a publication changes the version
+        self.published.narrative = "Updated narrative"
+        self.published.updated_at = timezone.now()
+        self.published.save()
+        response = self.client.get(
+            url,
+            format="json",
+            HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["narrative"], "Updated narrative")
+
+        # Query params are part of the key
+        list_url = reverse("maps", kwargs={"version": "v1"})
+        response = self.client.get(list_url, format="json")
+        self.assertEqual(response.data["total"], 1)
+        response = self.client.get(
+            f"{list_url}?left_date=2024-01-01&right_date=2024-02-01",
+            format="json"
+        )
+        self.assertEqual(response.data["total"], 0)
+        self.assertNotIn("ETag", self.client.get(
+            f"{list_url}?left_date=invalid"
+        ))
+
+        # So are the scheme and host, the links of the pages are absolute
+        response = self.client.get(list_url, format="json")
+        with self.settings(ALLOWED_HOSTS=["testserver", "maps.example.com"]):
+            for extra in [
+                {"secure": True},
+                {"HTTP_HOST": "maps.example.com"},
+            ]:
+                self.assertNotEqual(
+                    self.client.get(list_url, format="json", **extra)["ETag"],
+                    response["ETag"]
+                )
+
+    # Seeded publications are published at their (aware) due date
+    @override_settings(USE_TZ=True)
+    @patch("api.v1.v1_jobs.job.async_task")
+    def test_published_map_list_after_backfill(self, mock_async_task):
+        mock_async_task.return_value = "task-id"
+        # A past month seeded earlier, not published yet
+        backfilled = Publication.objects.create(
+            year_month="2024-12-01",
+            cdi_geonode_id=43,
+            due_date="2025-01-29",
+            initial_values=[
+                {"administration_id": 11, "category": DroughtCategory.d1},
+            ],
+            status=PublicationStatus.published,
+        )
+        backfilled.refresh_from_db()
+        url = reverse("maps", kwargs={"version": "v1"})
+        response = self.client.get(url, format="json")
+        self.assertEqual(response.data["total"], 1)
+        etag = response["ETag"]
+
+        # Neither the count nor the latest published_at change
+        publish_seeded_publication(backfilled)
+        response = self.client.get(
+            url,
+            format="json",
+            HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total"], 2)
+        self.assertEqual(
+            [item["id"] for item in response.data["data"]],
+            [self.published.id, backfilled.id]
+        )
+
+    def test_published_map_list_projection(self):
+        url = reverse("maps", kwargs={"version": "v1"})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f"{url}?view=summary")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(response.data["data"][0]),
+            [
+                "id",
+                "cdi_geonode_id",
+                "year_month",
+                "published_at",
+                "bulletin_url",
+                "created_at",
+                "updated_at",
+            ],
+        )
+        # The heavy columns are not even selected
+        sql = context.captured_queries[-1]["sql"]
+        self.assertNotIn("validated_values", sql)
+        self.assertNotIn("narrative", sql)
+
+        response = self.client.get(f"{url}?fields=year_month,narrative")
+        self.assertEqual(
+            list(response.data["data"][0]),
+            ["id", "year_month", "narrative"],
+        )
+        self.assertEqual(
+            response.data["data"][0]["narrative"],
+            "Lorem ipsum dolor amet..."
+        )
+
+        response = self.client.get(f"{url}?fields=year_month,password")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(f"{url}?view=compact")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_published_map_packed_values(self):
+        index = boundary_store.get_administration_index()
+        self.assertEqual(len(index), 59)
+        validated_values = [
+            {"administration_id": administration_id, "category": i % 6}
+            for i, administration_id in enumerate(index)
+        ]
+        validated_values[3]["category"] = DroughtCategory.none
+        self.published.validated_values = validated_values[1:]
+        self.published.save()
+
+        url = reverse(
+            "map-details",
+            kwargs={"version": "v1", "pk": self.published.id}
+        )
+        response = self.client.get(f"{url}?encoding=packed")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("validated_values", response.data)
+        self.assertEqual(response.data["index_version"], get_index_version(
+            index
+        ))
+        unpacked = unpack_categories(response.data["packed_values"])
+        self.assertEqual(len(unpacked), 59)
+        # Missing administrations are No Data
+        self.assertEqual(unpacked[0]["category"], DroughtCategory.none)
+        self.assertEqual(unpacked[1:], validated_values[1:])
+
+        response = self.client.get(
+            reverse("maps", kwargs={"version": "v1"}),
+            {"encoding": "packed"}
+        )
+        self.assertEqual(
+            unpack_categories(response.data["data"][0]["packed_values"]),
+            unpacked
+        )
+        response = self.client.get(f"{url}?encoding=bits")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+from api.v1.v1_jobs import downloads
+from api.v1.v1_jobs.workspace import RasterWorkspace
+
+
+@override_settings(USE_TZ=False, TEST_ENV=True, RASTER_CACHE_MAX_BYTES=2500)
+class RasterWorkspaceTest(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "rasters")
+        os.makedirs(self.cache_dir)
+        for name, value in [
+            ("download_dir", self.temp_dir),
+            ("cache_dir", self.cache_dir),
+        ]:
+            patcher = patch.object(downloads, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Four 1000 bytes rasters, used one after another
+        self.paths = []
+        for index in range(4):
+            path = os.path.join(self.cache_dir, f"raster_{index}_v.tif")
+            with open(path, "wb") as f:
+                f.write(b"0" * 1000)
+            os.utime(path, (1000 + index, 1000 + index))
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_least_recently_used_are_evicted(self):
+        workspace = downloads.get_workspace()
+        self.assertEqual(workspace.usage(), 4000)
+        # Using the oldest raster makes it the most recent
+        workspace.touch(self.paths[0])
+
+        evicted = workspace.evict()
+
+        self.assertEqual(
+            [e["path"] for e in evicted],
+            [self.paths[1], self.paths[2]]
+        )
+        self.assertEqual(workspace.usage(), 2000)
+
+    def test_pinned_rasters_are_kept(self):
+        workspace = downloads.get_workspace()
+        with workspace.pin(self.paths[0]):
+            self.assertTrue(workspace.is_pinned(self.paths[0]))
+            # Making room for a 1000 bytes raster leaves 1500 bytes
+            evicted = workspace.reserve(1000)
+        self.assertFalse(workspace.is_pinned(self.paths[0]))
+        self.assertEqual(
+            [e["path"] for e in evicted],
+            [self.paths[1], self.paths[2], self.paths[3]]
+        )
+
+        # Pins of processes that are gone are ignored
+        stale_pin = f"{self.paths[0]}.999999999-{'0' * 32}.pin"
+        open(stale_pin, "w").close()
+        self.assertFalse(workspace.is_pinned(self.paths[0]))
+        self.assertFalse(os.path.exists(stale_pin))
+
+    def test_no_budget(self):
+        workspace = RasterWorkspace(self.cache_dir)
+        self.assertEqual(workspace.evict(), [])
+        self.assertEqual(workspace.usage(), 4000)
+
+    def test_raster_workspace_command(self):
+        legacy = os.path.join(self.temp_dir, "raster_9_1234567890.tif")
+        with open(legacy, "wb") as f:
+            f.write(b"0" * 100)
+
+        out = StringIO()
+        call_command("raster_workspace", verbosity=2, stdout=out)
+        self.assertIn("4 files, 3.9 KB of 2.4 KB, 0 pinned", out.getvalue())
+        self.assertIn("raster_0_v.tif", out.getvalue())
+
+        out = StringIO()
+        call_command(
+            "raster_workspace",
+            "--prune",
+            "--legacy",
+            "--dry-run",
+            stdout=out,
+        )
+        self.assertIn("Would delete 3 files, 2.1 KB", out.getvalue())
+        self.assertEqual(len(os.listdir(self.cache_dir)), 4)
+        self.assertTrue(os.path.exists(legacy))
+
+        out = StringIO()
+        call_command(
+            "raster_workspace",
+            "--prune",
+            "--max-bytes=1000",
+            "--legacy",
+            stdout=out,
+        )
+        self.assertIn("Deleted 4 files, 3.0 KB", out.getvalue())
+        self.assertEqual(os.listdir(self.cache_dir), ["raster_3_v.tif"])
+        self.assertFalse(os.path.exists(legacy))
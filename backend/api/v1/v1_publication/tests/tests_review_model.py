@@ -58,3 +58,52 @@ class ReviewModelTest(TestCase):
                 "['JSON values must be a list of objects.']}"
             ),
         )
+
+    def test_review_counters(self):
+        review = Review.objects.create(
+            publication=self.publication,
+            user=self.user,
+            suggestion_values=[
+                {"administration_id": 1, "value": 75, "reviewed": True},
+                {"administration_id": 2, "value": 50, "reviewed": False},
+            ],
+        )
+        self.assertEqual(review.reviewed_count, 1)
+        review.suggestion_values[1]["reviewed"] = True
+        review.is_completed = True
+        review.save(update_fields=["suggestion_values", "is_completed"])
+        review.refresh_from_db()
+        self.assertEqual(review.reviewed_count, 2)
+
+        Review.objects.create(publication=self.publication, user=self.user)
+        self.publication.update_review_counters()
+        self.publication.refresh_from_db()
+        self.assertEqual(self.publication.reviews_total, 2)
+        self.assertEqual(self.publication.reviews_completed, 1)
+
+    def test_review_counters_after_deletion(self):
+        reviewer = SystemUser.objects.create(
+            email="reviewer@example.com",
+            password="password123",
+        )
+        Review.objects.create(
+            publication=self.publication,
+            user=self.user,
+            is_completed=True,
+        )
+        review = Review.objects.create(
+            publication=self.publication,
+            user=reviewer,
+        )
+        self.publication.update_review_counters()
+
+        review.delete()
+        self.publication.refresh_from_db()
+        self.assertEqual(self.publication.reviews_total, 1)
+        self.assertEqual(self.publication.reviews_completed, 1)
+
+        # Cascaded from the hard deletion of the reviewer
+        SystemUser.objects.filter(pk=self.user.pk).hard_delete()
+        self.publication.refresh_from_db()
+        self.assertEqual(self.publication.reviews_total, 0)
+        self.assertEqual(self.publication.reviews_completed, 0)
@@ -0,0 +1,128 @@
+from datetime import date
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+from api.v1.v1_users.models import SystemUser
+from api.v1.v1_users.constants import UserRoleTypes
+from api.v1.v1_publication.constants import DroughtCategory
+from api.v1.v1_publication.models import Publication, Review
+from api.v1.v1_publication.votes import ReviewVotes, get_review_votes
+
+D1 = DroughtCategory.d1
+D2 = DroughtCategory.d2
+D3 = DroughtCategory.d3
+
+
+@override_settings(USE_TZ=False, TEST_ENV=True)
+class ReviewVotesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.initial_values = [
+            {"administration_id": 1, "value": 3, "category": D1},
+            {"administration_id": 2, "value": 5, "category": D2},
+            {
+                "administration_id": 3,
+                "value": -9999,
+                "category": DroughtCategory.none,
+            },
+        ]
+
+    def test_votes(self):
+        votes = ReviewVotes(
+            self.initial_values,
+            [
+                {"administration_id": 1, "category": D1},
+                {"administration_id": 2, "category": None},
+            ],
+            [
+                (
+                    10,
+                    [
+                        {"administration_id": 1, "category": D1},
+                        {"administration_id": 2, "category": D3},
+                    ],
+                ),
+                (
+                    11,
+                    [
+                        {"administration_id": 1, "category": D1},
+                        {"administration_id": 2, "category": D2},
+                    ],
+                ),
+            ],
+        )
+        self.assertEqual(
+            votes.votes[2],
+            {D2: 2, D3: 1}
+        )
+        self.assertEqual(votes.consensus_ids, {1})
+        self.assertEqual(votes.disputed_ids, {2})
+        self.assertEqual(votes.non_validated_ids, {2})
+        self.assertEqual(len(votes.get_reviews()), 4)
+        self.assertEqual(votes.get_reviews()[0]["user_id"], 10)
+        # The two suggestions of administration 1 and its initial value
+        self.assertEqual(
+            [r["administration_id"] for r in votes.get_reviews(True)],
+            [1, 1, 1]
+        )
+        self.assertEqual(
+            [r["user_id"] for r in votes.get_reviews(False, True)],
+            [10, 11]
+        )
+        self.assertEqual(votes.get_reviews(True, True), [])
+
+    def test_cached_until_reviews_change(self):
+        publication = Publication.objects.create(
+            year_month=date(2025, 1, 1),
+            cdi_geonode_id=1,
+            initial_values=self.initial_values,
+            due_date=date(2025, 2, 1),
+        )
+        users = [
+            SystemUser.objects.create(
+                email=f"reviewer{i}@example.com",
+                name=f"Reviewer {i}",
+                role=UserRoleTypes.reviewer,
+            )
+            for i in range(2)
+        ]
+        Review.objects.create(
+            publication=publication,
+            user=users[0],
+            is_completed=True,
+            completed_at=timezone.now(),
+            suggestion_values=[
+                {"administration_id": 1, "category": D1},
+            ],
+        )
+        votes = get_review_votes(publication, publication.completed_reviews)
+        self.assertEqual(len(votes.get_reviews()), 1)
+        with self.assertNumQueries(1):
+            get_review_votes(publication, publication.completed_reviews)
+
+        Review.objects.create(
+            publication=publication,
+            user=users[1],
+            is_completed=True,
+            completed_at=timezone.now(),
+            suggestion_values=[
+                {"administration_id": 1, "category": D2},
+            ],
+        )
+        votes = get_review_votes(publication, publication.completed_reviews)
+        self.assertEqual(len(votes.get_reviews()), 2)
+        self.assertEqual(votes.disputed_ids, {1})
+
+        publication.validated_values = [
+            {"administration_id": 1, "category": None},
+        ]
+        votes = get_review_votes(publication, publication.completed_reviews)
+        self.assertEqual(votes.non_validated_ids, {1})
+
+        # New initial values, e.g. regenerated from the raster
+        publication.initial_values = [
+            {"administration_id": 1, "value": 3, "category": D3},
+        ]
+        votes = get_review_votes(publication, publication.completed_reviews)
+        self.assertEqual(votes.votes[1], {D1: 1, D2: 1, D3: 1})
@@ -308,3 +308,13 @@ class ReviewViewSetTestCase(APITestCase):
         self.assertFalse(
             Review.objects.filter(pk=self.review.id).exists()
         )
+        # The review counters of the publication follow
+        self.publication.refresh_from_db()
+        self.assertEqual(
+            self.publication.reviews_total,
+            self.publication.reviews.count()
+        )
+        self.assertEqual(
+            self.publication.reviews_completed,
+            self.publication.reviews.filter(is_completed=True).count()
+        )
@@ -0,0 +1,195 @@
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test.utils import override_settings
+from rest_framework.test import APITestCase
+from api.v1.v1_users.models import SystemUser, UserRoleTypes
+from api.v1.v1_publication.models import (
+    GeonodeResource,
+    Publication,
+    PublicationStatus,
+)
+from api.v1.v1_publication.constants import (
+    CDIGeonodeCategory,
+    DroughtCategory,
+)
+
+
+def make_resource(pk, date, last_updated, title=None):
+    return {
+        "pk": pk,
+        "title": title or f"CDI Raster {pk}",
+        "detail_url": f"https://geonode.com/catalogue/#/dataset/{pk}",
+        "embed_url": f"https://geonode.com/datasets/geonode:cdi{pk}/embed",
+        "thumbnail_url": f"https://geonode.com/uploaded/thumbs/{pk}.jpg",
+        "download_url": (
+            f"https://geonode.com/datasets/geonode:cdi{pk}/dataset_download"
+        ),
+        "created": date,
+        "date": date,
+        "last_updated": last_updated,
+    }
+
+
+def make_response(resources, page=1, page_size=100, total=None):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {
+        "total": len(resources) if total is None else total,
+        "page": page,
+        "page_size": page_size,
+        "resources": resources,
+    }
+    return response
+
+
+@override_settings(USE_TZ=False, TEST_ENV=True)
+class SyncGeonodeResourcesTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = "/api/v1/admin/cdi-geonode"
+        call_command("generate_admin_seeder", "--test", True)
+        self.user = SystemUser.objects.filter(
+            role=UserRoleTypes.admin
+        ).first()
+        self.client.force_authenticate(user=self.user)
+        # 12 monthly rasters, updated in the same order
+        self.resources = [
+            make_resource(
+                pk,
+                f"2024-{pk:02d}-01T00:00:00Z",
+                f"2025-01-{pk:02d}T00:00:00Z",
+            )
+            for pk in range(1, 13)
+        ]
+
+    def sync(self, *args):
+        out = StringIO()
+        call_command(
+            "sync_geonode_resources",
+            "-c",
+            CDIGeonodeCategory.cdi,
+            *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    @patch("requests.Session.get")
+    def test_incremental_sync(self, mock_get):
+        mock_get.side_effect = [
+            make_response(self.resources[:5], page=1, page_size=5, total=12),
+            make_response(self.resources[5:10], page=2, page_size=5, total=12),
+            make_response(self.resources[10:], page=3, page_size=5, total=12),
+        ]
+        out = self.sync()
+        self.assertIn("cdi-raster-map: 12 synced, 0 deleted", out)
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertNotIn("last_updated.gte", mock_get.call_args_list[0][0][0])
+        self.assertEqual(
+            GeonodeResource.objects.filter(
+                category=CDIGeonodeCategory.cdi
+            ).count(),
+            12,
+        )
+
+        # Only the resources updated since the last sync are requested
+        updated = make_resource(
+            3,
+            "2024-03-01T00:00:00Z",
+            "2025-02-01T00:00:00Z",
+            title="CDI Raster 3 (revised)",
+        )
+        mock_get.side_effect = [make_response([updated])]
+        out = self.sync()
+        self.assertIn("cdi-raster-map: 1 synced, 0 deleted", out)
+        url = mock_get.call_args[0][0]
+        self.assertIn("filter{last_updated.gte}=2025-01-12T00%3A00%3A00", url)
+        self.assertEqual(GeonodeResource.objects.count(), 12)
+        self.assertEqual(
+            GeonodeResource.objects.get(geonode_id=3).title,
+            "CDI Raster 3 (revised)",
+        )
+
+    @patch("requests.Session.get")
+    def test_full_sync_removes_deleted_resources(self, mock_get):
+        mock_get.return_value = make_response(self.resources)
+        self.sync()
+        mock_get.return_value = make_response(self.resources[:10])
+        out = self.sync("--full")
+        self.assertIn("cdi-raster-map: 10 synced, 2 deleted", out)
+        self.assertFalse(
+            GeonodeResource.objects.filter(geonode_id__in=[11, 12]).exists()
+        )
+        self.assertNotIn("last_updated.gte", mock_get.call_args[0][0])
+
+    @patch("requests.Session.get")
+    def test_sync_failure(self, mock_get):
+        mock_get.return_value.status_code = 500
+        out = self.sync()
+        self.assertIn("cdi-raster-map: Failed to fetch page 1: 500", out)
+        self.assertFalse(GeonodeResource.objects.exists())
+
+    @patch("requests.Session.get")
+    def test_list_from_mirror(self, mock_get):
+        mock_get.return_value = make_response(self.resources)
+        self.sync()
+        mock_get.reset_mock()
+        # The review of March 2024 changes its year_month
+        publication = Publication.objects.create(
+            cdi_geonode_id=3,
+            year_month="2025-03-01",
+            initial_values=[
+                {"administration_id": 1, "value": DroughtCategory.d1}
+            ],
+            due_date="2025-04-01",
+            status=PublicationStatus.in_review,
+        )
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["current"], 1)
+        self.assertEqual(data["total"], 12)
+        self.assertEqual(data["total_page"], 2)
+        self.assertEqual(
+            [item["pk"] for item in data["data"]],
+            [12, 11, 10, 9, 8, 7, 6, 5, 4, 3],
+        )
+        self.assertEqual(data["data"][-1]["year_month"], "2025-03-01")
+        self.assertEqual(
+            data["data"][-1]["status"], PublicationStatus.in_review
+        )
+
+        # The sort is global, not per page
+        response = self.client.get(
+            f"{self.url}?page=2&sort=year_month&sort_order=desc"
+        )
+        data = response.json()
+        self.assertEqual([item["pk"] for item in data["data"]], [2, 1])
+        response = self.client.get(
+            f"{self.url}?sort=year_month&sort_order=desc"
+        )
+        data = response.json()
+        self.assertEqual(data["data"][0]["pk"], 3)
+
+        response = self.client.get(f"{self.url}?page=3")
+        data = response.json()
+        self.assertEqual(data["data"], [])
+        self.assertEqual(data["total"], 12)
+
+        response = self.client.get(
+            f"{self.url}?status={PublicationStatus.in_review}"
+        )
+        data = response.json()
+        self.assertEqual(data["total"], 1)
+        self.assertEqual(
+            data["data"][0]["publication_id"], publication.pk
+        )
+
+        response = self.client.get(f"{self.url}?id=5")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["pk"], 5)
+
+        # Served from the mirror without calling GeoNode
+        mock_get.assert_not_called()
@@ -0,0 +1,47 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+from api.v1.v1_publication.models import Publication, Review
+
+
+@override_settings(USE_TZ=False, TEST_ENV=True)
+class UpdateReviewCountersCommandTest(TestCase):
+    def setUp(self):
+        call_command("fake_users_seeder", "--test", True, "--repeat", 3)
+        call_command("fake_publications_seeder", "--test", True)
+
+    def test_counters_are_maintained(self):
+        for publication in Publication.objects.all():
+            self.assertEqual(
+                publication.reviews_total,
+                publication.reviews.count()
+            )
+            self.assertEqual(
+                publication.reviews_completed,
+                publication.reviews.filter(is_completed=True).count()
+            )
+        for review in Review.objects.all():
+            self.assertEqual(
+                review.reviewed_count,
+                len([
+                    s for s in review.suggestion_values or []
+                    if s.get("reviewed") is True
+                ])
+            )
+
+    def test_update_review_counters(self):
+        Publication.objects.update(reviews_total=0, reviews_completed=0)
+        Review.objects.update(reviewed_count=0)
+        out = StringIO()
+        call_command("update_review_counters", stdout=out)
+        self.assertIn(
+            "Updated the counters of {0} publications".format(
+                Publication.objects.count()
+            ),
+            out.getvalue()
+        )
+        self.test_counters_are_maintained()
+        self.assertTrue(
+            Publication.objects.filter(reviews_total__gt=0).exists()
+        )
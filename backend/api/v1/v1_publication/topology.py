@@ -0,0 +1,197 @@
+import numpy as np
+from shapely import STRtree
+from shapely.geometry import LineString, MultiPoint, MultiPolygon, Polygon
+
+# Times the tolerance of conflicting arcs is halved before they are kept
+# as they are in the source
+MAX_TOLERANCE_HALVINGS = 6
+# Finest grid the arcs are snapped to, far below the source precision
+MAX_QUANTIZATION = 10 ** 7
+
+
+def decode_arcs(topology: dict) -> list:
+    """
+    Absolute coordinates of every arc of `topology`, delta decoded and
+    transformed when it is quantized.
+    """
+    transform = topology.get("transform")
+    arcs = []
+    for arc in topology["arcs"]:
+        points = np.array(arc, dtype=float)[:, :2]
+        if transform:
+            points = np.cumsum(points, axis=0)
+            points = points * transform["scale"] + transform["translate"]
+        arcs.append(points)
+    return arcs
+
+
+def decode_geometries(topology: dict, object_name: str) -> list:
+    """
+    Shapely (multi)polygons of the geometries of `object_name`.
+    """
+    arcs = decode_arcs(topology)
+
+    def ring(indexes):
+        points = []
+        for index in indexes:
+            arc = arcs[index] if index >= 0 else arcs[~index][::-1]
+            points.extend(arc.tolist() if not points else arc[1:].tolist())
+        return points
+
+    def polygon(rings):
+        return Polygon(ring(rings[0]), [ring(hole) for hole in rings[1:]])
+
+    geometries = []
+    for geometry in topology["objects"][object_name]["geometries"]:
+        if geometry["type"] == "Polygon":
+            geometries.append(polygon(geometry["arcs"]))
+        else:
+            geometries.append(MultiPolygon([
+                polygon(rings) for rings in geometry["arcs"]
+            ]))
+    return geometries
+
+
+def _is_closed(points: np.ndarray) -> bool:
+    return len(points) > 2 and np.array_equal(points[0], points[-1])
+
+
+def simplify_arc(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas-Peucker simplification of one arc. The end points, where the
+    arc meets its neighbours, are always kept, and closed arcs (rings made
+    of a single arc) never collapse below 4 points.
+    """
+    if not tolerance or len(points) <= 2:
+        return points
+    simplified = np.array(
+        LineString(points).simplify(tolerance, preserve_topology=True).coords
+    )
+    if _is_closed(points) and len(simplified) < 4:
+        return points
+    return simplified
+
+
+def snap_arcs(arcs: list, quantization: int, bbox: tuple) -> tuple:
+    """
+    Snap the arcs to a `quantization` x `quantization` grid over `bbox`.
+    Repeated points are dropped, unless a closed arc would collapse.
+    """
+    x0, y0, x1, y1 = bbox
+    scale = [
+        (x1 - x0) / (quantization - 1) or 1,
+        (y1 - y0) / (quantization - 1) or 1,
+    ]
+    translate = [x0, y0]
+    snapped = []
+    for points in arcs:
+        grid = np.rint((points - translate) / scale).astype(np.int64)
+        keep = np.ones(len(grid), dtype=bool)
+        keep[1:] = np.any(grid[1:] != grid[:-1], axis=1)
+        deduplicated = grid[keep]
+        if len(deduplicated) < 2:
+            deduplicated = grid[[0, -1]]
+        elif _is_closed(grid) and len(deduplicated) < 4:
+            deduplicated = grid
+        snapped.append(deduplicated)
+    return snapped, {"scale": scale, "translate": translate}
+
+
+def arc_nodes(arcs: list) -> list:
+    """
+    (start, end) node ids of every arc, the same id for the arcs ending
+    at the same point.
+    """
+    ids = {}
+    return [
+        tuple(
+            ids.setdefault(tuple(point), len(ids))
+            for point in points[[0, -1]].tolist()
+        )
+        for points in arcs
+    ]
+
+
+def arc_conflicts(arcs: list, nodes: list) -> set:
+    """
+    Arcs breaking the topology, as index pairs: (i, j) when arcs i and j
+    cross or touch anywhere else than at the `nodes` they share, (i, i)
+    when arc i intersects itself.
+    """
+    lines = [LineString(points) for points in arcs]
+    conflicts = {
+        (i, i) for i, line in enumerate(lines) if not line.is_simple
+    }
+    left, right = STRtree(lines).query(lines, predicate="intersects")
+    for i, j in zip(left.tolist(), right.tolist()):
+        if i >= j:
+            continue
+        shared = [
+            arcs[i][position]
+            for position, node in zip([0, -1], nodes[i])
+            if node in nodes[j]
+        ]
+        intersection = lines[i].intersection(lines[j])
+        if not intersection.difference(MultiPoint(shared)).is_empty:
+            conflicts.add((i, j))
+    return conflicts
+
+
+def simplify_topology(
+    topology: dict, tolerance: float, quantization: int
+) -> dict:
+    """
+    A simplified and quantized copy of `topology`.
+
+    Each arc is simplified once, so the borders shared by neighbouring
+    administrations stay identical. Arcs can still cross or touch their
+    neighbours once simplified and snapped to the grid: the tolerance of
+    the arcs of every new conflict is halved, or when it is the grid, its
+    `quantization` doubled, until none is left. `tolerance` is in the
+    units of the coordinates (degrees).
+    """
+    source = decode_arcs(topology)
+    nodes = arc_nodes(source)
+    coordinates = np.concatenate(source)
+    # Simplified points are a subset of the source ones
+    bbox = (*coordinates.min(axis=0), *coordinates.max(axis=0))
+    # Conflicts of the source itself are not ours to solve
+    known = arc_conflicts(source, nodes)
+    tolerances = [tolerance] * len(source)
+    while True:
+        snapped, transform = snap_arcs(
+            [
+                simplify_arc(points, arc_tolerance)
+                for points, arc_tolerance in zip(source, tolerances)
+            ],
+            quantization,
+            bbox,
+        )
+        conflicts = arc_conflicts(snapped, nodes) - known
+        if not conflicts or quantization >= MAX_QUANTIZATION:
+            break
+        conflicting = {
+            index
+            for pair in conflicts
+            for index in pair
+            if tolerances[index]
+        }
+        if not conflicting:
+            quantization *= 2
+        for index in conflicting:
+            tolerances[index] /= 2
+            if tolerances[index] < tolerance / 2 ** MAX_TOLERANCE_HALVINGS:
+                tolerances[index] = 0
+    return {
+        "type": "Topology",
+        "bbox": [float(value) for value in bbox],
+        "transform": {
+            "scale": [float(value) for value in transform["scale"]],
+            "translate": [float(value) for value in transform["translate"]],
+        },
+        "objects": topology["objects"],
+        "arcs": [
+            np.diff(points, axis=0, prepend=[[0, 0]]).tolist()
+            for points in snapped
+        ],
+    }
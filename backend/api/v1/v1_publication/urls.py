@@ -72,6 +72,11 @@ urlpatterns = [
         PublishedMapViewSet.as_view({"get": "retrieve"}),
         name="map-details",
     ),
+    re_path(
+        r"^(?P<version>(v1))/maps/export",
+        PublishedMapViewSet.as_view({"get": "export"}),
+        name="maps-export",
+    ),
     re_path(
         r"^(?P<version>(v1))/maps",
         PublishedMapViewSet.as_view({"get": "list"}),
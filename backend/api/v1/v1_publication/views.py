@@ -1,14 +1,4 @@
 import time
-import requests
-import geopandas as gpd
-import topojson as tp
-import matplotlib.pyplot as plt
-import os
-import json
-from io import BytesIO
-from zipfile import ZipFile
-from pathlib import Path
-from matplotlib.patches import Patch
 from rest_framework.decorators import api_view
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError
@@ -22,13 +12,11 @@ from drf_spectacular.utils import (
     inline_serializer,
     OpenApiParameter
 )
-from django.core.management import call_command
-from django.http import HttpResponse
 from django.conf import settings
 from django_q.tasks import async_task
 from django.db import IntegrityError, transaction
+from django.db.models import Count, Prefetch, Window
 from django.utils import timezone
-from jsmin import jsmin
 from api.v1.v1_publication.serializers import (
     ReviewListSerializer,
     ReviewSerializer,
@@ -42,20 +30,44 @@ from api.v1.v1_publication.serializers import (
     ExportMapSerializer,
     PublishedMapSerializer,
     CompareMapSerializer,
+    MapEncodingSerializer,
+    ConfigTierSerializer,
+    BulkExportMapSerializer,
 )
 from api.v1.v1_publication.models import (
     Review,
     Publication,
 )
+from api.v1.v1_publication.exports import (
+    load_geodataframe,
+    render_export,
+    find_export_artifact,
+    save_export_artifact,
+    export_artifact_response,
+    load_monthly_geodataframe,
+    bulk_export_response,
+)
+from api.v1.v1_publication.geonode import (
+    get_auth,
+    get_resources,
+    get_resources_by_ids,
+    is_mirrored,
+    mirrored_resource_data,
+    mirrored_resources,
+)
+from api.v1.v1_publication.published_cache import published_response
+from api.v1.v1_publication.config_bundle import config_response
 from api.v1.v1_publication.constants import (
-    GEONODE_SSL_VERIFY,
-    GEONODE_REQUEST_TIMEOUT,
+    GEONODE_PAGE_SIZE,
     CDIGeonodeCategory,
     PublicationStatus,
-    DroughtCategory,
     ExportMapTypes,
-    DroughtCategoryColor,
+    BulkExportTypes,
+    PublishedMapView,
+    ValuesEncoding,
+    BoundaryTier,
 )
+from api.v1.v1_jobs.aggregators import DEFAULT_AGGREGATION
 from api.v1.v1_jobs.models import Jobs, JobTypes, JobStatus
 from utils.custom_permissions import IsReviewer, IsAdmin
 from utils.custom_pagination import Pagination
@@ -70,17 +82,41 @@ from math import ceil
 @extend_schema(
     description="Get required configuration",
     tags=["Development"],
+    parameters=[
+        OpenApiParameter(
+            name="tier",
+            default=BoundaryTier.full,
+            required=False,
+            enum=BoundaryTier.FieldStr.keys(),
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description=(
+                "Detail of the embedded topojson: overview and default are "
+                "simplified and quantized copies of the full boundaries"
+            ),
+        ),
+        OpenApiParameter(
+            name="v",
+            required=False,
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            description=(
+                "Content hash of the config, any other value is "
+                "redirected to the current one"
+            ),
+        ),
+    ],
     responses={200: {"type": "string", "format": "binary"}},
 )
 @api_view(["GET"])
 def get_config_file(request, version):
-    if not Path("source/config/config.min.js").exists():
-        call_command("generate_config")
-    data = jsmin(open("source/config/config.min.js", "r").read())
-    response = HttpResponse(
-        data, content_type="application/x-javascript; charset=utf-8"
-    )
-    return response
+    serializer = ConfigTierSerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(
+            {"message": validate_serializers_message(serializer.errors)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return config_response(request, serializer.validated_data.get("tier"))
 
 
 @extend_schema(
@@ -95,9 +131,23 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        return Review.objects.filter(
+        queryset = Review.objects.filter(
             user_id=user.id
-        ).order_by("-created_at")
+        ).select_related("publication").order_by("-created_at")
+        if self.action == "list":
+            # Only the columns of ReviewListSerializer
+            queryset = queryset.only(
+                "id",
+                "completed_at",
+                "is_completed",
+                "reviewed_count",
+                "created_at",
+                "publication__id",
+                "publication__year_month",
+                "publication__due_date",
+                "publication__initial_values",
+            )
+        return queryset
 
     def list(self, request, *args, **kwargs):
         """
@@ -129,8 +179,19 @@ class ReviewViewSet(viewsets.ModelViewSet):
         review_id = self.kwargs.get('pk')
         is_completed = Review.objects.get(id=review_id).is_completed
 
-        instance = serializer.save()
-        publication = instance.publication
+        with transaction.atomic():
+            instance = serializer.save(updated_at=timezone.now())
+            # Lock the publication so concurrent reviews are counted in turn
+            publication = Publication.objects_with_deleted.select_for_update(
+            ).get(pk=instance.publication_id)
+            publication.update_review_counters()
+            # If all reviews are completed, update the publication status
+            if (
+                publication.reviews_completed == publication.reviews_total
+                and publication.status == PublicationStatus.in_review
+            ):
+                publication.status = PublicationStatus.in_validation
+                publication.save()
         if not is_completed and instance.is_completed:
             job = Jobs.objects.create(
                 type=JobTypes.review_completed,
@@ -147,23 +208,29 @@ class ReviewViewSet(viewsets.ModelViewSet):
             )
             job.task_id = task_id
             job.save()
-        # If all reviews are completed, update the publication status
-        if (
-            publication.reviews.filter(is_completed=False).count() == 0 and
-            publication.status == PublicationStatus.in_review
-        ):
-            publication.status = PublicationStatus.in_validation
-            publication.save()
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Lock the publication first, the post_delete signal recounts its
+        # reviews in this transaction
+        Publication.objects_with_deleted.select_for_update().filter(
+            pk=instance.publication_id
+        ).first()
+        instance.delete()
+
+    @transaction.atomic
     def perform_create(self, serializer):
         if not self.request.data.get("publication_id"):
             raise ValidationError({
                 "publication_id": "This field is required."
             })
-        serializer.save(
+        instance = serializer.save(
             user_id=self.request.user.id,
             publication_id=self.request.data["publication_id"],
         )
+        Publication.objects_with_deleted.select_for_update().get(
+            pk=instance.publication_id
+        ).update_review_counters()
 
 
 class CDIGeonodeAPI(APIView):
@@ -245,12 +312,18 @@ class CDIGeonodeAPI(APIView):
             "id"
         ):
             cdi_id = serializer.validated_data["id"]
-            response = requests.get(
-                f"{settings.GEONODE_BASE_URL}/api/v2/resources/{cdi_id}",
-                verify=GEONODE_SSL_VERIFY,
-                timeout=GEONODE_REQUEST_TIMEOUT,
+            resource = mirrored_resources().filter(geonode_id=cdi_id).first()
+            if resource:
+                return Response(
+                    CDIGeonodeListSerializer(
+                        instance=mirrored_resource_data(resource)
+                    ).data,
+                    status=status.HTTP_200_OK
+                )
+            response = get_resources(
+                f"{settings.GEONODE_BASE_URL}/api/v2/resources/{cdi_id}"
             )
-            data = response.json().get("resource", None)
+            data = (response.data or {}).get("resource", None)
             if response.status_code == 200 and data:
                 publication = Publication.objects.filter(
                     cdi_geonode_id=cdi_id
@@ -287,6 +360,23 @@ class CDIGeonodeAPI(APIView):
         sort_field = serializer.validated_data.get("sort", None)
         sort_order = serializer.validated_data.get("sort_order", "desc")
         page = int(request.GET.get("page", "1"))
+        if is_mirrored(category):
+            # Filter, sort and paginate the local mirror in one query
+            return self.get_mirrored(
+                page,
+                category,
+                publication_status,
+                sort_field,
+                sort_order,
+            )
+        if publication_status:
+            # Page over the publications, then fetch only their resources
+            return self.get_by_status(
+                page,
+                publication_status,
+                sort_field,
+                sort_order,
+            )
         url = (
             "{0}/api/v2/resources"
             "?filter{{category.identifier}}={1}"
@@ -297,34 +387,10 @@ class CDIGeonodeAPI(APIView):
                 page,
             )
         )
-        if publication_status:
-            ids = Publication.objects.filter(
-                status=publication_status
-            ).values_list("cdi_geonode_id", flat=True)
-            if len(ids):
-                filter_ids = "&".join(
-                    [
-                        f"filter{{pk.in}}={id}"
-                        for id in ids
-                    ]
-                )
-                url = (
-                    "{0}/api/v2/resources?{1}".format(
-                        settings.GEONODE_BASE_URL,
-                        filter_ids
-                    )
-                )
-                url = f"{url}&page={page}&sort[]=-date"
-        username = settings.GEONODE_ADMIN_USERNAME
-        password = settings.GEONODE_ADMIN_PASSWORD
-        response = requests.get(
-            url,
-            auth=(username, password),
-            verify=GEONODE_SSL_VERIFY,
-            timeout=GEONODE_REQUEST_TIMEOUT,
-        )
+        # Repeated paging is served from the cached GeoNode responses
+        response = get_resources(url, auth=get_auth())
         if response.status_code == 200:
-            data = response.json()
+            data = response.data
             # Prepare the serialized data
             serialized_data = [
                 CDIGeonodeListSerializer(
@@ -341,14 +407,10 @@ class CDIGeonodeAPI(APIView):
             # Extract IDs from serialized data
             cdi_geonode_ids = [int(item["pk"]) for item in serialized_data]
 
-            # Fetch related publications based on the IDs and status
+            # Fetch related publications based on the IDs
             publications_query = Publication.objects.filter(
                 cdi_geonode_id__in=cdi_geonode_ids
             )
-            if publication_status:
-                publications_query = Publication.objects.filter(
-                    status=publication_status
-                )
 
             # Optimize lookup by creating a dictionary of publications
             publications_dict = {
@@ -371,28 +433,8 @@ class CDIGeonodeAPI(APIView):
 
             # Apply server-side sorting
             if sort_field:
-                reverse = sort_order == "desc"
-                # Normalize sort key to handle mixed types (str vs date/datetime)
-                def normalize_sort_key(value, field_name):
-                    if value is None:
-                        return ""
-                    # For year_month and created fields, convert dates to ISO strings
-                    if field_name in ("year_month", "created"):
-                        if hasattr(value, "isoformat"):
-                            return value.isoformat()
-                        return str(value)
-                    return value
-
-                serialized_data.sort(
-                    key=lambda x: (
-                        x.get(sort_field) is not None,
-                        normalize_sort_key(x.get(sort_field), sort_field)
-                    ),
-                    reverse=reverse
-                )
+                self.sort_page(serialized_data, sort_field, sort_order)
 
-            if publication_status:
-                data["total"] = publications_query.count()
             total_page = ceil(int(data["total"]) / int(data["page_size"]))
             return Response(
                 {
@@ -413,6 +455,128 @@ class CDIGeonodeAPI(APIView):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
+    def sort_page(self, serialized_data, sort_field, sort_order):
+        reverse = sort_order == "desc"
+
+        # Normalize sort key to handle mixed types (str vs date/datetime)
+        def normalize_sort_key(value, field_name):
+            if value is None:
+                return ""
+            # For year_month and created fields, convert dates to ISO strings
+            if field_name in ("year_month", "created"):
+                if hasattr(value, "isoformat"):
+                    return value.isoformat()
+                return str(value)
+            return value
+
+        serialized_data.sort(
+            key=lambda x: (
+                x.get(sort_field) is not None,
+                normalize_sort_key(x.get(sort_field), sort_field)
+            ),
+            reverse=reverse
+        )
+
+    def get_by_status(self, page, publication_status, sort_field, sort_order):
+        """
+        Paginate the publications of a status, ordered by year_month on
+        the (status, year_month) index, and fetch only the GeoNode
+        resources of that page.
+        """
+        page_size = GEONODE_PAGE_SIZE
+        offset = (page - 1) * page_size
+        ordering = "year_month" if sort_field == "year_month" \
+            and sort_order == "asc" else "-year_month"
+        publications = list(
+            Publication.objects.filter(
+                status=publication_status
+            ).annotate(
+                total_count=Window(expression=Count("pk"))
+            ).order_by(ordering, "-pk").only(
+                "pk",
+                "cdi_geonode_id",
+                "status",
+                "year_month",
+            )[offset:offset + page_size]
+        )
+        total = publications[0].total_count if publications else \
+            Publication.objects.filter(status=publication_status).count()
+        serialized_data = []
+        if publications:
+            response = get_resources_by_ids(
+                [p.cdi_geonode_id for p in publications]
+            )
+            if response.status_code != 200:
+                return Response(
+                    {"message": "Server Error: Unable to fetch data."},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+            # Publications whose resource is gone from GeoNode are skipped
+            for publication in publications:
+                resource = response.data.get(publication.cdi_geonode_id)
+                if not resource:
+                    continue
+                item = CDIGeonodeListSerializer(
+                    instance={
+                        **resource,
+                        "year_month": resource.get("date"),
+                        "publication_id": None,
+                        "status": None,
+                    }
+                ).data
+                item["year_month"] = publication.year_month
+                item["publication_id"] = publication.pk
+                item["status"] = publication.status
+                serialized_data.append(item)
+        if sort_field and sort_field != "year_month":
+            self.sort_page(serialized_data, sort_field, sort_order)
+        return Response(
+            {
+                "current": page,
+                "total": total,
+                "total_page": ceil(total / page_size),
+                "data": serialized_data,
+            },
+            status=status.HTTP_200_OK
+        )
+
+    def get_mirrored(
+        self,
+        page,
+        category,
+        publication_status,
+        sort_field,
+        sort_order,
+    ):
+        page_size = GEONODE_PAGE_SIZE
+        offset = (page - 1) * page_size
+        resources = list(
+            mirrored_resources(
+                category,
+                publication_status,
+                sort_field,
+                sort_order,
+            ).annotate(
+                total_count=Window(expression=Count("pk"))
+            )[offset:offset + page_size]
+        )
+        total = resources[0].total_count if resources else \
+            mirrored_resources(category, publication_status).count()
+        return Response(
+            {
+                "current": page,
+                "total": total,
+                "total_page": ceil(total / page_size),
+                "data": [
+                    CDIGeonodeListSerializer(
+                        instance=mirrored_resource_data(resource)
+                    ).data
+                    for resource in resources
+                ],
+            },
+            status=status.HTTP_200_OK
+        )
+
 
 @extend_schema(
     responses={200: PublicationSerializer},
@@ -425,7 +589,34 @@ class PublicationViewSet(viewsets.ModelViewSet):
     pagination_class = Pagination
 
     def get_queryset(self):
-        return Publication.objects.all().order_by("-due_date")
+        queryset = Publication.objects.all().order_by("-due_date")
+        if self.action == "list":
+            # Only the columns of PublicationInfoSerializer
+            return queryset.only(
+                "id",
+                "year_month",
+                "due_date",
+                "initial_values",
+                "status",
+            )
+        if self.action == "create":
+            return queryset
+        # The reviewers of PublicationSerializer
+        return queryset.prefetch_related(
+            Prefetch(
+                "reviews",
+                queryset=Review.objects.select_related("user").only(
+                    "id",
+                    "publication_id",
+                    "is_completed",
+                    "user__id",
+                    "user__name",
+                    "user__email",
+                    "user__email_verified",
+                    "user__technical_working_group",
+                ),
+            )
+        )
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -443,6 +634,14 @@ class PublicationViewSet(viewsets.ModelViewSet):
                 subject = serializer.validated_data.pop("subject")
                 message = serializer.validated_data.pop("message")
                 download_url = serializer.validated_data.pop("download_url")
+                aggregation = serializer.validated_data.pop(
+                    "aggregation",
+                    None
+                )
+                store_statistics = serializer.validated_data.pop(
+                    "store_statistics",
+                    False
+                )
 
                 # Save the publication
                 publication = serializer.save()
@@ -451,6 +650,36 @@ class PublicationViewSet(viewsets.ModelViewSet):
                     Review(publication=publication, user=reviewer)
                     for reviewer in reviewers
                 ], bulk=False)
+                publication.update_review_counters()
+
+                if settings.CDI_STREAM_PIPELINE:
+                    # Read the raster and compute the initial values in
+                    # a single task
+                    job = Jobs.objects.create(
+                        type=JobTypes.stream_initial_cdi_values,
+                        status=JobStatus.on_progress,
+                        info={
+                            "id": publication.id,
+                            "download_url": download_url,
+                            "subject": subject,
+                            "message": message,
+                            "aggregation": aggregation,
+                            "store_statistics": store_statistics,
+                        },
+                    )
+                    hook = "generate_initial_cdi_values_results"
+                    task_id = async_task(
+                        "api.v1.v1_jobs.job.stream_initial_cdi_values",
+                        publication.id,
+                        download_url,
+                        publication.cdi_geonode_id,
+                        aggregation or DEFAULT_AGGREGATION,
+                        store_statistics,
+                        hook=f"api.v1.v1_jobs.job.{hook}",
+                    )
+                    job.task_id = task_id
+                    job.save()
+                    return PublicationSerializer(publication).data
 
                 timestamp = int(time.time())
                 filename = "raster_{0}_{1}.tif".format(
@@ -466,6 +695,8 @@ class PublicationViewSet(viewsets.ModelViewSet):
                         "filename": filename,
                         "subject": subject,
                         "message": message,
+                        "aggregation": aggregation,
+                        "store_statistics": store_statistics,
                     },
                 )
                 hook = "download_geonode_dataset_results"
@@ -473,6 +704,7 @@ class PublicationViewSet(viewsets.ModelViewSet):
                     "api.v1.v1_jobs.job.download_geonode_dataset",
                     download_url,
                     filename,
+                    publication.cdi_geonode_id,
                     hook=f"api.v1.v1_jobs.job.{hook}",
                 )
                 # Update the job with the task ID
@@ -489,6 +721,10 @@ class PublicationViewSet(viewsets.ModelViewSet):
         instance.delete(hard=True)
 
     def perform_update(self, serializer):
+        previous = serializer.instance
+        was_published = previous.status == PublicationStatus.published
+        # The exports are rendered from these, other fields don't change them
+        exported = (previous.validated_values, previous.year_month)
         instance = serializer.save()
         total_adms = len(instance.initial_values)
         total_validated = 0
@@ -501,6 +737,26 @@ class PublicationViewSet(viewsets.ModelViewSet):
         if instance.narrative and total_adms == total_validated:
             instance.published_at = timezone.now()
         instance.save()
+        is_published = instance.status == PublicationStatus.published
+        if is_published and (
+            not was_published
+            or exported != (instance.validated_values, instance.year_month)
+        ):
+            # Pre-render the downloadable maps of the published version
+            job = Jobs.objects.create(
+                type=JobTypes.export_artifacts,
+                status=JobStatus.on_progress,
+                info={
+                    "publication_id": instance.id,
+                },
+            )
+            task_id = async_task(
+                "api.v1.v1_jobs.job.generate_export_artifacts",
+                instance.id,
+                hook="api.v1.v1_jobs.job.generate_export_artifacts_results",
+            )
+            job.task_id = task_id
+            job.save()
 
 
 class PublicationReviewsAPI(APIView):
@@ -533,7 +789,26 @@ class PublicationReviewsAPI(APIView):
         },
     )
     def get(self, request, version, pk):
-        publication = get_object_or_404(Publication, pk=pk)
+        publication = get_object_or_404(
+            Publication.objects.only(
+                "id",
+                "initial_values",
+                "validated_values",
+                "updated_at",
+            ).prefetch_related(
+                Prefetch(
+                    "reviews",
+                    # The suggestions are only loaded when the votes
+                    # are not cached
+                    queryset=Review.objects.filter(
+                        is_completed=True,
+                        completed_at__isnull=False,
+                    ).select_related("user").defer("suggestion_values"),
+                    to_attr="completed_review_list",
+                )
+            ),
+            pk=pk
+        )
 
         non_disputed = request.GET.get("non_disputed") in ["true", "1"]
         non_validated = request.GET.get("non_validated") in ["true", "1"]
@@ -560,7 +835,10 @@ class ReviewDetailsAPI(APIView):
         responses=ReviewInfoSerializer,
     )
     def get(self, request, version, pk):
-        review = get_object_or_404(Review, pk=pk)
+        review = get_object_or_404(
+            Review.objects.select_related("publication", "user"),
+            pk=pk
+        )
 
         return Response(
             ReviewInfoSerializer(
@@ -613,19 +891,24 @@ class ExportMapAPI(APIView):
                 ExportMapTypes.geojson
             )
 
-            # Load your GeoDataFrame
-            gdf = self._load_geodataframe(publication.validated_values)
-
-            # Handle the export based on the requested format
-            year_month = publication.year_month.strftime('%Y-%m')
-            if type == ExportMapTypes.geojson:
-                return self._export_geojson(gdf, year_month)
-            elif type == ExportMapTypes.shapefile:
-                return self._export_shapefile(gdf, year_month)
-            elif type == ExportMapTypes.png:
-                return self._export_image(gdf, year_month, "png")
-            elif type == ExportMapTypes.svg:
-                return self._export_image(gdf, year_month, "svg")
+            # Serve the pre-rendered artifact when it is available
+            artifact = find_export_artifact(publication, type)
+            export_file = None
+            if not artifact:
+                gdf = self._load_geodataframe(publication.validated_values)
+                year_month = publication.year_month.strftime('%Y-%m')
+                export_file = render_export(gdf, year_month, type)
+                artifact = save_export_artifact(
+                    publication,
+                    type,
+                    export_file
+                )
+            response = export_artifact_response(request, artifact)
+            if export_file and export_file.render_time is not None:
+                response["Server-Timing"] = (
+                    f"render;dur={export_file.render_time * 1000:.1f}"
+                )
+            return response
         except Exception as e:
             return Response(
                 {
@@ -635,163 +918,7 @@ class ExportMapAPI(APIView):
             )
 
     def _load_geodataframe(self, validated_values):
-        # Step 1: Load the TopoJSON file
-        with open("./source/eswatini.topojson", "r") as f:
-            topojson_data = json.load(f)
-        validated_dict = {
-            item["administration_id"]: item["category"]
-            for item in validated_values
-        }
-        # Step 2: Convert TopoJSON to GeoJSON using the topojson library
-        # Create a Topology object from the loaded TopoJSON data
-        topology = tp.Topology(topojson_data, object_name="eswatini")
-        # Convert the TopoJSON to GeoJSON
-        geojson_data = topology.to_geojson()
-
-        # Step 3: Load the GeoJSON data into a GeoDataFrame
-        gdf = gpd.GeoDataFrame.from_features(json.loads(geojson_data))
-
-        # Step 4: Map the categories to the GeoDataFrame
-        gdf["category"] = gdf["administration_id"].map(validated_dict)
-
-        # Step 5: Add the "cat_name" column
-        gdf["cat_name"] = gdf["category"].map(
-            DroughtCategory.FieldStr.get
-        )
-
-        # Step 6: Handle missing values (optional)
-        gdf["category"] = gdf["category"].fillna(DroughtCategory.none)
-        gdf["cat_name"] = gdf["cat_name"].fillna(
-            DroughtCategory.FieldStr[DroughtCategory.none]
-        )
-        # Ensure the GeoDataFrame has a CRS
-        if gdf.crs is None:
-            # Assign a default CRS (e.g., WGS84, EPSG:4326)
-            gdf.set_crs("EPSG:4326", inplace=True)
-        return gdf
-
-    def _export_geojson(self, gdf, year_month):
-        """
-        Export the GeoDataFrame as GeoJSON.
-        """
-        geojson_data = gdf.to_json()
-        response = HttpResponse(geojson_data, content_type="application/json")
-        cd = f'attachment; filename="cdi_map_{year_month}.geojson"'
-        response["Content-Disposition"] = cd
-        return response
-
-    def _export_shapefile(self, gdf, year_month):
-        """
-        Export the GeoDataFrame as a Shapefile (zipped).
-        """
-        # Rename `administration_id` column to `adm_id` in gdf
-        gdf = gdf.rename(columns={"administration_id": "adm_id"})
-
-        # Create an in-memory buffer for the Shapefile
-        zip_buffer = BytesIO()
-        with ZipFile(zip_buffer, "w") as zip_file:
-            # Write the Shapefile components to the zip file
-            temp_dir = "./tmp"
-            os.makedirs(
-                temp_dir,
-                exist_ok=True
-            )
-            gdf.to_file(
-                os.path.join(temp_dir, f"cdi_map_{year_month}.shp"),
-                driver="ESRI Shapefile"
-            )
-            # Manually create the .prj file if it doesn't exist
-            prj_path = os.path.join(
-                temp_dir,
-                f"cdi_map_{year_month}.prj"
-            )
-            if not os.path.exists(prj_path):
-                with open(prj_path, "w") as prj_file:
-                    prj_file.write(gdf.crs.to_wkt())
-
-            for ext in ["shp", "shx", "dbf", "prj"]:
-                file_path = os.path.join(
-                    temp_dir,
-                    f"cdi_map_{year_month}.{ext}"
-                )
-                zip_file.write(
-                    file_path,
-                    arcname=f"cdi_map_{year_month}.{ext}"
-                )
-                os.remove(file_path)  # Clean up temporary files
-
-        # Prepare the HTTP response
-        zip_buffer.seek(0)
-        response = HttpResponse(zip_buffer, content_type="application/zip")
-        cd = f'attachment; filename="cdi_map_{year_month}.zip"'
-        response["Content-Disposition"] = cd
-        return response
-
-    def _export_image(self, gdf, year_month, format):
-        """
-        Export the GeoDataFrame as an image (SVG or PNG).
-        """
-        if format not in ["svg", "png"]:
-            raise ValidationError({
-                "message": (
-                    "Invalid format parameter."
-                    "Only 'svg' and 'png' are supported."
-                )
-            })
-
-        # Define a custom color mapping for categories
-        color_mapping = dict(DroughtCategoryColor.FieldStr.items())
-
-        # Ensure valid geometries
-        gdf = gdf[gdf.is_valid & ~gdf.geometry.is_empty]
-
-        fig, ax = plt.subplots(figsize=(10, 10))
-
-        # Plot
-        valid_categories = set(gdf["category"].unique())
-        filtered_color_mapping = {
-            k: v for k, v in color_mapping.items() if k in valid_categories
-        }
-
-        legend_patches = []  # Store patches for the legend
-        for category, color in filtered_color_mapping.items():
-            subset = gdf[gdf["category"] == category]
-            subset.plot(
-                ax=ax,
-                color=color,
-                edgecolor="black",
-                label=DroughtCategory.FieldStr.get(category)
-            )
-
-            legend_patches.append(Patch(
-                facecolor=color,
-                edgecolor="black",
-                label=DroughtCategory.FieldStr.get(category)
-            ))
-
-        # Fix aspect ratio and limits
-        ax.set_xlim(gdf.total_bounds[0], gdf.total_bounds[2])
-        ax.set_ylim(gdf.total_bounds[1], gdf.total_bounds[3])
-
-        # Add legend to the plot
-        if legend_patches:
-            ax.legend(
-                handles=legend_patches,
-                loc="upper right",
-                title="Drought Categories"
-            )
-
-        # Save as image
-        img_buffer = BytesIO()
-        plt.savefig(img_buffer, format=format, bbox_inches="tight")
-        plt.close(fig)
-
-        img_buffer.seek(0)
-        content_type = "image/svg+xml" if format == "svg" else "image/png"
-        response = HttpResponse(img_buffer, content_type=content_type)
-        cd = f'attachment; filename="cdi_map_{year_month}.{format}"'
-        response["Content-Disposition"] = cd
-        return response
+        return load_geodataframe(validated_values)
 
 
 class PublishedMapViewSet(viewsets.ModelViewSet):
@@ -821,12 +948,49 @@ class PublishedMapViewSet(viewsets.ModelViewSet):
                 type=OpenApiTypes.DATE,
                 location=OpenApiParameter.QUERY,
             ),
+            OpenApiParameter(
+                name="view",
+                default=PublishedMapView.full,
+                required=False,
+                enum=PublishedMapView.FieldStr.keys(),
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "summary leaves out validated_values and narrative"
+                ),
+            ),
+            OpenApiParameter(
+                name="fields",
+                required=False,
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Comma separated fields to return",
+            ),
+            OpenApiParameter(
+                name="encoding",
+                default=ValuesEncoding.objects,
+                required=False,
+                enum=ValuesEncoding.FieldStr.keys(),
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "packed replaces validated_values with packed_values, "
+                    "a base64 int8 category per administration of the "
+                    "config.js administration_index (-1 is No Data)"
+                ),
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         """
         Override the list method to add extra context.
         """
+        return published_response(
+            request,
+            lambda: self.build_list(request)
+        )
+
+    def build_list(self, request):
         serializer = CompareMapSerializer(data=request.query_params)
         if not serializer.is_valid():
             return Response(
@@ -834,8 +998,9 @@ class PublishedMapViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Paginate the queryset
-        queryset = self.get_queryset()
+        # Only the columns of the requested fields are fetched
+        fields = serializer.get_map_fields()
+        queryset = self.get_queryset().only(*fields)
         left_date = serializer.validated_data.get("left_date")
         right_date = serializer.validated_data.get("right_date")
         if left_date and right_date:
@@ -843,10 +1008,16 @@ class PublishedMapViewSet(viewsets.ModelViewSet):
                 year_month__in=[left_date, right_date]
             )
 
+        # Paginate the queryset
         page = self.paginate_queryset(queryset)
         serializer = self.get_serializer(
             page,
             many=True,
+            fields=fields,
+            context={
+                **self.get_serializer_context(),
+                "encoding": serializer.validated_data.get("encoding"),
+            },
         )
         return self.get_paginated_response(serializer.data)
 
@@ -854,11 +1025,117 @@ class PublishedMapViewSet(viewsets.ModelViewSet):
         responses={200: PublishedMapSerializer},
         tags=["Map"],
         description="Published Map details",
+        parameters=[
+            OpenApiParameter(
+                name="encoding",
+                default=ValuesEncoding.objects,
+                required=False,
+                enum=ValuesEncoding.FieldStr.keys(),
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description=(
+                    "packed replaces validated_values with packed_values, "
+                    "a base64 int8 category per administration of the "
+                    "config.js administration_index (-1 is No Data)"
+                ),
+            ),
+        ],
     )
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        return published_response(
+            request,
+            lambda: self.build_retrieve(request)
+        )
+
+    def build_retrieve(self, request):
+        serializer = MapEncodingSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(
+                {"message": validate_serializers_message(serializer.errors)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            self.get_serializer(
+                self.get_object(),
+                context={
+                    **self.get_serializer_context(),
+                    "encoding": serializer.validated_data.get("encoding"),
+                },
+            ).data
+        )
+
+    @extend_schema(
+        tags=["Map"],
+        summary="Bulk export published maps",
+        description=(
+            "Export every published map between start_date and end_date "
+            "as a single long-format GeoJSON or CSV, or as a zip archive "
+            "with one shapefile per month."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="export_type",
+                default=BulkExportTypes.geojson,
+                required=False,
+                enum=BulkExportTypes.FieldStr.keys(),
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+            ),
+            OpenApiParameter(
+                name="start_date",
+                required=False,
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+            ),
+            OpenApiParameter(
+                name="end_date",
+                required=False,
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+            ),
+        ],
+        responses={
+            200: OpenApiTypes.BINARY,
+        },
+    )
+    def export(self, request, *args, **kwargs):
+        serializer = BulkExportMapSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(
+                {"message": validate_serializers_message(serializer.errors)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        export_type = serializer.validated_data.get(
+            "export_type"
+        ) or BulkExportTypes.geojson
+
+        queryset = self.get_queryset().order_by("year_month")
+        start_date = serializer.validated_data.get("start_date")
+        end_date = serializer.validated_data.get("end_date")
+        if start_date:
+            queryset = queryset.filter(
+                year_month__gte=start_date.replace(day=1)
+            )
+        if end_date:
+            queryset = queryset.filter(year_month__lte=end_date)
+        publications = list(
+            queryset.only("id", "year_month", "validated_values")
+        )
+        if not publications:
+            return Response(
+                {"message": "No published maps found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        gdf = load_monthly_geodataframe(publications)
+        first = publications[0].year_month.strftime("%Y-%m")
+        last = publications[-1].year_month.strftime("%Y-%m")
+        return bulk_export_response(
+            request,
+            gdf,
+            export_type,
+            f"cdi_maps_{first}_{last}"
+        )
 
 
 class PublicationDateAPI(APIView):
@@ -877,6 +1154,9 @@ class PublicationDateAPI(APIView):
         responses=CommonOptionSerializer,
     )
     def get(self, request, version):
+        return published_response(request, lambda: self.build(request))
+
+    def build(self, request):
         queryset = Publication.objects.filter(
             status=PublicationStatus.published,
             published_at__isnull=False
@@ -0,0 +1,126 @@
+import hashlib
+import json
+from collections import Counter
+from django.core.cache import cache
+from api.v1.v1_publication.constants import (
+    DroughtCategory,
+    REVIEW_VOTES_CACHE_TTL,
+)
+from api.v1.v1_publication.models import Review
+
+CACHE_PREFIX = "review-votes"
+
+
+class ReviewVotes:
+    """
+    The suggestions of the completed reviews of a publication, tallied per
+    administration together with its initial value.
+
+    votes: category counts per administration_id, No Data excluded
+    consensus_ids / disputed_ids: administrations with one / several
+        categories among their votes
+    non_validated_ids: validated administrations without a category or
+        unknown to the initial values
+    """
+
+    def __init__(self, initial_values, validated_values, reviews):
+        # reviews: (user_id, suggestion_values) of the completed reviews
+        self.suggestions = [
+            {**suggestion, "user_id": user_id}
+            for user_id, suggestion_values in reviews
+            for suggestion in suggestion_values or []
+        ]
+        initial_ids = {v["administration_id"] for v in initial_values}
+        validated_values = validated_values or []
+        self.non_validated_ids = {
+            v["administration_id"]
+            for v in validated_values
+            if v.get("category") is None
+            or v["administration_id"] not in initial_ids
+        }
+        # Once validation started, only its pending administrations remain
+        self.filter_non_validated = bool(
+            self.non_validated_ids or validated_values
+        )
+
+        groups = {}
+        for item in self.suggestions + list(initial_values):
+            if item.get("category") == DroughtCategory.none:
+                continue
+            groups.setdefault(item["administration_id"], []).append(item)
+        self.votes = {
+            administration_id: Counter(item.get("category") for item in items)
+            for administration_id, items in groups.items()
+        }
+        self.consensus_ids = {
+            administration_id
+            for administration_id, votes in self.votes.items()
+            if len(votes) == 1
+        }
+        self.disputed_ids = set(self.votes) - self.consensus_ids
+        # Grouped by administration, in order of their first vote
+        self.non_disputed = [
+            item
+            for administration_id, items in groups.items()
+            if administration_id in self.consensus_ids
+            for item in items
+        ]
+
+    def get_reviews(self, non_disputed=False, non_validated=False):
+        reviews = self.non_disputed if non_disputed else self.suggestions
+        if non_validated and self.filter_non_validated:
+            reviews = [
+                r for r in reviews
+                if r["administration_id"] in self.non_validated_ids
+            ]
+        return reviews
+
+
+def get_votes_version(publication, reviews) -> str:
+    """
+    Votes are keyed by the completed reviews (which ones, and their latest
+    completion and update) and the initial and validated values of the
+    publication.
+    """
+    stamps = [
+        max([r.completed_at for r in reviews if r.completed_at], default=""),
+        max([r.updated_at for r in reviews if r.updated_at], default=""),
+    ]
+    # Not every write of the values bumps updated_at (e.g. the jobs)
+    values = json.dumps(
+        [publication.initial_values, publication.validated_values],
+        sort_keys=True,
+    )
+    return hashlib.sha256(
+        "{0}:{1}:{2}:{3}".format(
+            ",".join(sorted([str(r.pk) for r in reviews])),
+            ":".join([str(stamp) for stamp in stamps]),
+            publication.updated_at or "",
+            values,
+        ).encode("utf-8")
+    ).hexdigest()[:32]
+
+
+def get_review_votes(publication, reviews) -> ReviewVotes:
+    """
+    ReviewVotes of the `reviews` completed for `publication`, cached until
+    a review is completed or updated, or the validated values change.
+    """
+    reviews = list(reviews)
+    key = "{0}:{1}:{2}".format(
+        CACHE_PREFIX,
+        publication.pk,
+        get_votes_version(publication, reviews),
+    )
+    votes = cache.get(key)
+    if votes is None:
+        # The suggestions are only loaded to tally the votes again
+        votes = ReviewVotes(
+            publication.initial_values,
+            publication.validated_values,
+            Review.objects.filter(
+                pk__in=[r.pk for r in reviews]
+            ).order_by("pk").values_list("user_id", "suggestion_values"),
+        )
+        cache.set(key, votes, timeout=REVIEW_VOTES_CACHE_TTL)
+    return votes
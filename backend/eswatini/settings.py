@@ -204,6 +204,19 @@ GEONODE_ADMIN_USERNAME = environ.get("GEONODE_ADMIN_USERNAME")
 GEONODE_ADMIN_PASSWORD = environ.get("GEONODE_ADMIN_PASSWORD")
 RUNDECK_API_URL = environ.get("RUNDECK_API_URL")
 RUNDECK_API_TOKEN = environ.get("RUNDECK_API_TOKEN")
+# CDI rasters with more pixels than this over the country are processed
+# block by block to keep worker memory bounded
+CDI_STREAMING_PIXELS = int(environ.get("CDI_STREAMING_PIXELS", 25_000_000))
+# Byte budget of the downloaded rasters kept by the workers, the least
+# recently used ones are evicted first
+RASTER_CACHE_MAX_BYTES = int(
+    environ.get("RASTER_CACHE_MAX_BYTES", 10 * 1024 ** 3)
+)
+# New publications read the CDI raster straight from GeoNode in a single
+# task instead of queueing a download and then the initial values
+CDI_STREAM_PIPELINE = environ.get(
+    "CDI_STREAM_PIPELINE", "True"
+).lower() in ("true", "1", "yes")
 # Override the default user model
 AUTH_USER_MODEL = "v1_users.SystemUser"
 # MAIL SETUP
@@ -2,4 +2,5 @@
 set -eu
 
 ./manage.py migrate
+./manage.py generate_config
 ./manage.py runserver 0.0.0.0:8000
\ No newline at end of file
@@ -0,0 +1,6 @@
+#!/usr/bin/env bash
+
+# Sync the local mirror of the GeoNode raster datasets, incrementally
+# unless --full is given: only a full sync removes the datasets deleted
+# from GeoNode.
+./manage.py sync_geonode_resources "$@"
@@ -2,13 +2,20 @@
 
 import Script from "next/script";
 import { feature } from "topojson-client";
+import { usePathname } from "next/navigation";
 import { useAppDispatch } from "@/context/AppContextProvider";
 
+// Embedded maps are small, they load the simplified boundaries
+const CONFIG_SRC = {
+  "/iframe/map": "/config.js?tier=default",
+};
+
 const DynamicScript = () => {
   const appDispatch = useAppDispatch();
+  const pathname = usePathname();
   return (
     <Script
-      src="/config.js"
+      src={CONFIG_SRC?.[pathname] || "/config.js"}
       onLoad={() => {
         if (window?.topojson) {
           const geoData = feature(